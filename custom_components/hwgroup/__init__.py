@@ -1,17 +1,62 @@
 """The HW Group integration."""
 from __future__ import annotations
 
+from collections.abc import Mapping
+from functools import partial
 import logging
-from datetime import timedelta
+from typing import Any
+
+import aiohttp
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, SupportsResponse, callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
-from .hwgroup import HWGroupAPI, HWGroupError
+from .classifier import extend_keywords
+from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_DEDICATED_CONNECTION,
+    CONF_INVERT_BINARY_SENSORS,
+    CONF_KEYWORDS,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MQTT_COMMANDS,
+    CONF_MQTT_LIVENESS_TIMEOUT,
+    CONF_MQTT_TOPIC,
+    CONF_PUSH,
+    CONF_PUSH_TOKEN,
+    CONF_SMS_RATE_LIMIT,
+    CONF_SNMP_COMMUNITY,
+    CONF_STATISTICS_WINDOWS,
+    CONF_TRANSPORT,
+    DATA_PUSH_VIEW,
+    DATA_SCHEDULER,
+    DATA_SMS_POOL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MQTT_LIVENESS_TIMEOUT,
+    DEFAULT_SMS_RATE_LIMIT,
+    DEFAULT_SNMP_COMMUNITY,
+    DEVICE_TYPE_SMS_GATEWAY,
+    DOMAIN,
+    STORAGE_VERSION,
+    TRANSPORT_MODBUS,
+    TRANSPORT_MQTT,
+    TRANSPORT_SNMP,
+)
+from .coordinator import HWGroupDataUpdateCoordinator
+from .history import parse_windows
+from .push import HWGroupPushView
+from .hwgroup import HWGroupAPI, HWGroupConnectionError
+from .modbus import HWGroupModbusAPI
+from .mqtt import HWGroupMqttAPI
+from .scheduler import HWGroupPollScheduler
+from .snmp import HWGroupSnmpAPI
+from .sms import HWGroupSmsPool, HWGroupSmsQueue, SmsQueueFullError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,113 +66,349 @@ PLATFORMS: list[Platform] = [
     Platform.SWITCH,
 ]
 
+# Extra keywords for icon and device class detection, e.g. in other languages
+KEYWORD_TABLE_SCHEMA = vol.Schema({cv.string: vol.All(cv.ensure_list, [cv.string])})
+
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {
+                vol.Optional(CONF_KEYWORDS, default={}): {
+                    vol.In([Platform.SENSOR, Platform.BINARY_SENSOR]): KEYWORD_TABLE_SCHEMA
+                },
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+def _snapshot_or_restore(data: dict[str, Any]) -> dict[str, Any]:
+    """Reject set_outputs calls that would restore the snapshot they take."""
+    if data["snapshot"] and data["restore"]:
+        raise vol.Invalid("snapshot and restore cannot be used together")
+    return data
+
+
+SET_OUTPUTS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required("device_id"): cv.string,
+            vol.Optional("outputs", default={}): {cv.string: cv.boolean},
+            vol.Optional("snapshot", default=False): cv.boolean,
+            vol.Optional("restore", default=False): cv.boolean,
+        }
+    ),
+    _snapshot_or_restore,
+)
+
+SEND_SMS_SCHEMA = vol.Schema(
+    {
+        vol.Optional("device_id"): cv.string,
+        vol.Required("phone_number"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required("message"): cv.string,
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the HW Group integration from YAML."""
+    conf = config.get(DOMAIN, {})
+    for platform, tables in conf.get(CONF_KEYWORDS, {}).items():
+        unknown = extend_keywords(platform, tables)
+        if unknown:
+            _LOGGER.warning(
+                "Ignoring unknown %s keyword rules: %s", platform, ", ".join(unknown)
+            )
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HW Group from a config entry."""
     host = entry.data[CONF_HOST]
-    username = entry.data.get(CONF_USERNAME)
-    password = entry.data.get(CONF_PASSWORD)
 
-    session = async_get_clientsession(hass)
-    api = HWGroupAPI(host, session, username, password)
+    # A dedicated connection pool keeps connections to the device alive
+    # and isolates a hung device from the shared connector
+    if entry.data.get(CONF_DEDICATED_CONNECTION, False):
+        session = None
+    else:
+        session = async_get_clientsession(hass)
+    api = _create_api(hass, entry, session)
+    entry.async_on_unload(api.async_close)
 
-    async def async_update_data():
-        """Fetch data from API."""
-        try:
-            return await api.async_get_data()
-        except HWGroupError as err:
-            raise UpdateFailed(f"Error communicating with device: {err}") from err
+    if isinstance(api, HWGroupMqttAPI):
+        # MQTT is only an after dependency, loaded when it is configured
+        from homeassistant.components import mqtt
 
-    coordinator = DataUpdateCoordinator(
+        if not await mqtt.async_wait_for_mqtt_client(hass):
+            raise ConfigEntryNotReady("MQTT is not available")
+
+    coordinator = HWGroupDataUpdateCoordinator(
         hass,
-        _LOGGER,
+        api,
         name=f"{DOMAIN}_{host}",
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+        adaptive=entry.data.get(CONF_ADAPTIVE_POLLING, False),
+        max_interval=entry.data.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        inverted=frozenset(entry.data.get(CONF_INVERT_BINARY_SENSORS, [])),
+        store=_async_get_store(hass, entry),
+        statistics_windows=parse_windows(entry.data.get(CONF_STATISTICS_WINDOWS, "")),
+        push=entry.data.get(CONF_PUSH, False),
+        stream=isinstance(api, HWGroupMqttAPI),
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.async_shutdown)
+    # Known devices start from their last snapshot and are polled in the
+    # background, so slow or offline devices do not hold up the setup
+    restored = await coordinator.async_restore()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
+    if isinstance(api, HWGroupMqttAPI):
+        entry.async_on_unload(await _async_subscribe_mqtt(hass, api, coordinator))
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "api": api,
+        # Entry data the entry was set up with
+        "config": dict(entry.data),
     }
 
+    # Devices in push mode post their values to one shared view
+    if coordinator.push:
+        hass.data[DOMAIN][entry.entry_id]["push_token"] = entry.data[CONF_PUSH_TOKEN]
+        if not hass.data[DOMAIN].get(DATA_PUSH_VIEW):
+            hass.http.register_view(HWGroupPushView(hass))
+            hass.data[DOMAIN][DATA_PUSH_VIEW] = True
+
+    # Polls of all devices share one scheduler
+    if (scheduler := hass.data[DOMAIN].get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DOMAIN][DATA_SCHEDULER] = HWGroupPollScheduler(hass)
+    entry.async_on_unload(
+        scheduler.async_register(entry.entry_id, coordinator, immediate=restored)
+    )
+
+    # SMS Gateways send messages through a rate-limited queue
+    device_type = coordinator.data.get("device_info", {}).get("device_type")
+    if device_type == DEVICE_TYPE_SMS_GATEWAY:
+        sms_queue = HWGroupSmsQueue(
+            hass,
+            api,
+            rate_limit=entry.data.get(CONF_SMS_RATE_LIMIT, DEFAULT_SMS_RATE_LIMIT),
+        )
+        sms_queue.async_start()
+        entry.async_on_unload(sms_queue.async_stop)
+        hass.data[DOMAIN][entry.entry_id]["sms_queue"] = sms_queue
+
+        # Messages without a device ID are balanced across all gateways
+        if (sms_pool := hass.data[DOMAIN].get(DATA_SMS_POOL)) is None:
+            sms_pool = hass.data[DOMAIN][DATA_SMS_POOL] = HWGroupSmsPool(hass)
+        entry.async_on_unload(
+            sms_pool.async_register(entry.entry_id, coordinator, sms_queue)
+        )
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # Register update listener for options changes
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     # Register services for SMS Gateway
     async def handle_send_sms(call):
         """Handle the send_sms service call."""
         device_id = call.data.get("device_id")
-        phone_number = call.data.get("phone_number")
-        message = call.data.get("message")
+        message = call.data["message"]
+
+        # Every number may still be a comma separated list
+        recipients = [
+            number.strip()
+            for numbers in call.data["phone_number"]
+            for number in numbers.split(",")
+            if number.strip()
+        ]
         
-        # Find the API instance for the specified device
-        api_instance = None
+        # Use the specific device or let the pool pick a gateway per message
+        sms_queue = None
         if device_id:
-            # Use specific device
-            for entry_id, data in hass.data[DOMAIN].items():
-                if entry_id == device_id:
-                    api_instance = data["api"]
-                    break
+            entry_data = hass.data[DOMAIN].get(device_id)
+            if isinstance(entry_data, dict):
+                sms_queue = entry_data.get("sms_queue")
         else:
-            # Use first SMS Gateway found
-            for data in hass.data[DOMAIN].values():
-                if isinstance(data, dict) and "api" in data:
-                    coordinator_data = data["coordinator"].data
-                    if coordinator_data.get("device_info", {}).get("device_type") == "sms_gateway":
-                        api_instance = data["api"]
-                        break
+            sms_queue = hass.data[DOMAIN].get(DATA_SMS_POOL)
         
-        if api_instance:
-            success = await api_instance.async_send_sms(phone_number, message)
-            if not success:
-                _LOGGER.error("Failed to send SMS to %s", phone_number)
-        else:
+        if not sms_queue:
             _LOGGER.error("No SMS Gateway device found")
+            return None
+
+        try:
+            ticket = sms_queue.async_enqueue(recipients, message)
+        except SmsQueueFullError as err:
+            raise HomeAssistantError(str(err)) from err
+        return {"ticket": ticket, "queued": len(recipients)}
 
     async def handle_call_number(call):
         """Handle the call_number service call."""
         device_id = call.data.get("device_id")
         phone_number = call.data.get("phone_number")
         
-        # Find the API instance for the specified device
-        api_instance = None
         if device_id:
             # Use specific device
-            for entry_id, data in hass.data[DOMAIN].items():
-                if entry_id == device_id:
-                    api_instance = data["api"]
-                    break
+            entry_data = hass.data[DOMAIN].get(device_id)
+            if not isinstance(entry_data, dict) or "sms_queue" not in entry_data:
+                _LOGGER.error("No SMS Gateway device found")
+                return
+            success = await entry_data["api"].async_call_number(phone_number)
         else:
-            # Use first SMS Gateway found
-            for data in hass.data[DOMAIN].values():
-                if isinstance(data, dict) and "api" in data:
-                    coordinator_data = data["coordinator"].data
-                    if coordinator_data.get("device_info", {}).get("device_type") == "sms_gateway":
-                        api_instance = data["api"]
-                        break
-        
-        if api_instance:
-            success = await api_instance.async_call_number(phone_number)
-            if not success:
-                _LOGGER.error("Failed to call %s", phone_number)
+            # Ring through the best gateway, failing over to the others
+            sms_pool = hass.data[DOMAIN].get(DATA_SMS_POOL)
+            if not sms_pool:
+                _LOGGER.error("No SMS Gateway device found")
+                return
+            success = await sms_pool.async_call_number(phone_number)
+
+        if not success:
+            _LOGGER.error("Failed to call %s", phone_number)
+
+    async def handle_set_outputs(call):
+        """Handle the set_outputs service call."""
+        device_id = call.data["device_id"]
+        entry_data = hass.data[DOMAIN].get(device_id)
+        if not isinstance(entry_data, dict) or "api" not in entry_data:
+            _LOGGER.error("No HW Group device found with ID %s", device_id)
+            return
+
+        coordinator = entry_data["coordinator"]
+        switches = coordinator.data.get("switches", {})
+
+        if call.data["snapshot"]:
+            # Remember the state of all outputs before applying the map
+            entry_data["output_snapshot"] = {
+                output_id: output.state for output_id, output in switches.items()
+            }
+
+        if call.data["restore"]:
+            outputs = entry_data.get("output_snapshot")
+            if outputs is None:
+                _LOGGER.error("No output snapshot stored for device %s", device_id)
+                return
         else:
-            _LOGGER.error("No SMS Gateway device found")
+            outputs = call.data["outputs"]
+
+        unknown = outputs.keys() - switches.keys()
+        if unknown:
+            _LOGGER.warning("Ignoring unknown outputs: %s", ", ".join(sorted(unknown)))
+        outputs = {
+            output_id: state
+            for output_id, state in outputs.items()
+            if output_id in switches
+        }
+
+        if outputs:
+            results = await entry_data["api"].async_set_outputs(outputs)
+            failed = [output_id for output_id, ok in results.items() if not ok]
+            if failed:
+                _LOGGER.error("Failed to set outputs: %s", ", ".join(failed))
+            # One refresh for the whole relay map
+            await coordinator.async_request_refresh()
 
     # Register services
-    hass.services.async_register(DOMAIN, "send_sms", handle_send_sms)
+    hass.services.async_register(
+        DOMAIN,
+        "send_sms",
+        handle_send_sms,
+        schema=SEND_SMS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     hass.services.async_register(DOMAIN, "call_number", handle_call_number)
+    hass.services.async_register(
+        DOMAIN, "set_outputs", handle_set_outputs, schema=SET_OUTPUTS_SCHEMA
+    )
 
     return True
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload the config entry when it changes."""
+def _create_api(
+    hass: HomeAssistant, entry: ConfigEntry, session: aiohttp.ClientSession | None
+) -> HWGroupAPI:
+    """Return the API client for the transport of an entry."""
+    host = entry.data[CONF_HOST]
+    username = entry.data.get(CONF_USERNAME)
+    password = entry.data.get(CONF_PASSWORD)
+    transport = entry.data.get(CONF_TRANSPORT)
+    if transport == TRANSPORT_SNMP:
+        return HWGroupSnmpAPI(
+            host,
+            session,
+            username,
+            password,
+            community=entry.data.get(CONF_SNMP_COMMUNITY, DEFAULT_SNMP_COMMUNITY),
+        )
+    if transport == TRANSPORT_MODBUS:
+        return HWGroupModbusAPI(host, session, username, password)
+    if transport == TRANSPORT_MQTT:
+        return HWGroupMqttAPI(
+            host,
+            session,
+            username,
+            password,
+            topic=entry.data[CONF_MQTT_TOPIC],
+            publish=partial(_async_publish_mqtt, hass),
+            commands=entry.data.get(CONF_MQTT_COMMANDS, False),
+            liveness_timeout=entry.data.get(
+                CONF_MQTT_LIVENESS_TIMEOUT, DEFAULT_MQTT_LIVENESS_TIMEOUT
+            ),
+        )
+    return HWGroupAPI(host, session, username, password)
+
+
+async def _async_subscribe_mqtt(
+    hass: HomeAssistant,
+    api: HWGroupMqttAPI,
+    coordinator: HWGroupDataUpdateCoordinator,
+) -> CALLBACK_TYPE:
+    """Feed the messages of a device to its coordinator."""
+    from homeassistant.components import mqtt
+
+    @callback
+    def message_received(msg: mqtt.ReceiveMessage) -> None:
+        """Apply a message and schedule the entity update."""
+        if (data := api.apply_message(msg.topic, msg.payload)) is not None:
+            coordinator.async_stream(data)
+
+    return await mqtt.async_subscribe(
+        hass, api.subscription, message_received, encoding=None
+    )
+
+
+async def _async_publish_mqtt(hass: HomeAssistant, topic: str, payload: str) -> None:
+    """Publish a command for a device."""
+    from homeassistant.components import mqtt
+
+    try:
+        await mqtt.async_publish(hass, topic, payload)
+    except HomeAssistantError as err:
+        raise HWGroupConnectionError(f"MQTT error: {err}") from err
+
+
+def _async_get_store(hass: HomeAssistant, entry: ConfigEntry) -> Store[dict[str, Any]]:
+    """Return the store of the last snapshot of an entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+def _without_inversion(data: Mapping[str, Any]) -> dict[str, Any]:
+    """Return entry data without the inverted binary sensors."""
+    return {key: value for key, value in data.items() if key != CONF_INVERT_BINARY_SENSORS}
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options, reloading the entry unless only inversion changed."""
+    entry_data = hass.data[DOMAIN].get(entry.entry_id)
+    if entry_data is not None and (
+        _without_inversion(entry_data["config"]) == _without_inversion(entry.data)
+    ):
+        entry_data["config"] = dict(entry.data)
+        entry_data["coordinator"].async_set_inverted(
+            frozenset(entry.data.get(CONF_INVERT_BINARY_SENSORS, []))
+        )
+        return
     await hass.config_entries.async_reload(entry.entry_id)
 
 
@@ -137,3 +418,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored snapshot of a deleted entry."""
+    await _async_get_store(hass, entry).async_remove()
@@ -0,0 +1,227 @@
+"""Keyword classification of entity names for the HW Group integration.
+
+Entity names are matched against keyword tables to pick icons and device
+classes. Each table is compiled into one regular expression and results
+are memoized per name. This module does not import Home Assistant, so the
+benchmarks can load it on their own.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import re
+from typing import Any
+
+# A rule is (key, keywords, result); the result may be a nested classifier
+Rule = tuple[str, Iterable[str], Any]
+
+
+class KeywordClassifier:
+    """Return the result of the first rule with a keyword in the name.
+
+    Rules are tried in order, like a chain of ``any(keyword in name ...)``
+    checks, but the whole table is one regex. Each rule is an alternative
+    that looks ahead for any of its keywords and captures an empty group,
+    so the regex engine tries the rules in order and the name of the
+    matched group identifies the first matching rule.
+    """
+
+    def __init__(self, rules: Iterable[Rule], default: Any = None) -> None:
+        """Initialize and compile the classifier."""
+        self._rules = [(key, list(keywords), result) for key, keywords, result in rules]
+        self.default = default
+        self._cache: dict[str, Any] = {}
+        self._pattern: re.Pattern[str] | None = None
+        self._compile()
+
+    def _compile(self) -> None:
+        """Compile all rules into one pattern with a group per rule."""
+        alternatives = []
+        for index, (_key, keywords, _result) in enumerate(self._rules):
+            if keywords:
+                words = "|".join(re.escape(word) for word in sorted(set(keywords)))
+                alternatives.append(f"(?=.*?(?:{words}))(?P<r{index}>)")
+        self._pattern = (
+            re.compile("|".join(alternatives), re.DOTALL) if alternatives else None
+        )
+        self._cache.clear()
+
+    def classify(self, name: str) -> Any:
+        """Return the result for a name."""
+        name = name.lower()
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        result = self.default
+        if self._pattern is not None and (match := self._pattern.match(name)):
+            result = self._rules[int(match.lastgroup[1:])][2]
+        if isinstance(result, KeywordClassifier):
+            result = result.classify(name)
+        self._cache[name] = result
+        return result
+
+    def extend(self, key: str, keywords: Iterable[str]) -> bool:
+        """Add keywords to the rule with the given key, here or nested."""
+        keywords = [keyword.lower() for keyword in keywords]
+        found = False
+        for rule_key, rule_keywords, result in self._rules:
+            if rule_key == key:
+                rule_keywords.extend(keywords)
+                found = True
+            if isinstance(result, KeywordClassifier):
+                found |= result.extend(key, keywords)
+        if found:
+            self._compile()
+        return found
+
+    def clear_cache(self) -> None:
+        """Forget the memoized results, including those of nested classifiers."""
+        self._cache.clear()
+        for _key, _keywords, result in self._rules:
+            if isinstance(result, KeywordClassifier):
+                result.clear_cache()
+
+
+# Binary sensors: (device class, icon)
+BINARY_SENSOR_CLASSIFIER = KeywordClassifier(
+    [
+        ("door", ("door", "tür", "türe", "tur"), ("door", "mdi:door")),
+        ("window", ("window", "fenster"), ("window", "mdi:window-closed")),
+        ("motion", ("motion", "bewegung", "pir"), ("motion", "mdi:motion-sensor")),
+        ("smoke", ("smoke", "rauch", "fire", "feuer"), ("smoke", "mdi:smoke-detector")),
+        ("leak", ("water", "wasser", "leak", "leck"), ("moisture", "mdi:water-alert")),
+        (
+            "humidity",
+            ("hum", "humidity", "feucht", "moisture"),
+            ("moisture", "mdi:water-percent"),
+        ),
+        (
+            "heat",
+            ("temp", "temperature", "heat", "cold"),
+            ("heat", "mdi:thermometer-alert"),
+        ),
+        ("vibration", ("vibration", "vibr", "shock"), ("vibration", "mdi:vibrate")),
+        (
+            "sound",
+            ("sound", "noise", "geräusch", "laut"),
+            ("sound", "mdi:volume-high"),
+        ),
+        ("power", ("power", "strom", "electricity"), ("power", "mdi:power-plug")),
+        ("gas", ("gas",), ("gas", "mdi:gas-cylinder")),
+        ("light", ("light", "licht", "brightness"), ("light", "mdi:lightbulb")),
+        (
+            "occupancy",
+            ("presence", "anwesenheit", "occupancy"),
+            ("occupancy", "mdi:home-account"),
+        ),
+        (
+            "connectivity",
+            ("comm", "connection", "verbindung", "network"),
+            ("connectivity", "mdi:network"),
+        ),
+        ("alarm", ("alarm", "alert"), ("problem", "mdi:bell-alert")),
+        ("battery", ("battery", "batterie", "akku"), ("battery", "mdi:battery-alert")),
+    ]
+)
+
+# Sensors of other types are classified by their name only (SMS Gateway)
+SENSOR_NAME_CLASSIFIER = KeywordClassifier(
+    [
+        (
+            "signal",
+            ("signal",),
+            KeywordClassifier(
+                [
+                    ("strength", ("strength",), "mdi:signal-cellular-3"),
+                    ("quality", ("quality",), "mdi:signal"),
+                ],
+                default="mdi:antenna",
+            ),
+        ),
+        (
+            "network",
+            ("network",),
+            KeywordClassifier(
+                [
+                    ("operator", ("operator",), "mdi:cellphone"),
+                    ("status", ("status",), "mdi:network"),
+                ],
+                default="mdi:network-outline",
+            ),
+        ),
+        (
+            "sms",
+            ("sms",),
+            KeywordClassifier(
+                [
+                    ("sent", ("sent", "gesendet"), "mdi:message-check"),
+                    ("error", ("error", "fehler"), "mdi:message-alert"),
+                ],
+                default="mdi:message-text",
+            ),
+        ),
+    ]
+)
+
+# Sensor icons per sensor type
+SENSOR_ICON_CLASSIFIERS: dict[str, KeywordClassifier] = {
+    "temperature": KeywordClassifier(
+        [
+            ("cpu", ("server", "cpu", "processor"), "mdi:cpu"),
+            ("rack", ("rack", "cabinet", "schrank"), "mdi:server"),
+            ("storage", ("storage", "disk", "hdd", "ssd"), "mdi:harddisk"),
+            ("room", ("room", "raum", "zimmer"), "mdi:home-thermometer"),
+            ("outside", ("outside", "outdoor", "aussen", "außen"), "mdi:thermometer"),
+            ("water", ("water", "wasser"), "mdi:water-thermometer"),
+        ],
+        default="mdi:thermometer",
+    ),
+    "humidity": KeywordClassifier(
+        [
+            ("front", ("front", "vorne"), "mdi:water-percent"),
+            ("rear", ("back", "rear", "hinten"), "mdi:water-percent-alert"),
+        ],
+        default="mdi:water-percent",
+    ),
+    "voltage": KeywordClassifier(
+        [("battery", ("battery", "batterie", "akku"), "mdi:battery-charging")],
+        default="mdi:lightning-bolt",
+    ),
+    "current": KeywordClassifier([], default="mdi:current-ac"),
+}
+
+PLATFORM_CLASSIFIERS: dict[str, list[KeywordClassifier]] = {
+    "binary_sensor": [BINARY_SENSOR_CLASSIFIER],
+    "sensor": [*SENSOR_ICON_CLASSIFIERS.values(), SENSOR_NAME_CLASSIFIER],
+}
+
+
+def classify_binary_sensor(name: str, sensor_type: str = "contact") -> tuple[str, str]:
+    """Return the device class and icon of a binary sensor."""
+    if (result := BINARY_SENSOR_CLASSIFIER.classify(name)) is not None:
+        return result
+    if sensor_type == "alarm":
+        return "problem", "mdi:alert-circle"
+    return "opening", "mdi:electric-switch"
+
+
+def sensor_icon(name: str, sensor_type: str = "generic") -> str | None:
+    """Return the icon of a sensor, or None to use the default."""
+    classifier = SENSOR_ICON_CLASSIFIERS.get(sensor_type, SENSOR_NAME_CLASSIFIER)
+    return classifier.classify(name)
+
+
+def extend_keywords(platform: str, tables: dict[str, list[str]]) -> list[str]:
+    """Add user keywords to the rules of a platform.
+
+    Returns the keys that did not match any rule.
+    """
+    unknown = []
+    for key, keywords in tables.items():
+        found = False
+        for classifier in PLATFORM_CLASSIFIERS[platform]:
+            found |= classifier.extend(key, keywords)
+        if not found:
+            unknown.append(key)
+    return unknown
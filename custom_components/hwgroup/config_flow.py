@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import secrets
 from typing import Any
 
 import voluptuous as vol
@@ -13,14 +14,41 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_DEDICATED_CONNECTION,
     CONF_DEVICE_TYPE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MQTT_COMMANDS,
+    CONF_MQTT_LIVENESS_TIMEOUT,
+    CONF_MQTT_TOPIC,
+    CONF_OPTIMISTIC_SWITCHES,
+    CONF_PUSH,
+    CONF_PUSH_TOKEN,
+    CONF_SMS_RATE_LIMIT,
+    CONF_SNMP_COMMUNITY,
+    CONF_STATISTICS_WINDOWS,
+    CONF_TRANSPORT,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MQTT_LIVENESS_TIMEOUT,
+    DEFAULT_SMS_RATE_LIMIT,
+    DEFAULT_SNMP_COMMUNITY,
+    DEFAULT_SCAN_INTERVAL,
     DEVICE_TYPES,
     DEVICE_TYPE_POSEIDON_3268,
     DOMAIN,
+    PUSH_URL,
+    TRANSPORT_HTTP,
+    TRANSPORT_MODBUS,
+    TRANSPORT_MQTT,
+    TRANSPORT_SNMP,
+    TRANSPORTS,
     CONF_DEVICE_NAME,
     CONF_INVERT_BINARY_SENSORS,
 )
-from .hwgroup import HWGroupAPI, HWGroupAuthError, HWGroupConnectionError
+from .history import parse_windows
+from .hwgroup import HWGroupAPI, HWGroupAuthError, HWGroupError
+from .modbus import HWGroupModbusAPI
+from .snmp import HWGroupSnmpAPI
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -141,6 +169,19 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
+            try:
+                parse_windows(user_input.get(CONF_STATISTICS_WINDOWS, ""))
+            except ValueError:
+                errors[CONF_STATISTICS_WINDOWS] = "invalid_statistics_windows"
+            if user_input.get(CONF_TRANSPORT) == TRANSPORT_MQTT:
+                topic = user_input.get(CONF_MQTT_TOPIC, "").strip().strip("/")
+                if not topic or "+" in topic or "#" in topic:
+                    errors[CONF_MQTT_TOPIC] = "invalid_mqtt_topic"
+                elif "mqtt" not in self.hass.config.components:
+                    errors["base"] = "mqtt_not_configured"
+                user_input[CONF_MQTT_TOPIC] = topic
+
+        if user_input is not None and not errors:
             # Validate connection with new settings
             try:
                 session = async_get_clientsession(self.hass)
@@ -160,6 +201,43 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
                 
                 # Add detected device type to user input
                 user_input[CONF_DEVICE_TYPE] = detected_type
+
+                # The first poll learns the layout over HTTP, so the second
+                # one uses the selected transport. MQTT devices publish on
+                # their own schedule and are not waited for here.
+                transport = user_input.get(CONF_TRANSPORT)
+                transport_api: HWGroupAPI | None = None
+                if transport == TRANSPORT_SNMP:
+                    transport_api = HWGroupSnmpAPI(
+                        user_input[CONF_HOST],
+                        session,
+                        user_input.get(CONF_USERNAME),
+                        user_input.get(CONF_PASSWORD),
+                        community=user_input.get(
+                            CONF_SNMP_COMMUNITY, DEFAULT_SNMP_COMMUNITY
+                        ),
+                    )
+                elif transport == TRANSPORT_MODBUS:
+                    transport_api = HWGroupModbusAPI(
+                        user_input[CONF_HOST],
+                        session,
+                        user_input.get(CONF_USERNAME),
+                        user_input.get(CONF_PASSWORD),
+                    )
+                if transport_api is not None:
+                    try:
+                        await transport_api.async_get_data()
+                        await transport_api.async_get_data()
+                    except HWGroupError as err:
+                        raise CannotConnectTransport from err
+                    finally:
+                        await transport_api.async_close()
+
+                # The push token stays valid until push is turned off
+                if user_input.get(CONF_PUSH):
+                    user_input[CONF_PUSH_TOKEN] = self.config_entry.data.get(
+                        CONF_PUSH_TOKEN
+                    ) or secrets.token_urlsafe(24)
                 
                 _LOGGER.info(
                     "Auto-detected device type: %s (Model: %s)",
@@ -173,6 +251,8 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
                 
             except CannotConnect:
                 errors["base"] = "cannot_connect"
+            except CannotConnectTransport:
+                errors["base"] = "cannot_connect_transport"
             except HWGroupAuthError:
                 errors["base"] = "invalid_auth"
             except Exception:  # pylint: disable=broad-except
@@ -185,6 +265,27 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
         current_password = self.config_entry.data.get(CONF_PASSWORD, "")
         current_device_name = self.config_entry.data.get(CONF_DEVICE_NAME, "")
         current_device_type = self.config_entry.data.get(CONF_DEVICE_TYPE, "")
+        current_adaptive = self.config_entry.data.get(CONF_ADAPTIVE_POLLING, False)
+        current_max_interval = self.config_entry.data.get(
+            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+        )
+        current_dedicated = self.config_entry.data.get(CONF_DEDICATED_CONNECTION, False)
+        current_optimistic = self.config_entry.data.get(CONF_OPTIMISTIC_SWITCHES, False)
+        current_sms_rate = self.config_entry.data.get(
+            CONF_SMS_RATE_LIMIT, DEFAULT_SMS_RATE_LIMIT
+        )
+        current_windows = self.config_entry.data.get(CONF_STATISTICS_WINDOWS, "")
+        current_push = self.config_entry.data.get(CONF_PUSH, False)
+        push_token = self.config_entry.data.get(CONF_PUSH_TOKEN)
+        current_transport = self.config_entry.data.get(CONF_TRANSPORT, TRANSPORT_HTTP)
+        current_community = self.config_entry.data.get(
+            CONF_SNMP_COMMUNITY, DEFAULT_SNMP_COMMUNITY
+        )
+        current_mqtt_topic = self.config_entry.data.get(CONF_MQTT_TOPIC, "")
+        current_mqtt_commands = self.config_entry.data.get(CONF_MQTT_COMMANDS, False)
+        current_mqtt_timeout = self.config_entry.data.get(
+            CONF_MQTT_LIVENESS_TIMEOUT, DEFAULT_MQTT_LIVENESS_TIMEOUT
+        )
 
         data_schema = vol.Schema(
             {
@@ -192,6 +293,30 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
                 vol.Optional(CONF_USERNAME, default=current_username): str,
                 vol.Optional(CONF_PASSWORD, default=current_password): str,
                 vol.Optional(CONF_DEVICE_NAME, default=current_device_name): str,
+                vol.Optional(CONF_ADAPTIVE_POLLING, default=current_adaptive): bool,
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL, default=current_max_interval
+                ): vol.All(vol.Coerce(int), vol.Range(min=DEFAULT_SCAN_INTERVAL, max=3600)),
+                vol.Optional(
+                    CONF_DEDICATED_CONNECTION, default=current_dedicated
+                ): bool,
+                vol.Optional(
+                    CONF_OPTIMISTIC_SWITCHES, default=current_optimistic
+                ): bool,
+                vol.Optional(
+                    CONF_SMS_RATE_LIMIT, default=current_sms_rate
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                vol.Optional(CONF_STATISTICS_WINDOWS, default=current_windows): str,
+                vol.Optional(CONF_PUSH, default=current_push): bool,
+                vol.Optional(CONF_TRANSPORT, default=current_transport): vol.In(
+                    TRANSPORTS
+                ),
+                vol.Optional(CONF_SNMP_COMMUNITY, default=current_community): str,
+                vol.Optional(CONF_MQTT_TOPIC, default=current_mqtt_topic): str,
+                vol.Optional(CONF_MQTT_COMMANDS, default=current_mqtt_commands): bool,
+                vol.Optional(
+                    CONF_MQTT_LIVENESS_TIMEOUT, default=current_mqtt_timeout
+                ): vol.All(vol.Coerce(int), vol.Range(min=30, max=86400)),
             }
         )
 
@@ -205,6 +330,12 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
             description_placeholders={
                 "device_name": self.config_entry.title,
                 "current_type": device_type_display,
+                "push_url": (
+                    PUSH_URL.format(entry_id=self.config_entry.entry_id)
+                    + f"?token={push_token}"
+                    if current_push and push_token
+                    else "-"
+                ),
             },
         )
 
@@ -238,7 +369,7 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
 
         # Get coordinator to fetch current binary sensors
         coordinator = self.hass.data[DOMAIN][self.config_entry.entry_id]["coordinator"]
-        binary_sensors = coordinator.data.get("binary_sensors", [])
+        binary_sensors = coordinator.data.get("binary_sensors", {})
         
         if not binary_sensors:
             # No binary sensors available, skip this step
@@ -255,7 +386,7 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
         
         # Build schema with multi-select for binary sensors
         binary_sensor_options = {
-            sensor["id"]: sensor["name"] for sensor in binary_sensors
+            sensor_id: sensor.name for sensor_id, sensor in binary_sensors.items()
         }
         
         # Import selector for multi-select
@@ -291,3 +422,7 @@ class HWGroupOptionsFlow(config_entries.OptionsFlow):
 
 class CannotConnect(Exception):
     """Error to indicate we cannot connect."""
+
+
+class CannotConnectTransport(Exception):
+    """Error to indicate the device does not answer over the selected transport."""
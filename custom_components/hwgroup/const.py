@@ -7,6 +7,20 @@ DOMAIN: Final = "hwgroup"
 CONF_DEVICE_TYPE: Final = "device_type"
 CONF_DEVICE_NAME: Final = "device_name"
 CONF_INVERT_BINARY_SENSORS: Final = "invert_binary_sensors"
+CONF_ADAPTIVE_POLLING: Final = "adaptive_polling"
+CONF_MAX_SCAN_INTERVAL: Final = "max_scan_interval"
+CONF_DEDICATED_CONNECTION: Final = "dedicated_connection"
+CONF_OPTIMISTIC_SWITCHES: Final = "optimistic_switches"
+CONF_SMS_RATE_LIMIT: Final = "sms_rate_limit"
+CONF_KEYWORDS: Final = "keywords"
+CONF_STATISTICS_WINDOWS: Final = "statistics_windows"
+CONF_PUSH: Final = "push"
+CONF_PUSH_TOKEN: Final = "push_token"
+CONF_TRANSPORT: Final = "transport"
+CONF_SNMP_COMMUNITY: Final = "snmp_community"
+CONF_MQTT_TOPIC: Final = "mqtt_topic"
+CONF_MQTT_COMMANDS: Final = "mqtt_commands"
+CONF_MQTT_LIVENESS_TIMEOUT: Final = "mqtt_liveness_timeout"
 
 # Device Types
 DEVICE_TYPE_POSEIDON_3268: Final = "poseidon_3268"
@@ -19,10 +33,73 @@ DEVICE_TYPES: Final = [
     DEVICE_TYPE_SMS_GATEWAY,
 ]
 
+# Transports used to poll the readings
+TRANSPORT_HTTP: Final = "http"
+TRANSPORT_SNMP: Final = "snmp"
+TRANSPORT_MODBUS: Final = "modbus"
+TRANSPORT_MQTT: Final = "mqtt"
+
+TRANSPORTS: Final = [
+    TRANSPORT_HTTP,
+    TRANSPORT_SNMP,
+    TRANSPORT_MODBUS,
+    TRANSPORT_MQTT,
+]
+
 # Default values
 DEFAULT_SCAN_INTERVAL: Final = 30
+DEFAULT_MIN_SCAN_INTERVAL: Final = 5
+DEFAULT_MAX_SCAN_INTERVAL: Final = 300
 DEFAULT_PORT: Final = 80
 DEFAULT_TIMEOUT: Final = 10
+DEFAULT_CONNECT_TIMEOUT: Final = 3
+DEFAULT_CONNECTIONS_PER_HOST: Final = 2
+DEFAULT_KEEPALIVE_TIMEOUT: Final = 60
+DEFAULT_DNS_CACHE_TTL: Final = 300
+DEFAULT_MAX_CONCURRENT_POLLS: Final = 8
+# Number of polls kept for the request latency statistics
+DEFAULT_STATS_WINDOW: Final = 100
+# Liveness check of devices that push their values
+DEFAULT_PUSH_LIVENESS_INTERVAL: Final = 300
+# Largest pushed document accepted, in bytes
+MAX_PUSH_SIZE: Final = 1024 * 1024
+# SNMP transport
+DEFAULT_SNMP_COMMUNITY: Final = "public"
+DEFAULT_SNMP_PORT: Final = 161
+DEFAULT_SNMP_TIMEOUT: Final = 3
+DEFAULT_SNMP_RETRIES: Final = 1
+# Rows requested per column in one GETBULK request
+DEFAULT_SNMP_MAX_REPETITIONS: Final = 25
+# Modbus/TCP transport
+DEFAULT_MODBUS_PORT: Final = 502
+DEFAULT_MODBUS_UNIT: Final = 1
+# values.xml is read again after this many seconds to refresh names and states
+DEFAULT_MODBUS_RELEARN_INTERVAL: Final = 600
+# MQTT transport: entities become unavailable after this many seconds
+# without a message
+DEFAULT_MQTT_LIVENESS_TIMEOUT: Final = 300
+# Messages arriving within this many seconds update the entities together
+MQTT_BATCH_DELAY: Final = 0.5
+# Delay before a refresh confirming optimistic switch states
+CONFIRM_REFRESH_COOLDOWN: Final = 1.0
+
+# Samples kept per sensor for the rolling statistics
+HISTORY_MAX_SAMPLES: Final = 360
+
+# Last known snapshot per entry, used to create entities at startup
+STORAGE_VERSION: Final = 1
+# Changed snapshots are written at most once per this many seconds
+STORAGE_SAVE_DELAY: Final = 60
+
+# SMS queue
+DEFAULT_SMS_RATE_LIMIT: Final = 10  # messages per minute
+DEFAULT_SMS_QUEUE_SIZE: Final = 100
+DEFAULT_SMS_MAX_RETRIES: Final = 3
+DEFAULT_SMS_RETRY_DELAY: Final = 30  # seconds, doubled per attempt
+
+# SMS gateway selection: score points lost per queued message and per error
+SMS_LOAD_PENALTY: Final = 10
+SMS_ERROR_PENALTY: Final = 25
 
 # Sensor types
 SENSOR_TYPE_TEMPERATURE: Final = "temperature"
@@ -37,3 +114,9 @@ BINARY_SENSOR_TYPE_ALARM: Final = "alarm"
 
 # Update coordinator
 UPDATE_LISTENER: Final = "update_listener"
+DATA_SCHEDULER: Final = "scheduler"
+DATA_SMS_POOL: Final = "sms_pool"
+DATA_PUSH_VIEW: Final = "push_view"
+
+# Path devices push their values.xml to
+PUSH_URL: Final = "/api/hwgroup/push/{entry_id}"
@@ -0,0 +1,357 @@
+"""Data update coordinator for the HW Group integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+import math
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    CONFIRM_REFRESH_COOLDOWN,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_PUSH_LIVENESS_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    HISTORY_MAX_SAMPLES,
+    MQTT_BATCH_DELAY,
+    STORAGE_SAVE_DELAY,
+)
+from .history import SensorHistory
+from .hwgroup import HWGroupAPI, HWGroupError, snapshot_as_dict, snapshot_from_dict
+from .snapshot import apply_inversion, snapshot_changes
+
+_LOGGER = logging.getLogger(__name__)
+
+class HWGroupDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Coordinator that only wakes entities whose readings changed.
+
+    Entities register with a ``(snapshot key, reading ID)`` context. After
+    each refresh the new snapshot is diffed against the previous one and only
+    listeners whose reading changed are called. Listeners without a context
+    are always called.
+
+    Periodic polls are driven by the integration's poll scheduler, which
+    reads ``poll_interval``; the coordinator does not schedule itself. In
+    adaptive mode the interval is halved whenever a sensor reading or binary
+    input changed and grows by half while they are stable, bounded by
+    ``DEFAULT_MIN_SCAN_INTERVAL`` and ``max_interval``.
+
+    Binary sensors listed in ``inverted`` have their state inverted once
+    per snapshot, so entities read the final state as is.
+
+    With a ``store`` the last polled snapshot is persisted, and
+    ``async_restore`` can start from it before the device answered. Until
+    the first successful poll ``restored`` is set, and that poll notifies
+    every listener.
+
+    With ``statistics_windows`` (minutes) every numeric sensor keeps a
+    ``SensorHistory`` of its recent samples in ``history``. Sensors are
+    also notified when only their rolling statistics changed.
+
+    In ``push`` mode the device delivers its values through
+    ``async_push`` and scheduled polls (``async_poll``) drop to a liveness
+    check every ``DEFAULT_PUSH_LIVENESS_INTERVAL``, which is skipped while
+    pushes arrive.
+
+    In ``stream`` mode snapshots arrive per message through
+    ``async_stream``. The listeners are notified once per burst, at most
+    ``MQTT_BATCH_DELAY`` after its first message, and scheduled polls only
+    let the API check that messages still arrive.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: HWGroupAPI,
+        name: str,
+        adaptive: bool = False,
+        max_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+        inverted: frozenset[str] = frozenset(),
+        store: Store[dict[str, Any]] | None = None,
+        statistics_windows: tuple[int, ...] = (),
+        push: bool = False,
+        stream: bool = False,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=name,
+        )
+        self.api = api
+        self.push = push
+        self.stream = stream
+        # Pushed values make adaptive polling pointless
+        self.adaptive = adaptive and not push and not stream
+        self.min_interval = timedelta(seconds=DEFAULT_MIN_SCAN_INTERVAL)
+        self.max_interval = timedelta(seconds=max(max_interval, DEFAULT_SCAN_INTERVAL))
+        self.poll_interval = timedelta(
+            seconds=DEFAULT_PUSH_LIVENESS_INTERVAL if push else DEFAULT_SCAN_INTERVAL
+        )
+        self.pushes_received = 0
+        # Monotonic time of the last pushed document
+        self.last_push_time: float | None = None
+        self.messages_received = 0
+        self.stream_batches = 0
+        # Latest streamed snapshot and the notification it is waiting for
+        self._streamed: dict[str, Any] | None = None
+        self._stream_handle: asyncio.TimerHandle | None = None
+        self.inverted = inverted
+        # API snapshot the current data was produced from
+        self._raw_data: dict[str, Any] | None = None
+        self._store = store
+        # The data is a stored snapshot, not polled since startup
+        self.restored = False
+        self.statistics_windows = statistics_windows
+        self.history: dict[str, SensorHistory] = {}
+        # Enough samples for the longest window at the fastest update rate
+        fast = adaptive or push or stream
+        sample_interval = self.min_interval if fast else self.poll_interval
+        longest = max(statistics_windows, default=0) * 60
+        samples = longest / sample_interval.total_seconds()
+        self._history_size = min(math.ceil(samples) + 1, HISTORY_MAX_SAMPLES)
+        self.last_updated_entities = 0
+        self.last_skipped_entities = 0
+        self.consecutive_failures = 0
+        # Monotonic time of the last successful poll
+        self.last_success_time: float | None = None
+        # None means every listener is notified
+        self._changed: set[tuple[str, str]] | None = None
+        # Listeners notified on the next update even if unchanged
+        self._pending: set[tuple[str, str]] = set()
+        # Rapid confirmations on the same device merge into one refresh
+        self._confirm_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=CONFIRM_REFRESH_COOLDOWN,
+            immediate=False,
+            function=self.async_refresh,
+        )
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from API."""
+        try:
+            data = await self.api.async_get_data()
+        except HWGroupError as err:
+            self.consecutive_failures += 1
+            raise UpdateFailed(f"Error communicating with device: {err}") from err
+        return self._process_data(data)
+
+    async def async_poll(self) -> None:
+        """Run a scheduled poll unless a recent push proved the device alive."""
+        if (
+            self.push
+            and self.last_push_time is not None
+            and time.monotonic() - self.last_push_time
+            < self.poll_interval.total_seconds()
+        ):
+            return
+        await self.async_refresh()
+
+    @callback
+    def async_push(self, data: dict[str, Any]) -> None:
+        """Update from a document pushed by the device."""
+        self.pushes_received += 1
+        self.last_push_time = time.monotonic()
+        self.async_set_updated_data(data)
+
+    @callback
+    def async_stream(self, data: dict[str, Any]) -> None:
+        """Update from a message, notifying the listeners once per burst."""
+        self.messages_received += 1
+        self._streamed = data
+        if self._stream_handle is None:
+            self._stream_handle = self.hass.loop.call_later(
+                MQTT_BATCH_DELAY, self._async_flush_stream
+            )
+
+    @callback
+    def _async_flush_stream(self) -> None:
+        """Hand the latest streamed snapshot to the listeners."""
+        self._stream_handle = None
+        data, self._streamed = self._streamed, None
+        if data is None:
+            return
+        self.stream_batches += 1
+        self.async_set_updated_data(data)
+
+    def _process_data(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Prepare a fresh API snapshot for the entities."""
+        self.consecutive_failures = 0
+        self.last_success_time = time.monotonic()
+        previous_raw = self._raw_data
+        data = self._apply_inversion(data)
+        if self.restored:
+            # Every entity drops the restored marker
+            self.restored = False
+            self._changed = None
+        else:
+            self._changed = self._snapshot_changes(data)
+        if self.adaptive and self._changed is not None:
+            self._adapt_poll_interval(self._changed)
+        if self.statistics_windows:
+            self._record_history(data, self.last_success_time)
+        if self._store is not None and self._raw_data is not previous_raw:
+            self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        return data
+
+    async def async_restore(self) -> bool:
+        """Use the stored snapshot until the first successful poll."""
+        if self._store is None or (stored := await self._store.async_load()) is None:
+            return False
+        # The entry may have been pointed at another device
+        if stored.get("host") != self.api.host:
+            return False
+        try:
+            raw = snapshot_from_dict(stored["snapshot"])
+        except (KeyError, TypeError) as err:
+            _LOGGER.warning("%s: ignoring invalid stored snapshot: %s", self.name, err)
+            return False
+        self.data = self._apply_inversion(raw)
+        self.restored = True
+        return True
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the snapshot to persist, before inversion."""
+        return {"host": self.api.host, "snapshot": snapshot_as_dict(self._raw_data)}
+
+    @property
+    def seconds_since_last_success(self) -> float | None:
+        """Return the time since the last successful poll."""
+        if self.last_success_time is None:
+            return None
+        return time.monotonic() - self.last_success_time
+
+    @callback
+    def async_set_updated_data(self, data: dict[str, Any]) -> None:
+        """Update from an API snapshot and notify the listeners of changed readings.
+
+        The snapshot is prepared like a polled one: inverted, recorded in
+        the history and persisted.
+        """
+        super().async_set_updated_data(self._process_data(data))
+
+    @callback
+    def async_set_inverted(self, inverted: frozenset[str]) -> None:
+        """Change the inverted binary sensors and update the affected entities."""
+        if inverted == self.inverted:
+            return
+        self.inverted = inverted
+        if self._raw_data is None:
+            return
+        raw, self._raw_data = self._raw_data, None
+        data = self._apply_inversion(raw)
+        self._changed = self._snapshot_changes(data)
+        self.data = data
+        self.async_update_listeners()
+
+    @callback
+    def async_notify_on_next_update(self, context: tuple[str, str]) -> None:
+        """Notify a listener on the next update even if its reading is unchanged."""
+        self._pending.add(context)
+
+    async def async_request_confirmation(self, context: tuple[str, str]) -> None:
+        """Request a debounced refresh that always notifies the listener."""
+        self._pending.add(context)
+        await self._confirm_debouncer.async_call()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any scheduled call, and ignore new runs."""
+        await super().async_shutdown()
+        self._confirm_debouncer.async_shutdown()
+        if self._stream_handle is not None:
+            self._stream_handle.cancel()
+            self._stream_handle = None
+        # Write a pending snapshot now instead of after the entry is gone
+        if self._store is not None and self._raw_data is not None and not self.restored:
+            await self._store.async_save(self._data_to_store())
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners whose readings changed."""
+        changed, self._changed = self._changed, None
+        if changed is not None and self._pending:
+            changed |= self._pending
+        self._pending = set()
+        if changed is None:
+            self.last_updated_entities = len(self._listeners)
+            self.last_skipped_entities = 0
+            super().async_update_listeners()
+            return
+
+        listeners = list(self._listeners.values())
+        callbacks = [
+            update_callback
+            for update_callback, context in listeners
+            if context is None or context in changed
+        ]
+        # Set the counts first, the poll statistics sensors are among the
+        # listeners and read them when they are written
+        self.last_updated_entities = len(callbacks)
+        self.last_skipped_entities = len(listeners) - len(callbacks)
+        _LOGGER.debug(
+            "%s: updated %d entities, skipped %d unchanged",
+            self.name,
+            self.last_updated_entities,
+            self.last_skipped_entities,
+        )
+        for update_callback in callbacks:
+            update_callback()
+
+    def _adapt_poll_interval(self, changed: set[tuple[str, str]]) -> None:
+        """Shorten the poll interval on activity and lengthen it while stable."""
+        if any(key != "switches" for key, _reading_id in changed):
+            interval = max(self.poll_interval / 2, self.min_interval)
+        else:
+            interval = min(self.poll_interval * 1.5, self.max_interval)
+        if interval != self.poll_interval:
+            _LOGGER.debug(
+                "%s: adaptive poll interval %.1fs -> %.1fs",
+                self.name,
+                self.poll_interval.total_seconds(),
+                interval.total_seconds(),
+            )
+            self.poll_interval = interval
+
+    def _record_history(self, data: dict[str, Any], now: float) -> None:
+        """Add the numeric sensor values of a poll to their histories."""
+        sensors = data.get("sensors", {})
+        history = self.history
+        changed = self._changed
+        for sensor_id, reading in sensors.items():
+            value = reading.value
+            if not isinstance(value, (int, float)):
+                continue
+            if (sensor_history := history.get(sensor_id)) is None:
+                sensor_history = history[sensor_id] = SensorHistory(
+                    self.statistics_windows, self._history_size
+                )
+            if sensor_history.add(now, value) and changed is not None:
+                changed.add(("sensors", sensor_id))
+        for sensor_id in history.keys() - sensors.keys():
+            del history[sensor_id]
+
+    def _apply_inversion(self, raw: dict[str, Any]) -> dict[str, Any]:
+        """Return the snapshot with the inverted binary sensor states."""
+        # An unchanged API snapshot maps to the previous result
+        if raw is self._raw_data and self.data is not None:
+            return self.data
+        previous_raw, self._raw_data = self._raw_data, raw
+        # A new inversion set always starts over, as async_set_inverted
+        # drops the raw snapshot
+        return apply_inversion(raw, self.inverted, previous_raw, self.data)
+
+    def _snapshot_changes(self, data: dict[str, Any]) -> set[tuple[str, str]] | None:
+        """Return the readings that differ from the previous snapshot."""
+        previous = self.data
+        if previous is None or not self.last_update_success:
+            return None
+        return snapshot_changes(previous, data)
@@ -0,0 +1,77 @@
+"""Diagnostics support for HW Group."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PUSH_TOKEN, CONF_SNMP_COMMUNITY, DATA_SCHEDULER, DOMAIN
+from .hwgroup import snapshot_as_dict
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, CONF_PUSH_TOKEN, CONF_SNMP_COMMUNITY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    api = data["api"]
+    coordinator = data["coordinator"]
+    layout = api.layout
+    scheduler = hass.data[DOMAIN][DATA_SCHEDULER]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "layout": asdict(layout) if layout is not None else None,
+        "connections": {
+            "created": api.connections_created,
+            "reused": api.connections_reused,
+        },
+        "transport": {
+            "type": type(api).__name__,
+            "snmp_requests": getattr(api, "snmp_requests", None),
+            "modbus_requests": getattr(api, "modbus_requests", None),
+            "modbus_connections": getattr(api, "modbus_connections", None),
+            "mqtt_messages": getattr(api, "mqtt_messages", None),
+            "mqtt_ignored": getattr(api, "mqtt_ignored", None),
+        },
+        "payload_cache": {
+            "hits": api.payload_cache_hits,
+            "misses": api.payload_cache_misses,
+        },
+        "poll_stats": {
+            "last_request_duration": api.last_request_duration,
+            "request_duration_p95": api.request_duration_p95,
+            "last_parse_duration": api.last_parse_duration,
+            "last_payload_bytes": api.last_payload_bytes,
+            "consecutive_failures": coordinator.consecutive_failures,
+            "seconds_since_last_success": coordinator.seconds_since_last_success,
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "adaptive_polling": coordinator.adaptive,
+            "poll_interval": coordinator.poll_interval.total_seconds(),
+            "last_updated_entities": coordinator.last_updated_entities,
+            "last_skipped_entities": coordinator.last_skipped_entities,
+            "push": coordinator.push,
+            "pushes_received": coordinator.pushes_received,
+            "stream": coordinator.stream,
+            "messages_received": coordinator.messages_received,
+            "stream_batches": coordinator.stream_batches,
+        },
+        "scheduler": {
+            "queue_depth": scheduler.queue_depth,
+            "in_flight": scheduler.in_flight,
+            "last_skew": scheduler.last_skew,
+            "max_skew": scheduler.max_skew,
+            "skipped_ticks": scheduler.skipped_ticks,
+        },
+        "data": (
+            snapshot_as_dict(coordinator.data) if coordinator.data is not None else None
+        ),
+    }
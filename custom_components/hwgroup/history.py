@@ -0,0 +1,182 @@
+"""Rolling statistics of recent sensor readings.
+
+Every numeric sensor keeps its latest samples in a fixed-size ring buffer
+of two float arrays (times and values). Each configured time window tracks
+running sums and monotonic min/max queues over that buffer, so adding a
+sample is amortized O(1) and the memory per sensor is bounded by the
+buffer size. This module does not import Home Assistant, so the benchmarks
+can load it on their own.
+"""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable
+import math
+
+# Decimals of the published statistics
+PRECISION = 3
+
+
+def parse_windows(text: str) -> tuple[int, ...]:
+    """Return the window lengths in minutes from a comma separated list.
+
+    Raises ValueError for anything but positive whole minutes.
+    """
+    windows = set()
+    for part in text.split(","):
+        if not (part := part.strip()):
+            continue
+        minutes = int(part)
+        if minutes <= 0:
+            raise ValueError(f"Invalid window length: {part}")
+        windows.add(minutes)
+    return tuple(sorted(windows))
+
+
+class _RollingWindow:
+    """Statistics of the samples of a history within the last ``seconds``."""
+
+    __slots__ = ("_history", "seconds", "_start", "_sum", "_sum_sq", "_min", "_max")
+
+    def __init__(self, history: SensorHistory, seconds: float) -> None:
+        """Initialize the window."""
+        self._history = history
+        self.seconds = seconds
+        # Sequence number of the oldest sample in the window
+        self._start = 0
+        # Sums of the samples relative to the history's shift
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        # Sequence numbers of the candidates for the minimum and maximum
+        self._min: deque[int] = deque()
+        self._max: deque[int] = deque()
+
+    def expire(self, seq: int, now: float) -> None:
+        """Drop the samples that leave the window when sample ``seq`` arrives.
+
+        Runs before the new sample is written, while the ring slot it
+        overwrites still holds the sample that leaves the buffer.
+        """
+        history = self._history
+        oldest = seq + 1 - history.capacity
+        limit = now - self.seconds
+        start = self._start
+        while start < seq and (start < oldest or history.time(start) < limit):
+            delta = history.value(start) - history.shift
+            self._sum -= delta
+            self._sum_sq -= delta * delta
+            if self._min[0] == start:
+                self._min.popleft()
+            if self._max[0] == start:
+                self._max.popleft()
+            start += 1
+        self._start = start
+
+    def add(self, seq: int, value: float) -> None:
+        """Add the newest sample once it is stored in the history."""
+        history = self._history
+        delta = value - history.shift
+        self._sum += delta
+        self._sum_sq += delta * delta
+        while self._min and history.value(self._min[-1]) >= value:
+            self._min.pop()
+        self._min.append(seq)
+        while self._max and history.value(self._max[-1]) <= value:
+            self._max.pop()
+        self._max.append(seq)
+
+    def resync(self, seq: int) -> None:
+        """Recompute the running sums to drop accumulated rounding errors."""
+        history = self._history
+        shift = history.shift
+        deltas = [history.value(index) - shift for index in range(self._start, seq + 1)]
+        self._sum = math.fsum(deltas)
+        self._sum_sq = math.fsum(delta * delta for delta in deltas)
+
+    def summary(self, seq: int) -> dict[str, float]:
+        """Return the statistics of the window ending at the newest sample."""
+        history = self._history
+        count = seq - self._start + 1
+        mean = self._sum / count
+        variance = max(self._sum_sq / count - mean * mean, 0.0)
+        elapsed = history.time(seq) - history.time(self._start)
+        rate = (
+            (history.value(seq) - history.value(self._start)) / elapsed * 60
+            if elapsed > 0
+            else 0.0
+        )
+        return {
+            "min": round(history.value(self._min[0]), PRECISION),
+            "max": round(history.value(self._max[0]), PRECISION),
+            "mean": round(history.shift + mean, PRECISION),
+            "stddev": round(math.sqrt(variance), PRECISION),
+            "rate": round(rate, PRECISION),
+        }
+
+
+class SensorHistory:
+    """Ring buffer of the latest samples of a sensor with rolling statistics.
+
+    ``statistics`` maps a window label such as ``15min`` to the min, max,
+    mean, population standard deviation and rate of change (per minute) of
+    the samples in that window. Windows are limited to the samples still
+    in the buffer.
+    """
+
+    __slots__ = (
+        "capacity",
+        "_times",
+        "_values",
+        "_count",
+        "shift",
+        "_windows",
+        "statistics",
+    )
+
+    def __init__(self, windows: Iterable[int], capacity: int) -> None:
+        """Initialize the history for windows given in minutes."""
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        # Number of samples ever added; the next sample's sequence number
+        self._count = 0
+        # Sums are kept relative to the first value for numeric stability
+        self.shift = 0.0
+        self._windows = {
+            f"{minutes}min": _RollingWindow(self, minutes * 60) for minutes in windows
+        }
+        self.statistics: dict[str, dict[str, float]] = {}
+
+    def time(self, seq: int) -> float:
+        """Return the time of a sample."""
+        return self._times[seq % self.capacity]
+
+    def value(self, seq: int) -> float:
+        """Return the value of a sample."""
+        return self._values[seq % self.capacity]
+
+    def add(self, now: float, value: float) -> bool:
+        """Add a sample and return whether the statistics changed."""
+        seq = self._count
+        if not seq:
+            self.shift = value
+        windows = self._windows
+        for window in windows.values():
+            window.expire(seq, now)
+        index = seq % self.capacity
+        self._times[index] = now
+        self._values[index] = value
+        self._count += 1
+
+        resync = index == self.capacity - 1
+        statistics = {}
+        for label, window in windows.items():
+            window.add(seq, value)
+            if resync:
+                window.resync(seq)
+            statistics[label] = window.summary(seq)
+        if statistics == self.statistics:
+            return False
+        self.statistics = statistics
+        return True
@@ -2,12 +2,31 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from typing import Any
 from xml.etree import ElementTree
 
 import aiohttp
 
+from .const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_CONNECTIONS_PER_HOST,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_STATS_WINDOW,
+    DEFAULT_TIMEOUT,
+    DEVICE_TYPE_POSEIDON_3266,
+    DEVICE_TYPE_POSEIDON_3268,
+    DEVICE_TYPE_SMS_GATEWAY,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -23,36 +42,635 @@ class HWGroupAuthError(HWGroupError):
     """Exception for authentication errors."""
 
 
+@dataclass(frozen=True, slots=True)
+class ReadingMeta:
+    """Static metadata of a reading, shared by all polls of a device."""
+
+    id: str
+    name: str
+    unit: str = ""
+    type: str = "generic"
+
+
+class _Reading:
+    """Accessors for the static metadata of a reading."""
+
+    __slots__ = ()
+
+    @property
+    def id(self) -> str:
+        """Return the ID of the entry."""
+        return self.meta.id
+
+    @property
+    def name(self) -> str:
+        """Return the name of the entry."""
+        return self.meta.name
+
+
+@dataclass(frozen=True, slots=True)
+class SensorReading(_Reading):
+    """Value of a sensor in one poll."""
+
+    meta: ReadingMeta
+    value: float | int | str | None
+    state: str = "0"
+
+    @property
+    def unit(self) -> str:
+        """Return the unit of the sensor."""
+        return self.meta.unit
+
+    @property
+    def type(self) -> str:
+        """Return the sensor type derived from the unit."""
+        return self.meta.type
+
+
+@dataclass(frozen=True, slots=True)
+class BinarySensorReading(_Reading):
+    """State of a binary input in one poll."""
+
+    meta: ReadingMeta
+    state: bool
+    alarm_state: str = "0"
+
+    @property
+    def type(self) -> str:
+        """Return the binary sensor type."""
+        return self.meta.type
+
+
+@dataclass(frozen=True, slots=True)
+class OutputReading(_Reading):
+    """State of an output/relay in one poll."""
+
+    meta: ReadingMeta
+    state: bool
+
+
+Reading = SensorReading | BinarySensorReading | OutputReading
+
+# Snapshot keys holding readings and their reading types
+READING_TYPES: dict[str, type[Reading]] = {
+    "sensors": SensorReading,
+    "binary_sensors": BinarySensorReading,
+    "switches": OutputReading,
+}
+
+
+def snapshot_as_dict(data: dict[str, Any]) -> dict[str, Any]:
+    """Return a snapshot with plain dicts instead of readings."""
+    return {
+        key: (
+            {reading_id: asdict(reading) for reading_id, reading in value.items()}
+            if key in READING_TYPES
+            else value
+        )
+        for key, value in data.items()
+    }
+
+
+def snapshot_from_dict(data: dict[str, Any]) -> dict[str, Any]:
+    """Return a snapshot exported by snapshot_as_dict with readings again."""
+    snapshot = dict(data)
+    for key, reading_type in READING_TYPES.items():
+        snapshot[key] = {
+            reading_id: reading_type(
+                **{**reading, "meta": ReadingMeta(**reading["meta"])}
+            )
+            for reading_id, reading in data.get(key, {}).items()
+        }
+    return snapshot
+
+
+@dataclass
+class DeviceLayout:
+    """Static layout of a device learned from a full values.xml parse.
+
+    Holds the metadata of every entry (ID, name, unit and sensor type) that
+    does not change between polls, so later polls only need to extract
+    Value/State and the metadata objects are shared by all snapshots.
+    """
+
+    serial: str
+    version: str | None
+    model: str | None
+    device_type: str
+    # Snapshot key -> entry ID -> metadata of the reading
+    sets: dict[str, dict[str, ReadingMeta]] = field(default_factory=dict)
+
+
+def _child_text(
+    entry: ElementTree.Element, tag: str, default: str | None = None
+) -> str | None:
+    """Return the text of a child element as the full parse reads it.
+
+    Unlike ``findtext`` an empty element gives None, not an empty string;
+    ``default`` is only returned if the element is missing.
+    """
+    elem = entry.find(tag)
+    return default if elem is None else elem.text
+
+
+def _fast_sensor(
+    meta: ReadingMeta, entry: ElementTree.Element, previous: SensorReading | None
+) -> SensorReading:
+    """Build a sensor reading, reusing the previous one if it is unchanged."""
+    value = _child_text(entry, "Value")
+    if value:
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+    state = _child_text(entry, "State", "0")
+    if (
+        previous is not None
+        and previous.meta is meta
+        and previous.value == value
+        and previous.state == state
+    ):
+        return previous
+    return SensorReading(meta, value, state)
+
+
+def _fast_binary_sensor(
+    meta: ReadingMeta,
+    entry: ElementTree.Element,
+    previous: BinarySensorReading | None,
+) -> BinarySensorReading:
+    """Build a binary sensor reading, reusing the previous one if it is unchanged."""
+    state = entry.findtext("Value") == "1"
+    alarm_state = _child_text(entry, "State", "0")
+    if (
+        previous is not None
+        and previous.meta is meta
+        and previous.state == state
+        and previous.alarm_state == alarm_state
+    ):
+        return previous
+    return BinarySensorReading(meta, state, alarm_state)
+
+
+def _fast_output(
+    meta: ReadingMeta, entry: ElementTree.Element, previous: OutputReading | None
+) -> OutputReading:
+    """Build an output reading, reusing the previous one if it is unchanged."""
+    state = entry.findtext("Value") == "1"
+    if previous is not None and previous.meta is meta and previous.state == state:
+        return previous
+    return OutputReading(meta, state)
+
+
+_FAST_PARSERS: dict[
+    str, Callable[[ReadingMeta, ElementTree.Element, Any], Reading]
+] = {
+    "sensors": _fast_sensor,
+    "binary_sensors": _fast_binary_sensor,
+    "switches": _fast_output,
+}
+
+
+def build_snapshot(
+    columns: dict[str, dict[str, list[Any]]],
+    layout: DeviceLayout,
+    previous: dict[str, Any],
+) -> dict[str, Any] | None:
+    """Build a snapshot from value columns on a learned device layout.
+
+    Used by the transports that only read values and states, not the
+    metadata in values.xml. Sensors are matched by their ``id`` column,
+    inputs and outputs by their position, which follows the order of
+    values.xml. Sensor values are in tenths. Unchanged readings and, if
+    nothing changed, the whole previous snapshot are reused. Returns None
+    if the columns do not match the layout.
+    """
+    data: dict[str, Any] = {"device_info": previous["device_info"]}
+    changed = False
+
+    sensors = columns["sensors"]
+    known = layout.sets.get("sensors", {})
+    if {len(values) for values in sensors.values()} != {len(known)}:
+        return None
+    old_readings = previous["sensors"]
+    readings = data["sensors"] = {}
+    for sensor_id, value, state in zip(sensors["id"], sensors["value"], sensors["state"]):
+        if (meta := known.get(str(sensor_id))) is None:
+            return None
+        value = value / 10
+        state = str(state)
+        old = old_readings.get(meta.id)
+        if (
+            old is not None
+            and old.meta is meta
+            and old.value == value
+            and old.state == state
+        ):
+            readings[meta.id] = old
+            continue
+        readings[meta.id] = SensorReading(meta, value, state)
+        changed = True
+
+    inputs = columns["binary_sensors"]
+    known = layout.sets.get("binary_sensors", {})
+    if {len(values) for values in inputs.values()} != {len(known)}:
+        return None
+    old_readings = previous["binary_sensors"]
+    readings = data["binary_sensors"] = {}
+    for meta, value, alarm_state in zip(
+        known.values(), inputs["value"], inputs["alarm_state"]
+    ):
+        state = value == 1
+        alarm_state = str(alarm_state)
+        old = old_readings.get(meta.id)
+        if (
+            old is not None
+            and old.meta is meta
+            and old.state == state
+            and old.alarm_state == alarm_state
+        ):
+            readings[meta.id] = old
+            continue
+        readings[meta.id] = BinarySensorReading(meta, state, alarm_state)
+        changed = True
+
+    outputs = columns["switches"]
+    known = layout.sets.get("switches", {})
+    if len(outputs["value"]) != len(known):
+        return None
+    old_readings = previous["switches"]
+    readings = data["switches"] = {}
+    for meta, value in zip(known.values(), outputs["value"]):
+        state = value == 1
+        old = old_readings.get(meta.id)
+        if old is not None and old.meta is meta and old.state == state:
+            readings[meta.id] = old
+            continue
+        readings[meta.id] = OutputReading(meta, state)
+        changed = True
+
+    if not changed and all(
+        data[key].keys() == previous[key].keys()
+        for key in ("sensors", "binary_sensors", "switches")
+    ):
+        return previous
+    return data
+
+
+# Readings added from the status.xml of SMS Gateways
+_SMS_STATUS_META: dict[str, ReadingMeta] = {
+    meta.id: meta
+    for meta in (
+        ReadingMeta("signal_strength", "Signal Strength", "dBm", "signal_strength"),
+        ReadingMeta("signal_quality", "Signal Quality", "%"),
+        ReadingMeta("network_operator", "Network Operator"),
+        ReadingMeta("network_status", "Network Status"),
+        ReadingMeta("sms_sent", "SMS Sent"),
+        ReadingMeta("sms_errors", "SMS Errors"),
+    )
+}
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag name."""
+    return tag.rpartition("}")[2]
+
+
+class HWGroupValuesParser:
+    """Parser for values.xml documents.
+
+    The document is fed as bytes to the C tree builder, without decoding
+    it to str first. Polls read the whole response and feed it only once
+    the payload hash shows the document changed, so nothing is parsed
+    while the response arrives. On close the complete tree is walked once:
+    the Agent, SenSet, BinaryInSet and OutputSet elements are dispatched
+    to their handlers and cleared after use. Namespaced (Poseidon) and
+    plain documents are handled alike by matching on local tag names.
+
+    When the API has a learned layout for the device serial and the firmware
+    version is unchanged, sets take a fast path that only extracts Value and
+    State per known ID. Any unknown ID or changed entry count falls back to a
+    full parse and the layout is learned again.
+
+    On the fast path every unchanged reading, the device info and, if
+    nothing changed at all, the whole snapshot of the previous poll are
+    reused instead of building new objects.
+    """
+
+    # Maps the set element to the snapshot key and the API parse method
+    SECTIONS: dict[str, tuple[str, str]] = {
+        "SenSet": ("sensors", "_parse_sensor"),
+        "BinaryInSet": ("binary_sensors", "_parse_binary_sensor"),
+        "OutputSet": ("switches", "_parse_output"),
+    }
+
+    def __init__(self, api: HWGroupAPI) -> None:
+        """Initialize the parser."""
+        self._api = api
+        self._parser = ElementTree.XMLParser()
+        self._layout: DeviceLayout | None = None
+        self._relearn = False
+        # Snapshot of the previous poll of the same device, if any
+        self._previous: dict[str, Any] | None = None
+        self._changed = False
+        self.data: dict[str, Any] = {
+            "device_info": {},
+            "sensors": {},
+            "binary_sensors": {},
+            "switches": {},
+        }
+        self._handlers: dict[str, Callable[[ElementTree.Element], None]] = {
+            "Agent": self._handle_agent,
+        }
+        for tag, (key, method) in self.SECTIONS.items():
+            self._handlers[tag] = partial(
+                self._handle_set, key, getattr(api, method)
+            )
+
+    def feed(self, chunk: str | bytes) -> None:
+        """Feed a chunk of the document to the parser."""
+        try:
+            self._parser.feed(chunk)
+        except ElementTree.ParseError as err:
+            raise HWGroupError(f"Failed to parse XML data: {err}") from err
+
+    def close(self) -> dict[str, Any]:
+        """Finish parsing and return the snapshot."""
+        try:
+            root = self._parser.close()
+        except ElementTree.ParseError as err:
+            raise HWGroupError(f"Failed to parse XML data: {err}") from err
+
+        handlers = self._handlers
+        pending = [root]
+        while pending:
+            for elem in pending.pop():
+                tag = elem.tag
+                if tag[0] == "{":
+                    tag = _local_name(tag)
+                if (handler := handlers.get(tag)) is not None:
+                    handler(elem)
+                    # Release the consumed element
+                    elem.clear()
+                elif len(elem):
+                    # Sets may be wrapped in container elements
+                    pending.append(elem)
+
+        layout = self._layout
+        if layout is not None and not self._relearn:
+            # A set that disappeared from the document changes the layout too
+            self._relearn = any(
+                self.data[key].keys() != known.keys()
+                for key, known in layout.sets.items()
+            )
+        if self._relearn or (layout is None and self.data["device_info"]):
+            self._api._learn_layout(self.data)
+        elif self._previous is not None and not self._changed:
+            # Nothing changed, hand out the previous snapshot as is
+            return self._previous
+
+        _LOGGER.debug("Device info: %s", self.data["device_info"])
+        self._api._snapshot = self.data
+        return self.data
+
+    def _handle_agent(self, elem: ElementTree.Element) -> None:
+        """Parse device information from the Agent element."""
+        api = self._api
+        device_info = api._parse_agent(elem, api.layout)
+        layout = api._layouts.get(device_info["serial"])
+        if layout is not None and layout.version != device_info["version"]:
+            _LOGGER.debug("Firmware version changed, relearning device layout")
+            layout = None
+            self._relearn = True
+        self._layout = layout
+
+        previous = api._snapshot
+        if layout is not None and previous is not None and (
+            previous["device_info"].get("serial") == device_info["serial"]
+        ):
+            self._previous = previous
+            if previous["device_info"] == device_info:
+                device_info = previous["device_info"]
+        if self._previous is None or device_info is not self._previous["device_info"]:
+            self._changed = True
+        self.data["device_info"] = device_info
+
+    def _handle_set(
+        self,
+        key: str,
+        parse: Callable[[ElementTree.Element], Reading | None],
+        elem: ElementTree.Element,
+    ) -> None:
+        """Parse all entries of a set element."""
+        readings = self.data[key]
+        if self._layout is not None and not self._relearn:
+            if self._fast_parse_set(key, elem, self._layout.sets.get(key)):
+                return
+            _LOGGER.debug("Layout of %s changed, relearning device layout", key)
+            self._relearn = True
+            readings.clear()
+        self._changed = True
+
+        for entry in elem.iterfind("Entry"):
+            reading = parse(entry)
+            if reading:
+                _LOGGER.debug("Found entry: %s", reading)
+                readings[reading.id] = reading
+
+    def _fast_parse_set(
+        self,
+        key: str,
+        elem: ElementTree.Element,
+        known: dict[str, ReadingMeta] | None,
+    ) -> bool:
+        """Extract only the changing fields of a set with a known layout."""
+        if known is None:
+            return False
+        readings = self.data[key]
+        previous = self._previous[key] if self._previous is not None else {}
+        build = _FAST_PARSERS[key]
+        changed = False
+        for entry in elem.iterfind("Entry"):
+            meta = known.get(entry.findtext("ID"))
+            if meta is None:
+                return False
+            old = previous.get(meta.id)
+            reading = readings[meta.id] = build(meta, entry, old)
+            changed = changed or reading is not old
+        if changed or len(previous) != len(known):
+            self._changed = True
+        return len(readings) == len(known)
+
+
 class HWGroupAPI:
-    """API client for HW Group devices."""
+    """API client for HW Group devices.
+
+    Without a session the client owns a dedicated keep-alive connection pool
+    for its host, which must be released with ``async_close``.
+    """
 
     def __init__(
         self,
         host: str,
-        session: aiohttp.ClientSession,
+        session: aiohttp.ClientSession | None,
         username: str | None = None,
         password: str | None = None,
         port: int = 80,
-        timeout: int = 10,
+        timeout: int = DEFAULT_TIMEOUT,
+        connect_timeout: int = DEFAULT_CONNECT_TIMEOUT,
     ) -> None:
         """Initialize the API client."""
         self.host = host
         self.port = port
-        self.session = session
         self.username = username
         self.password = password
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        # Separate limits for establishing the connection and reading the reply
+        self.timeout = aiohttp.ClientTimeout(
+            total=None, connect=connect_timeout, sock_read=timeout
+        )
+        self.connections_created = 0
+        self.connections_reused = 0
+        self._owns_session = session is None
+        self.session = session if session is not None else self._create_session()
         self._auth = None
         if username and password:
             self._auth = aiohttp.BasicAuth(username, password)
+        # Learned device layouts keyed by serial number
+        self._layouts: dict[str, DeviceLayout] = {}
+        self._serial: str | None = None
+        # Latest snapshot produced by the values.xml parser
+        self._snapshot: dict[str, Any] | None = None
+        # Device type detected by the previous poll
+        self._device_type: str | None = None
+        # Digest of the last raw values.xml and the snapshot parsed from it
+        self._values_digest: bytes | None = None
+        self._values_data: dict[str, Any] | None = None
+        # status.xml readings of the last SMS Gateway poll
+        self._status_sensors: dict[str, SensorReading] = {}
+        # Values snapshot and merged snapshot of the last SMS Gateway poll
+        self._gateway_values: dict[str, Any] | None = None
+        self._gateway_data: dict[str, Any] | None = None
+        self.payload_cache_hits = 0
+        self.payload_cache_misses = 0
+        # Timings of the latest values.xml polls, in seconds
+        self.last_request_duration: float | None = None
+        self.last_parse_duration: float | None = None
+        self.last_payload_bytes: int | None = None
+        self._request_durations: deque[float] = deque(maxlen=DEFAULT_STATS_WINDOW)
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session with a dedicated keep-alive pool for this host."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        connector = aiohttp.TCPConnector(
+            limit_per_host=DEFAULT_CONNECTIONS_PER_HOST,
+            keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+            use_dns_cache=True,
+            ttl_dns_cache=DEFAULT_DNS_CACHE_TTL,
+        )
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        """Count a newly established connection."""
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        """Count a request served over a kept-alive connection."""
+        self.connections_reused += 1
+
+    async def async_close(self) -> None:
+        """Close the dedicated session, if the client owns one."""
+        if self._owns_session:
+            await self.session.close()
 
     @property
     def base_url(self) -> str:
         """Return the base URL for the device."""
         return f"http://{self.host}:{self.port}"
 
+    @property
+    def layout(self) -> DeviceLayout | None:
+        """Return the learned layout of the device, if any."""
+        return self._layouts.get(self._serial)
+
+    @property
+    def request_duration_p95(self) -> float | None:
+        """Return the 95th percentile request duration of the recent polls."""
+        if not self._request_durations:
+            return None
+        durations = sorted(self._request_durations)
+        return durations[math.ceil(len(durations) * 0.95) - 1]
+
     async def async_get_data(self) -> dict[str, Any]:
         """Get data from the device."""
+        # Once the device is known to be an SMS Gateway, fetch status.xml
+        # concurrently with values.xml instead of after it
+        status_task = None
+        if self._device_type == DEVICE_TYPE_SMS_GATEWAY:
+            status_task = asyncio.create_task(self._async_get_sms_gateway_status())
+
+        try:
+            data = await self._async_get_values()
+        except BaseException:
+            if status_task is not None:
+                status_task.cancel()
+            raise
+
+        # For SMS Gateway, also fetch status.xml for additional sensors
+        device_type = data["device_info"].get("device_type")
+        _LOGGER.debug("Device type: %s", device_type)
+        self._device_type = device_type
+        if device_type == DEVICE_TYPE_SMS_GATEWAY:
+            if status_task is None:
+                status_xml = await self._async_get_sms_gateway_status()
+            else:
+                status_xml = await status_task
+            data = self._merge_sms_gateway_status(data, status_xml)
+        elif status_task is not None:
+            status_task.cancel()
+
+        _LOGGER.info("Parsed data: %d sensors, %d binary_sensors, %d switches", 
+                    len(data["sensors"]), len(data["binary_sensors"]), len(data["switches"]))
+        return data
+
+    def _merge_sms_gateway_status(
+        self, values: dict[str, Any], status_xml: str | None
+    ) -> dict[str, Any]:
+        """Add the status.xml readings to a values snapshot of an SMS Gateway.
+
+        Unchanged status readings are reused, and so is the previous merged
+        snapshot if neither the values snapshot nor the status changed.
+        """
+        # Keep the cached values snapshot untouched
+        data = {**values, "sensors": dict(values["sensors"])}
+        if status_xml is not None:
+            self._parse_sms_gateway_status(status_xml, data)
+        sensors = data["sensors"]
+        status_sensors = {}
+        changed = values is not self._gateway_values
+        for key in _SMS_STATUS_META:
+            if key not in sensors:
+                continue
+            old = self._status_sensors.get(key)
+            if old is not None and old == sensors[key]:
+                sensors[key] = old
+            else:
+                changed = True
+            status_sensors[key] = sensors[key]
+        if len(status_sensors) != len(self._status_sensors):
+            changed = True
+
+        if not changed and self._gateway_data is not None:
+            return self._gateway_data
+        self._status_sensors = status_sensors
+        self._gateway_values = values
+        self._gateway_data = data
+        return data
+
+    async def _async_get_values(self) -> dict[str, Any]:
+        """Fetch and parse values.xml."""
+        start = time.perf_counter()
         try:
             # HW Group devices typically use XML API
             async with self.session.get(
@@ -67,114 +685,147 @@ class HWGroupAPI:
                         f"HTTP error {response.status}"
                     )
                 
-                xml_data = await response.text()
-                data = self._parse_xml_data(xml_data)
-                
-                # For SMS Gateway, also fetch status.xml for additional sensors
-                device_type = data["device_info"].get("device_type")
-                _LOGGER.debug("Device type: %s", device_type)
-                if device_type == "sms_gateway":
-                    _LOGGER.debug("Fetching SMS Gateway status from status.xml")
-                    try:
-                        async with self.session.get(
-                            f"{self.base_url}/status.xml",
-                            auth=self._auth,
-                            timeout=self.timeout,
-                        ) as status_response:
-                            if status_response.status == 200:
-                                status_xml = await status_response.text()
-                                _LOGGER.debug("Got status.xml: %s", status_xml[:200])
-                                self._parse_sms_gateway_status(status_xml, data)
-                            else:
-                                _LOGGER.warning("status.xml returned status %s", status_response.status)
-                    except Exception as err:
-                        _LOGGER.warning("Could not fetch SMS Gateway status: %s", err)
-                
-                _LOGGER.info("Parsed data: %d sensors, %d binary_sensors, %d switches", 
-                            len(data["sensors"]), len(data["binary_sensors"]), len(data["switches"]))
-                return data
+                # Hash the raw document while reading it. The chunks are
+                # buffered and only fed to the parser once the whole
+                # document is known to differ from the previous one, so an
+                # unchanged document is never tokenized but a changed one
+                # is no longer parsed while it arrives.
+                chunks = []
+                digest = hashlib.blake2b(digest_size=16)
+                payload_bytes = 0
+                async for chunk in response.content.iter_any():
+                    digest.update(chunk)
+                    chunks.append(chunk)
+                    payload_bytes += len(chunk)
         except aiohttp.ClientError as err:
             raise HWGroupConnectionError(f"Connection error: {err}") from err
         except asyncio.TimeoutError as err:
             raise HWGroupConnectionError("Connection timeout") from err
 
-    def _parse_xml_data(self, xml_data: str) -> dict[str, Any]:
-        """Parse XML data from the device."""
+        self.last_request_duration = time.perf_counter() - start
+        self._request_durations.append(self.last_request_duration)
+        self.last_payload_bytes = payload_bytes
+        return self._parse_values(chunks, digest.digest())
+
+    def parse_pushed_values(self, payload: bytes) -> dict[str, Any]:
+        """Parse a values.xml document pushed by the device.
+
+        Pushed documents share the parser and payload cache with polls. SMS
+        Gateways keep the status.xml readings of the last poll.
+        """
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        data = self._parse_values([payload], digest)
+        self._device_type = data["device_info"].get("device_type")
+        if self._device_type == DEVICE_TYPE_SMS_GATEWAY and self._status_sensors:
+            data = {**data, "sensors": {**data["sensors"], **self._status_sensors}}
+        return data
+
+    def _parse_values(self, chunks: list[bytes], digest: bytes) -> dict[str, Any]:
+        """Parse a values.xml document unless it is the previous one."""
+        # Reuse the previous snapshot if the payload is byte-identical
+        if self._values_data is not None and digest == self._values_digest:
+            self.payload_cache_hits += 1
+            self.last_parse_duration = 0.0
+            return self._values_data
+
+        self.payload_cache_misses += 1
+        parse_start = time.perf_counter()
+        parser = HWGroupValuesParser(self)
+        for chunk in chunks:
+            parser.feed(chunk)
+        data = parser.close()
+        self.last_parse_duration = time.perf_counter() - parse_start
+        self._values_digest = digest
+        self._values_data = data
+        return data
+
+    async def _async_get_sms_gateway_status(self) -> str | None:
+        """Fetch status.xml from an SMS Gateway.
+
+        Failures are logged and never fail the update.
+        """
+        _LOGGER.debug("Fetching SMS Gateway status from status.xml")
         try:
-            _LOGGER.debug("Parsing XML data: %s", xml_data[:500])  # Log first 500 chars
-            root = ElementTree.fromstring(xml_data)
-            
-            # Handle XML namespace (Poseidon devices)
-            namespace = {"val": "http://www.etech.cz/XMLSchema/poseidon/values.xsd"}
-            
-            data = {
-                "device_info": {},
-                "sensors": [],
-                "binary_sensors": [],
-                "switches": [],
-            }
-
-            # Parse device information from Agent element
-            # Poseidon devices use different structure than SMS Gateway
-            agent = root.find(".//Agent") or root.find(".//val:Agent", namespace)
-            if agent is not None:
-                device_name = agent.find("DeviceName")
-                version = agent.find("Version")
-                title = agent.find("Title")
-                product_name = agent.find("ProductName")
-                serial = agent.find("SerialNumber")
-                model = agent.find("Model")
-                
-                # Handle both Poseidon (uses Title) and SMS Gateway (uses ProductName)
-                if title is not None:
-                    model_text = title.text
-                elif product_name is not None:
-                    model_text = product_name.text
-                else:
-                    model_text = "Unknown"
-                
-                data["device_info"] = {
-                    "name": device_name.text if device_name is not None else (model_text if product_name is not None else "HW Group Device"),
-                    "version": version.text if version is not None else "Unknown",
-                    "model": model_text,
-                    "serial": serial.text if serial is not None else "Unknown",
-                    "device_type": self._detect_device_type(model_text),
-                }
-            _LOGGER.debug("Device info: %s", data["device_info"])
-
-            # Parse sensors from SenSet (temperature, humidity, etc.)
-            senset = root.find(".//SenSet") or root.find(".//val:SenSet", namespace)
-            if senset is not None:
-                for sensor in senset.findall("Entry"):
-                    sensor_data = self._parse_sensor(sensor)
-                    if sensor_data:
-                        _LOGGER.debug("Found sensor: %s", sensor_data)
-                        data["sensors"].append(sensor_data)
-
-            # Parse binary inputs from BinaryInSet (contacts, alarms)
-            binaryset = root.find(".//BinaryInSet") or root.find(".//val:BinaryInSet", namespace)
-            if binaryset is not None:
-                for binary in binaryset.findall("Entry"):
-                    binary_data = self._parse_binary_sensor(binary)
-                    if binary_data:
-                        _LOGGER.debug("Found binary sensor: %s", binary_data)
-                        data["binary_sensors"].append(binary_data)
-
-            # Parse outputs/relays (if device has them)
-            outputset = root.find(".//OutputSet") or root.find(".//val:OutputSet", namespace)
-            if outputset is not None:
-                for output in outputset.findall("Entry"):
-                    output_data = self._parse_output(output)
-                    if output_data:
-                        _LOGGER.debug("Found switch: %s", output_data)
-                        data["switches"].append(output_data)
-
-            return data
+            async with self.session.get(
+                f"{self.base_url}/status.xml",
+                auth=self._auth,
+                timeout=self.timeout,
+            ) as status_response:
+                if status_response.status == 200:
+                    status_xml = await status_response.text()
+                    _LOGGER.debug("Got status.xml: %s", status_xml[:200])
+                    return status_xml
+                _LOGGER.warning("status.xml returned status %s", status_response.status)
+        except Exception as err:
+            _LOGGER.warning("Could not fetch SMS Gateway status: %s", err)
+        return None
 
-        except ElementTree.ParseError as err:
-            raise HWGroupError(f"Failed to parse XML data: {err}") from err
+    def _parse_xml_data(self, xml_data: str | bytes) -> dict[str, Any]:
+        """Parse a complete values.xml document."""
+        _LOGGER.debug("Parsing XML data: %s", xml_data[:500])  # Log first 500 chars
+        parser = HWGroupValuesParser(self)
+        parser.feed(xml_data)
+        return parser.close()
+
+    def _parse_agent(
+        self, agent: ElementTree.Element, layout: DeviceLayout | None = None
+    ) -> dict[str, Any]:
+        """Parse device information from the Agent element."""
+        # Poseidon devices use different structure than SMS Gateway
+        device_name = agent.find("DeviceName")
+        version = agent.find("Version")
+        title = agent.find("Title")
+        product_name = agent.find("ProductName")
+        serial = agent.find("SerialNumber")
+
+        # Handle both Poseidon (uses Title) and SMS Gateway (uses ProductName)
+        if title is not None:
+            model_text = title.text
+        elif product_name is not None:
+            model_text = product_name.text
+        else:
+            model_text = "Unknown"
+
+        # Reuse the classification from the learned layout
+        if layout is not None and layout.model == model_text:
+            device_type = layout.device_type
+        else:
+            device_type = self._detect_device_type(model_text)
+
+        return {
+            "name": device_name.text if device_name is not None else (model_text if product_name is not None else "HW Group Device"),
+            "version": version.text if version is not None else "Unknown",
+            "model": model_text,
+            "serial": serial.text if serial is not None else "Unknown",
+            "device_type": device_type,
+        }
+
+    def _learn_layout(self, data: dict[str, Any]) -> None:
+        """Learn the static layout of the device from a full parse."""
+        device_info = data["device_info"]
+        layout = DeviceLayout(
+            serial=device_info.get("serial", "Unknown"),
+            version=device_info.get("version"),
+            model=device_info.get("model"),
+            device_type=device_info.get("device_type"),
+        )
+        # Keep the metadata objects of entries that did not change
+        previous = self._layouts.get(layout.serial)
+        for key in READING_TYPES:
+            known = previous.sets.get(key, {}) if previous is not None else {}
+            metas = layout.sets[key] = {}
+            for reading_id, reading in data[key].items():
+                meta = known.get(reading_id)
+                metas[reading_id] = meta if meta == reading.meta else reading.meta
+        _LOGGER.debug(
+            "Learned layout for %s: %s",
+            layout.serial,
+            {key: len(known) for key, known in layout.sets.items()},
+        )
+        self._layouts[layout.serial] = layout
+        self._serial = layout.serial
 
-    def _parse_sensor(self, sensor: ElementTree.Element) -> dict[str, Any] | None:
+    def _parse_sensor(self, sensor: ElementTree.Element) -> SensorReading | None:
         """Parse a sensor element from Entry."""
         try:
             id_elem = sensor.find("ID")
@@ -199,19 +850,20 @@ class HWGroupAPI:
 
             unit_text = unit_elem.text if unit_elem is not None else ""
             
-            return {
-                "id": sensor_id,
-                "name": name,
-                "value": sensor_value,
-                "unit": unit_text,
-                "state": state_elem.text if state_elem is not None else "0",
-                "type": self._determine_sensor_type(unit_text),
-            }
+            return SensorReading(
+                ReadingMeta(
+                    sensor_id, name, unit_text, self._determine_sensor_type(unit_text)
+                ),
+                sensor_value,
+                state_elem.text if state_elem is not None else "0",
+            )
         except (AttributeError, ValueError) as err:
             _LOGGER.debug("Failed to parse sensor: %s", err)
             return None
 
-    def _parse_binary_sensor(self, binary: ElementTree.Element) -> dict[str, Any] | None:
+    def _parse_binary_sensor(
+        self, binary: ElementTree.Element
+    ) -> BinarySensorReading | None:
         """Parse a binary sensor element from Entry."""
         try:
             id_elem = binary.find("ID")
@@ -229,18 +881,16 @@ class HWGroupAPI:
             value_text = value_elem.text
             is_on = value_text == "1" if value_text else False
 
-            return {
-                "id": binary_id,
-                "name": name,
-                "state": is_on,
-                "alarm_state": state_elem.text if state_elem is not None else "0",
-                "type": "contact",
-            }
+            return BinarySensorReading(
+                ReadingMeta(binary_id, name, type="contact"),
+                is_on,
+                state_elem.text if state_elem is not None else "0",
+            )
         except (AttributeError, ValueError) as err:
             _LOGGER.debug("Failed to parse binary sensor: %s", err)
             return None
 
-    def _parse_output(self, output: ElementTree.Element) -> dict[str, Any] | None:
+    def _parse_output(self, output: ElementTree.Element) -> OutputReading | None:
         """Parse an output/relay element from Entry."""
         try:
             id_elem = output.find("ID")
@@ -257,11 +907,7 @@ class HWGroupAPI:
             value_text = value_elem.text
             is_on = value_text == "1" if value_text else False
 
-            return {
-                "id": output_id,
-                "name": name,
-                "state": is_on,
-            }
+            return OutputReading(ReadingMeta(output_id, name), is_on)
         except (AttributeError, ValueError) as err:
             _LOGGER.debug("Failed to parse output: %s", err)
             return None
@@ -281,12 +927,6 @@ class HWGroupAPI:
 
     def _detect_device_type(self, model: str) -> str:
         """Detect device type from model string."""
-        from .const import (
-            DEVICE_TYPE_POSEIDON_3268,
-            DEVICE_TYPE_POSEIDON_3266,
-            DEVICE_TYPE_SMS_GATEWAY,
-        )
-        
         model_lower = model.lower()
         
         # Check for SMS Gateway first (most specific)
@@ -318,14 +958,9 @@ class HWGroupAPI:
                 if "dBm" in dbm_text:
                     dbm_value = dbm_text.split("dBm")[0].strip()
                     try:
-                        data["sensors"].append({
-                            "id": "signal_strength",
-                            "name": "Signal Strength",
-                            "value": float(dbm_value),
-                            "unit": "dBm",
-                            "state": "0",
-                            "type": "signal_strength",
-                        })
+                        data["sensors"]["signal_strength"] = SensorReading(
+                            _SMS_STATUS_META["signal_strength"], float(dbm_value)
+                        )
                     except ValueError:
                         pass
                     
@@ -333,67 +968,42 @@ class HWGroupAPI:
                     if "(" in dbm_text and "%" in dbm_text:
                         percent_text = dbm_text.split("(")[1].split("%")[0].strip()
                         try:
-                            data["sensors"].append({
-                                "id": "signal_quality",
-                                "name": "Signal Quality",
-                                "value": float(percent_text),
-                                "unit": "%",
-                                "state": "0",
-                                "type": "generic",
-                            })
+                            data["sensors"]["signal_quality"] = SensorReading(
+                                _SMS_STATUS_META["signal_quality"], float(percent_text)
+                            )
                         except ValueError:
                             pass
             
             # Parse network operator
             net_op = root.find("ModemNetOp")
             if net_op is not None and net_op.text and net_op.text.strip():
-                data["sensors"].append({
-                    "id": "network_operator",
-                    "name": "Network Operator",
-                    "value": net_op.text.strip(),
-                    "unit": "",
-                    "state": "0",
-                    "type": "generic",
-                })
+                data["sensors"]["network_operator"] = SensorReading(
+                    _SMS_STATUS_META["network_operator"], net_op.text.strip()
+                )
             
             # Parse network registration status
             net_reg = root.find("ModemNetReg")
             if net_reg is not None and net_reg.text and net_reg.text.strip():
-                data["sensors"].append({
-                    "id": "network_status",
-                    "name": "Network Status",
-                    "value": net_reg.text.strip(),
-                    "unit": "",
-                    "state": "0",
-                    "type": "generic",
-                })
+                data["sensors"]["network_status"] = SensorReading(
+                    _SMS_STATUS_META["network_status"], net_reg.text.strip()
+                )
             
             # Parse SMS statistics
             sms_ok = root.find("CntSmsOK")
             if sms_ok is not None and sms_ok.text:
                 try:
-                    data["sensors"].append({
-                        "id": "sms_sent",
-                        "name": "SMS Sent",
-                        "value": int(sms_ok.text),
-                        "unit": "",
-                        "state": "0",
-                        "type": "generic",
-                    })
+                    data["sensors"]["sms_sent"] = SensorReading(
+                        _SMS_STATUS_META["sms_sent"], int(sms_ok.text)
+                    )
                 except ValueError:
                     pass
             
             sms_error = root.find("CntSmsError")
             if sms_error is not None and sms_error.text:
                 try:
-                    data["sensors"].append({
-                        "id": "sms_errors",
-                        "name": "SMS Errors",
-                        "value": int(sms_error.text),
-                        "unit": "",
-                        "state": "0",
-                        "type": "generic",
-                    })
+                    data["sensors"]["sms_errors"] = SensorReading(
+                        _SMS_STATUS_META["sms_errors"], int(sms_error.text)
+                    )
                 except ValueError:
                     pass
             
@@ -412,18 +1022,72 @@ class HWGroupAPI:
 
     async def async_set_output(self, output_id: str, state: bool) -> bool:
         """Set the state of an output/relay."""
+        success, _confirmed = await self.async_set_output_state(output_id, state)
+        return success
+
+    async def async_set_output_state(
+        self, output_id: str, state: bool
+    ) -> tuple[bool, bool | None]:
+        """Set the state of an output/relay.
+
+        Returns whether the command succeeded and the output state reported
+        in the command response, or None if the device did not report one.
+        """
         try:
-            # Command to set output state
-            state_value = "1" if state else "0"
-            async with self.session.get(
-                f"{self.base_url}/output.xml?id={output_id}&state={state_value}",
-                auth=self._auth,
-                timeout=self.timeout,
-            ) as response:
-                return response.status == 200
+            return await self._async_command_output(output_id, state)
         except (aiohttp.ClientError, asyncio.TimeoutError) as err:
             _LOGGER.error("Failed to set output state: %s", err)
-            return False
+            return False, None
+
+    async def async_set_outputs(self, outputs: dict[str, bool]) -> dict[str, bool]:
+        """Set the state of several outputs/relays.
+
+        The commands are sent back to back over the same kept-alive
+        connection. Returns whether each output command succeeded.
+        """
+        results: dict[str, bool] = {}
+        for output_id, state in outputs.items():
+            try:
+                results[output_id], _confirmed = await self._async_command_output(
+                    output_id, state
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.error("Failed to set output %s: %s", output_id, err)
+                results[output_id] = False
+        return results
+
+    async def _async_command_output(
+        self, output_id: str, state: bool
+    ) -> tuple[bool, bool | None]:
+        """Send a single output command."""
+        # Command to set output state
+        state_value = "1" if state else "0"
+        async with self.session.get(
+            f"{self.base_url}/output.xml?id={output_id}&state={state_value}",
+            auth=self._auth,
+            timeout=self.timeout,
+        ) as response:
+            # Always read the body so the connection can be reused
+            body = await response.read()
+            if response.status != 200:
+                return False, None
+            return True, self._parse_output_state(body, output_id)
+
+    def _parse_output_state(self, body: bytes, output_id: str) -> bool | None:
+        """Return the state of an output reported in a command response."""
+        if not body:
+            return None
+        try:
+            root = ElementTree.fromstring(body)
+        except ElementTree.ParseError:
+            return None
+        for elem in root.iter():
+            if _local_name(elem.tag) != "OutputSet":
+                continue
+            for entry in elem.iterfind("Entry"):
+                if entry.findtext("ID") == output_id:
+                    return entry.findtext("Value") == "1"
+        return None
 
     async def async_send_sms(self, phone_number: str, message: str) -> bool:
         """Send SMS via SMS Gateway using HTTP GET method."""
@@ -0,0 +1,333 @@
+"""Modbus/TCP transport for HW Group Poseidon devices.
+
+Poseidon2 units map their binary inputs to discrete inputs, their outputs
+to coils and their sensor values to input registers, each in the order of
+values.xml. A poll reads each block with as few requests as possible over
+one persistent connection. The few Modbus/TCP frames needed are built and
+parsed here directly.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+import time
+from typing import Any
+
+import aiohttp
+
+from .const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MODBUS_PORT,
+    DEFAULT_MODBUS_RELEARN_INTERVAL,
+    DEFAULT_MODBUS_UNIT,
+    DEFAULT_TIMEOUT,
+    DEVICE_TYPE_SMS_GATEWAY,
+)
+from .hwgroup import HWGroupAPI, HWGroupConnectionError, HWGroupError, build_snapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Register map of Poseidon2 units, starting at the first entry of each set
+MODBUS_INPUT_ADDRESS = 100  # discrete inputs: binary inputs
+MODBUS_OUTPUT_ADDRESS = 200  # coils: outputs
+MODBUS_SENSOR_ADDRESS = 300  # input registers: sensor values, signed tenths
+
+# Function codes
+_READ_COILS = 0x01
+_READ_DISCRETE_INPUTS = 0x02
+_READ_INPUT_REGISTERS = 0x04
+_WRITE_SINGLE_COIL = 0x05
+
+# Most bits and registers one read may return
+MAX_READ_BITS = 2000
+MAX_READ_REGISTERS = 125
+
+COIL_ON = 0xFF00
+COIL_OFF = 0x0000
+
+# Transaction ID, protocol ID (0), length of unit ID and PDU, unit ID
+_MBAP_HEADER = struct.Struct(">HHHB")
+_REQUEST = struct.Struct(">BHH")
+
+
+def read_ranges(address: int, count: int, limit: int) -> list[tuple[int, int]]:
+    """Split a block into as few reads as the protocol allows."""
+    return [
+        (start, min(limit, address + count - start))
+        for start in range(address, address + count, limit)
+    ]
+
+
+def decode_read(function: int, pdu: bytes, count: int) -> list[int]:
+    """Return the bits or signed registers of a read response.
+
+    Raises ValueError if the response does not hold ``count`` values.
+    """
+    if function == _READ_INPUT_REGISTERS:
+        size = 2 * count
+        if pdu[0] != function or pdu[1] != size or len(pdu) != size + 2:
+            raise ValueError("Malformed register response")
+        return list(struct.unpack(f">{count}h", pdu[2:]))
+    size = (count + 7) // 8
+    if pdu[0] != function or pdu[1] != size or len(pdu) != size + 2:
+        raise ValueError("Malformed bit response")
+    # Bits are packed from the least significant bit of the first byte
+    return [(pdu[2 + (index >> 3)] >> (index & 7)) & 1 for index in range(count)]
+
+
+class HWGroupModbusAPI(HWGroupAPI):
+    """API client that polls Poseidon2 units over Modbus/TCP.
+
+    The register map has no names, units or alarm states, so values.xml is
+    read over HTTP on the first poll, whenever the relearn interval has
+    passed and if the registers stop matching the layout. Other polls only
+    read the registers; outputs are written as coils. SMS Gateways keep
+    using HTTP.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession | None,
+        username: str | None = None,
+        password: str | None = None,
+        modbus_port: int = DEFAULT_MODBUS_PORT,
+        unit_id: int = DEFAULT_MODBUS_UNIT,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the API client."""
+        super().__init__(host, session, username, password, **kwargs)
+        self.modbus_port = modbus_port
+        self.unit_id = unit_id
+        self.modbus_requests = 0
+        self.modbus_connections = 0
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        # Responses are read in request order, so exchanges must not overlap
+        self._lock = asyncio.Lock()
+        self._transaction_id = 0
+        # Monotonic time of the last values.xml read
+        self._learned_at: float | None = None
+
+    async def async_close(self) -> None:
+        """Close the Modbus connection and the dedicated session."""
+        self._disconnect()
+        await super().async_close()
+
+    def _disconnect(self) -> None:
+        """Drop the Modbus connection; the next exchange opens a new one."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    def _output_addresses(self) -> dict[str, int]:
+        """Return the coil address of every known output."""
+        layout = self.layout
+        if layout is None or self._device_type == DEVICE_TYPE_SMS_GATEWAY:
+            return {}
+        return {
+            output_id: MODBUS_OUTPUT_ADDRESS + position
+            for position, output_id in enumerate(layout.sets.get("switches", {}))
+        }
+
+    async def _async_get_values(self) -> dict[str, Any]:
+        """Read the registers, or values.xml to learn the layout."""
+        layout = self.layout
+        previous = self._snapshot
+        if (
+            layout is None
+            or previous is None
+            or self._device_type == DEVICE_TYPE_SMS_GATEWAY
+            or self._learned_at is None
+            or time.monotonic() - self._learned_at > DEFAULT_MODBUS_RELEARN_INTERVAL
+        ):
+            return await self._async_learn()
+
+        sensors = layout.sets.get("sensors", {})
+        inputs = layout.sets.get("binary_sensors", {})
+        outputs = layout.sets.get("switches", {})
+        blocks = (
+            (_READ_INPUT_REGISTERS, MODBUS_SENSOR_ADDRESS, len(sensors), MAX_READ_REGISTERS),
+            (_READ_DISCRETE_INPUTS, MODBUS_INPUT_ADDRESS, len(inputs), MAX_READ_BITS),
+            (_READ_COILS, MODBUS_OUTPUT_ADDRESS, len(outputs), MAX_READ_BITS),
+        )
+        reads = [
+            (function, address, count)
+            for function, base, total, limit in blocks
+            for address, count in read_ranges(base, total, limit)
+        ]
+
+        start = time.perf_counter()
+        try:
+            responses = await self._async_exchange(
+                [
+                    _REQUEST.pack(function, address, count)
+                    for function, address, count in reads
+                ]
+            )
+        except HWGroupConnectionError:
+            raise
+        except HWGroupError as err:
+            # Usually an illegal address after entries were removed
+            _LOGGER.debug("%s from %s, relearning device layout", err, self.host)
+            return await self._async_learn()
+        parse_start = time.perf_counter()
+        self.last_request_duration = parse_start - start
+        self._request_durations.append(self.last_request_duration)
+        self.last_payload_bytes = None
+
+        values: dict[int, list[int]] = {function: [] for function, *_ in blocks}
+        try:
+            for (function, _address, count), pdu in zip(reads, responses):
+                values[function].extend(decode_read(function, pdu, count))
+        except (IndexError, ValueError) as err:
+            raise HWGroupConnectionError(f"Modbus error: {err}") from err
+
+        # The register map has no states; keep those of the last values.xml
+        old_sensors = previous["sensors"]
+        old_inputs = previous["binary_sensors"]
+        columns = {
+            "sensors": {
+                "id": list(sensors),
+                "value": values[_READ_INPUT_REGISTERS],
+                "state": [
+                    old_sensors[sensor_id].state if sensor_id in old_sensors else "1"
+                    for sensor_id in sensors
+                ],
+            },
+            "binary_sensors": {
+                "value": values[_READ_DISCRETE_INPUTS],
+                "alarm_state": [
+                    old_inputs[input_id].alarm_state if input_id in old_inputs else "0"
+                    for input_id in inputs
+                ],
+            },
+            "switches": {"value": values[_READ_COILS]},
+        }
+        data = build_snapshot(columns, layout, previous)
+        self.last_parse_duration = time.perf_counter() - parse_start
+        if data is None:
+            _LOGGER.debug("Registers of %s changed, relearning device layout", self.host)
+            return await self._async_learn()
+        self._snapshot = data
+        # A later values.xml must be parsed again, not taken from the cache
+        self._values_digest = None
+        return data
+
+    async def _async_learn(self) -> dict[str, Any]:
+        """Read values.xml to learn the layout and refresh the states."""
+        data = await super()._async_get_values()
+        self._learned_at = time.monotonic()
+        return data
+
+    async def _async_exchange(self, requests: list[bytes]) -> list[bytes]:
+        """Send requests one after another and return the response PDUs.
+
+        Raises HWGroupConnectionError if the connection fails, and
+        HWGroupError if the device answers a request with an exception.
+        """
+        async with self._lock:
+            try:
+                responses = await asyncio.wait_for(
+                    self._async_transact(requests), DEFAULT_TIMEOUT
+                )
+            except (OSError, EOFError, ValueError, asyncio.TimeoutError) as err:
+                # The stream may hold a partial response, so start over
+                self._disconnect()
+                raise HWGroupConnectionError(f"Modbus error: {err!r}") from err
+        for pdu in responses:
+            if pdu[0] & 0x80:
+                raise HWGroupError(
+                    f"Modbus exception {pdu[1] if len(pdu) > 1 else '?'} "
+                    f"for function {pdu[0] & 0x7F:#04x}"
+                )
+        return responses
+
+    async def _async_transact(self, requests: list[bytes]) -> list[bytes]:
+        """Send each request and read its response before the next one."""
+        if self._writer is None or self._writer.is_closing():
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.modbus_port),
+                DEFAULT_CONNECT_TIMEOUT,
+            )
+            self.modbus_connections += 1
+        reader, writer = self._reader, self._writer
+
+        # Many Modbus/TCP servers only handle one transaction at a time and
+        # drop requests that arrive while they are busy, so none are pipelined
+        responses = []
+        for pdu in requests:
+            self._transaction_id = transaction_id = (self._transaction_id + 1) & 0xFFFF
+            writer.write(
+                _MBAP_HEADER.pack(transaction_id, 0, len(pdu) + 1, self.unit_id) + pdu
+            )
+            self.modbus_requests += 1
+            await writer.drain()
+            header = await reader.readexactly(_MBAP_HEADER.size)
+            received_id, protocol, length, _unit = _MBAP_HEADER.unpack(header)
+            if received_id != transaction_id or protocol != 0 or length < 3:
+                raise ValueError("Unexpected Modbus frame")
+            responses.append(await reader.readexactly(length - 1))
+        return responses
+
+    async def _async_command_output(
+        self, output_id: str, state: bool
+    ) -> tuple[bool, bool | None]:
+        """Write the coil of an output."""
+        results = await self._async_write_coils({output_id: state})
+        if output_id not in results:
+            return await super()._async_command_output(output_id, state)
+        return results[output_id]
+
+    async def async_set_outputs(self, outputs: dict[str, bool]) -> dict[str, bool]:
+        """Set the state of several outputs in one exchange."""
+        results = {
+            output_id: success
+            for output_id, (success, _confirmed) in (
+                await self._async_write_coils(outputs)
+            ).items()
+        }
+        if remaining := {
+            output_id: state
+            for output_id, state in outputs.items()
+            if output_id not in results
+        }:
+            results.update(await super().async_set_outputs(remaining))
+        return results
+
+    async def _async_write_coils(
+        self, outputs: dict[str, bool]
+    ) -> dict[str, tuple[bool, bool | None]]:
+        """Write the coils of the outputs with a known address.
+
+        Returns whether each write succeeded and the state the device
+        echoed. Outputs without an address are left out.
+        """
+        addresses = self._output_addresses()
+        writes = {
+            output_id: state
+            for output_id, state in outputs.items()
+            if output_id in addresses
+        }
+        if not writes:
+            return {}
+        try:
+            responses = await self._async_exchange(
+                [
+                    _REQUEST.pack(
+                        _WRITE_SINGLE_COIL,
+                        addresses[output_id],
+                        COIL_ON if state else COIL_OFF,
+                    )
+                    for output_id, state in writes.items()
+                ]
+            )
+        except HWGroupError as err:
+            _LOGGER.error("Failed to set outputs over Modbus: %s", err)
+            return {output_id: (False, None) for output_id in writes}
+        # The device echoes each request once the coil is written
+        return {
+            output_id: (True, pdu[3:5] == COIL_ON.to_bytes(2, "big"))
+            for output_id, pdu in zip(writes, responses)
+        }
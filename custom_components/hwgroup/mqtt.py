@@ -0,0 +1,244 @@
+"""MQTT transport for HW Group devices that publish their readings.
+
+Devices publish every reading to its own topic below a base topic:
+
+- ``<base>/sensors/<ID>``, ``<base>/inputs/<ID>`` and ``<base>/outputs/<ID>``
+  carry the value, either as plain text or as a JSON object with ``value``
+  and an optional alarm ``state``
+- ``<base>/values`` carries a whole values.xml document
+- ``<base>/outputs/<ID>/set`` takes ``1`` or ``0`` to switch an output
+
+Messages are applied to the snapshot here; subscribing and publishing is
+left to the caller.
+"""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+import json
+import logging
+import time
+from typing import Any
+
+import aiohttp
+
+from .const import DEFAULT_MQTT_LIVENESS_TIMEOUT
+from .hwgroup import (
+    BinarySensorReading,
+    HWGroupAPI,
+    HWGroupConnectionError,
+    HWGroupError,
+    OutputReading,
+    SensorReading,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Topic level below the base topic -> snapshot key
+TOPIC_KEYS: dict[str, str] = {
+    "sensors": "sensors",
+    "inputs": "binary_sensors",
+    "outputs": "switches",
+}
+VALUES_TOPIC = "values"
+COMMAND_SUFFIX = "set"
+
+_TRUE_VALUES = frozenset({"1", "on", "true"})
+
+
+def decode_payload(payload: bytes) -> tuple[Any, str | None]:
+    """Return the value and the alarm state, if any, of a reading message.
+
+    Raises ValueError if a JSON payload has no value.
+    """
+    text = payload.decode("utf-8", "replace").strip()
+    if not text.startswith("{"):
+        return text, None
+    message = json.loads(text)
+    if not isinstance(message, dict):
+        raise ValueError("JSON payload is not an object")
+    for key in ("value", "Value"):
+        if key in message:
+            value = message[key]
+            break
+    else:
+        raise ValueError("JSON payload has no value")
+    state = message.get("state", message.get("State"))
+    return value, None if state is None else str(state)
+
+
+def _as_bool(value: Any) -> bool:
+    """Return the state of a binary input or output value."""
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_VALUES
+    return bool(value)
+
+
+class HWGroupMqttAPI(HWGroupAPI):
+    """API client fed by the MQTT messages of a device.
+
+    values.xml is read over HTTP only to learn the layout: on the first
+    poll and after a message for an unknown reading. Afterwards polls
+    return the snapshot built from the messages, or raise
+    HWGroupConnectionError once no message arrived within
+    ``liveness_timeout`` seconds. Outputs are switched by publishing to
+    their command topic when ``commands`` is set, otherwise over HTTP.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession | None,
+        username: str | None = None,
+        password: str | None = None,
+        topic: str = "",
+        publish: Callable[[str, str], Awaitable[None]] | None = None,
+        commands: bool = False,
+        liveness_timeout: float = DEFAULT_MQTT_LIVENESS_TIMEOUT,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the API client."""
+        super().__init__(host, session, username, password, **kwargs)
+        self.topic = topic.rstrip("/")
+        self._prefix = f"{self.topic}/"
+        self._publish = publish
+        self.commands = commands and publish is not None
+        self.liveness_timeout = liveness_timeout
+        self.mqtt_messages = 0
+        self.mqtt_ignored = 0
+        # Monotonic time of the last message or values.xml read
+        self._last_seen: float | None = None
+        # A message named a reading the layout does not know
+        self._relearn = False
+
+    @property
+    def subscription(self) -> str:
+        """Return the topic filter covering all topics of the device."""
+        return f"{self._prefix}#"
+
+    async def _async_get_values(self) -> dict[str, Any]:
+        """Return the snapshot built from the messages.
+
+        values.xml is only read while the layout is unknown.
+        """
+        if self._relearn or self.layout is None or self._snapshot is None:
+            data = await super()._async_get_values()
+            self._relearn = False
+            self._last_seen = time.monotonic()
+            return data
+        if (
+            self._last_seen is not None
+            and time.monotonic() - self._last_seen > self.liveness_timeout
+        ):
+            raise HWGroupConnectionError(
+                f"No MQTT message on {self.subscription} for "
+                f"{self.liveness_timeout:.0f} seconds"
+            )
+        return self._snapshot
+
+    def apply_message(self, topic: str, payload: bytes) -> dict[str, Any] | None:
+        """Apply a message of the device to the snapshot.
+
+        Returns the snapshot after the message, which is the previous one
+        if nothing changed, or None if the message was ignored.
+        """
+        if not topic.startswith(self._prefix):
+            return None
+        path = topic[len(self._prefix):]
+        if path == VALUES_TOPIC:
+            try:
+                data = self.parse_pushed_values(payload)
+            except HWGroupError as err:
+                _LOGGER.warning("Ignoring invalid values on %s: %s", topic, err)
+                self.mqtt_ignored += 1
+                return None
+            self._relearn = False
+            return self._seen(data)
+
+        level, _, reading_id = path.partition("/")
+        key = TOPIC_KEYS.get(level)
+        # Command topics, including our own commands, are not readings
+        if key is None or not reading_id or "/" in reading_id:
+            return None
+        layout = self.layout
+        previous = self._snapshot
+        if layout is None or previous is None:
+            # Nothing to attach the value to until the layout is learned
+            self.mqtt_ignored += 1
+            return None
+        meta = layout.sets.get(key, {}).get(reading_id)
+        if meta is None:
+            _LOGGER.debug("Unknown reading %s, relearning device layout", topic)
+            self._relearn = True
+            self.mqtt_ignored += 1
+            return None
+        try:
+            value, state = decode_payload(payload)
+        except ValueError as err:
+            _LOGGER.warning("Ignoring invalid message on %s: %s", topic, err)
+            self.mqtt_ignored += 1
+            return None
+
+        old = previous.get(key, {}).get(reading_id)
+        reading: SensorReading | BinarySensorReading | OutputReading
+        if key == "sensors":
+            if isinstance(value, str) and value:
+                try:
+                    value = float(value)
+                except ValueError:
+                    pass
+            elif isinstance(value, int) and not isinstance(value, bool):
+                value = float(value)
+            state = state or (old.state if old is not None else "0")
+            if old is not None and old.value == value and old.state == state:
+                return self._seen(previous)
+            reading = SensorReading(meta, value, state)
+        elif key == "binary_sensors":
+            binary_state = _as_bool(value)
+            alarm_state = state or (old.alarm_state if old is not None else "0")
+            if (
+                old is not None
+                and old.state == binary_state
+                and old.alarm_state == alarm_state
+            ):
+                return self._seen(previous)
+            reading = BinarySensorReading(meta, binary_state, alarm_state)
+        else:
+            output_state = _as_bool(value)
+            if old is not None and old.state == output_state:
+                return self._seen(previous)
+            reading = OutputReading(meta, output_state)
+
+        # Copy on write, so snapshots handed out earlier stay unchanged
+        data = {**previous, key: {**previous.get(key, {}), reading_id: reading}}
+        self._snapshot = data
+        # A later values.xml must be parsed again, not taken from the cache
+        self._values_digest = None
+        return self._seen(data)
+
+    def _seen(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Record a message from the device and return the snapshot."""
+        self.mqtt_messages += 1
+        self._last_seen = time.monotonic()
+        return data
+
+    async def _async_command_output(
+        self, output_id: str, state: bool
+    ) -> tuple[bool, bool | None]:
+        """Publish an output command, or send it over HTTP."""
+        layout = self.layout
+        if (
+            not self.commands
+            or layout is None
+            or output_id not in layout.sets.get("switches", {})
+        ):
+            return await super()._async_command_output(output_id, state)
+        try:
+            await self._publish(
+                f"{self._prefix}outputs/{output_id}/{COMMAND_SUFFIX}",
+                "1" if state else "0",
+            )
+        except HWGroupError as err:
+            _LOGGER.error("Failed to publish output %s: %s", output_id, err)
+            return False, None
+        # The device confirms by publishing the new state
+        return True, None
@@ -0,0 +1,55 @@
+"""HTTP receiver for values pushed by HW Group devices."""
+from __future__ import annotations
+
+from http import HTTPStatus
+import hmac
+import logging
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, MAX_PUSH_SIZE, PUSH_URL
+from .hwgroup import HWGroupError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HWGroupPushView(HomeAssistantView):
+    """Accept values.xml documents pushed by the devices.
+
+    One view serves all entries. Devices cannot log in to Home Assistant,
+    so every push carries the entry's token in the ``token`` query
+    parameter instead.
+    """
+
+    url = PUSH_URL
+    name = "api:hwgroup:push"
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the view."""
+        self.hass = hass
+
+    async def post(self, request: web.Request, entry_id: str) -> web.Response:
+        """Feed a pushed document to the entry's coordinator."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(entry_id)
+        if not isinstance(entry_data, dict) or not entry_data.get("push_token"):
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        if not hmac.compare_digest(
+            request.query.get("token", "").encode(), entry_data["push_token"].encode()
+        ):
+            _LOGGER.warning("Rejected push for %s with an invalid token", entry_id)
+            return web.Response(status=HTTPStatus.UNAUTHORIZED)
+        if (request.content_length or 0) > MAX_PUSH_SIZE:
+            return web.Response(status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        payload = await request.read()
+        try:
+            data = entry_data["api"].parse_pushed_values(payload)
+        except HWGroupError as err:
+            _LOGGER.warning("Ignoring invalid push for %s: %s", entry_id, err)
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+        entry_data["coordinator"].async_push(data)
+        return web.Response(text="OK")
@@ -0,0 +1,136 @@
+"""Fleet-wide poll scheduler for the HW Group integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import partial
+import logging
+import zlib
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DEFAULT_MAX_CONCURRENT_POLLS
+from .coordinator import HWGroupDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _PollSlot:
+    """Scheduling state of one device."""
+
+    coordinator: HWGroupDataUpdateCoordinator
+    next_run: float
+    handle: asyncio.TimerHandle | None = None
+    task: asyncio.Task | None = None
+
+
+class HWGroupPollScheduler:
+    """Spread the polls of all devices across their scan interval.
+
+    Every device gets a deterministic phase offset derived from its key, so
+    devices set up together do not poll in lockstep. A global semaphore caps
+    the number of requests in flight and a tick is skipped rather than queued
+    while the device's previous poll is still running.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_POLLS,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._slots: dict[str, _PollSlot] = {}
+        # Polls waiting for a free slot and polls currently running
+        self.queue_depth = 0
+        self.in_flight = 0
+        # Delay between the scheduled and the actual start of a poll
+        self.last_skew = 0.0
+        self.max_skew = 0.0
+        self.skipped_ticks = 0
+
+    @callback
+    def async_register(
+        self,
+        key: str,
+        coordinator: HWGroupDataUpdateCoordinator,
+        immediate: bool = False,
+    ) -> CALLBACK_TYPE:
+        """Start polling a device and return a callback to stop it.
+
+        With ``immediate`` the device is also polled right away, in the
+        background and within the concurrency limit.
+        """
+        interval = coordinator.poll_interval.total_seconds()
+        phase = zlib.crc32(key.encode()) / 2**32 * interval
+        now = self.hass.loop.time()
+        next_run = now - now % interval + phase
+        if next_run <= now:
+            next_run += interval
+
+        slot = _PollSlot(coordinator, next_run)
+        self._slots[key] = slot
+        slot.handle = self.hass.loop.call_at(next_run, self._async_tick, key)
+        if immediate:
+            slot.task = self.hass.async_create_background_task(
+                self._async_poll(coordinator.async_poll, now),
+                f"hwgroup first poll {key}",
+            )
+        _LOGGER.debug("Scheduled %s with phase offset %.2fs", key, phase)
+        return partial(self._async_unregister, key)
+
+    @callback
+    def _async_unregister(self, key: str) -> None:
+        """Stop polling a device."""
+        if (slot := self._slots.pop(key, None)) is None:
+            return
+        if slot.handle is not None:
+            slot.handle.cancel()
+        if slot.task is not None and not slot.task.done():
+            slot.task.cancel()
+
+    @callback
+    def _async_tick(self, key: str) -> None:
+        """Run a scheduled poll and schedule the next one."""
+        if (slot := self._slots.get(key)) is None:
+            return
+
+        scheduled = slot.next_run
+        interval = slot.coordinator.poll_interval.total_seconds()
+        now = self.hass.loop.time()
+        slot.next_run = scheduled + interval
+        while slot.next_run <= now:
+            slot.next_run += interval
+        slot.handle = self.hass.loop.call_at(slot.next_run, self._async_tick, key)
+
+        if slot.task is not None and not slot.task.done():
+            self.skipped_ticks += 1
+            _LOGGER.debug("Previous poll of %s still running, skipping tick", key)
+            return
+
+        slot.task = self.hass.async_create_background_task(
+            self._async_poll(slot.coordinator.async_poll, scheduled),
+            f"hwgroup poll {key}",
+        )
+
+    async def _async_poll(
+        self, refresh: Callable[[], Awaitable[None]], scheduled: float
+    ) -> None:
+        """Poll a device once a slot is free."""
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        self.in_flight += 1
+        try:
+            self.last_skew = self.hass.loop.time() - scheduled
+            self.max_skew = max(self.max_skew, self.last_skew)
+            await refresh()
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
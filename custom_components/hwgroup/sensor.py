@@ -16,17 +16,21 @@ from homeassistant.const import (
     PERCENTAGE,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
+    UnitOfInformation,
     UnitOfTemperature,
+    UnitOfTime,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .coordinator import HWGroupDataUpdateCoordinator
+from .hwgroup import SensorReading
+from .classifier import sensor_icon
 from .const import CONF_DEVICE_NAME
+from .sms import HWGroupSmsQueue
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -69,6 +73,121 @@ SENSOR_TYPES = {
     ),
 }
 
+SMS_QUEUE_SENSOR_TYPES = (
+    HWGroupSensorEntityDescription(
+        key="sms_queue_depth",
+        name="SMS Queue Depth",
+        icon="mdi:message-processing",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda queue: queue.depth,
+    ),
+    HWGroupSensorEntityDescription(
+        key="sms_queue_sent",
+        name="SMS Queue Sent",
+        icon="mdi:message-check",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda queue: queue.sent,
+    ),
+    HWGroupSensorEntityDescription(
+        key="sms_queue_failed",
+        name="SMS Queue Failed",
+        icon="mdi:message-alert",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda queue: queue.failed,
+    ),
+    HWGroupSensorEntityDescription(
+        key="sms_queue_retried",
+        name="SMS Queue Retried",
+        icon="mdi:message-arrow-right",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda queue: queue.retried,
+    ),
+)
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Convert a duration in seconds to rounded milliseconds."""
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+# Poll performance of the device, disabled by default
+POLL_SENSOR_TYPES = (
+    HWGroupSensorEntityDescription(
+        key="poll_request_latency",
+        name="Request Latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda coordinator: _milliseconds(coordinator.api.last_request_duration),
+    ),
+    HWGroupSensorEntityDescription(
+        key="poll_request_latency_p95",
+        name="Request Latency P95",
+        icon="mdi:timer-alert-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda coordinator: _milliseconds(coordinator.api.request_duration_p95),
+    ),
+    HWGroupSensorEntityDescription(
+        key="poll_parse_time",
+        name="Parse Time",
+        icon="mdi:code-tags",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        value_fn=lambda coordinator: _milliseconds(coordinator.api.last_parse_duration),
+    ),
+    HWGroupSensorEntityDescription(
+        key="poll_payload_size",
+        name="Payload Size",
+        icon="mdi:file-code-outline",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        value_fn=lambda coordinator: coordinator.api.last_payload_bytes,
+    ),
+    HWGroupSensorEntityDescription(
+        key="poll_consecutive_failures",
+        name="Consecutive Poll Failures",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.consecutive_failures,
+    ),
+    HWGroupSensorEntityDescription(
+        key="poll_entities_updated",
+        name="Entities Updated",
+        icon="mdi:refresh",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.last_updated_entities,
+    ),
+    HWGroupSensorEntityDescription(
+        key="poll_entities_skipped",
+        name="Entities Skipped",
+        icon="mdi:debug-step-over",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.last_skipped_entities,
+    ),
+    HWGroupSensorEntityDescription(
+        key="poll_time_since_success",
+        name="Time Since Last Successful Poll",
+        icon="mdi:clock-alert-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda coordinator: (
+            round(seconds)
+            if (seconds := coordinator.seconds_since_last_success) is not None
+            else None
+        ),
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -79,14 +198,14 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
 
     sensors = []
-    sensor_list = coordinator.data.get("sensors", [])
+    sensor_list = coordinator.data.get("sensors", {}).values()
     _LOGGER.info("Setting up %d sensors for entry %s", len(sensor_list), entry.entry_id)
     
     for sensor_data in sensor_list:
-        sensor_type = sensor_data.get("type", "generic")
+        sensor_type = sensor_data.type
         description = SENSOR_TYPES.get(sensor_type, SENSOR_TYPES["generic"])
         
-        _LOGGER.debug("Creating sensor: %s (type: %s)", sensor_data.get("name"), sensor_type)
+        _LOGGER.debug("Creating sensor: %s (type: %s)", sensor_data.name, sensor_type)
         sensors.append(
             HWGroupSensor(
                 coordinator,
@@ -96,6 +215,19 @@ async def async_setup_entry(
             )
         )
 
+    sensors.extend(
+        HWGroupPollSensor(coordinator, entry, description)
+        for description in POLL_SENSOR_TYPES
+    )
+
+    # SMS Gateways get counters for their send queue
+    sms_queue = hass.data[DOMAIN][entry.entry_id].get("sms_queue")
+    if sms_queue is not None:
+        sensors.extend(
+            HWGroupSmsQueueSensor(coordinator, entry, sms_queue, description)
+            for description in SMS_QUEUE_SENSOR_TYPES
+        )
+
     if sensors:
         _LOGGER.info("Adding %d sensor entities", len(sensors))
         async_add_entities(sensors)
@@ -107,91 +239,32 @@ class HWGroupSensor(CoordinatorEntity, SensorEntity):
     """Representation of a HW Group sensor."""
 
     entity_description: HWGroupSensorEntityDescription
+    # Rolling statistics change with every sample and are kept in memory only
+    _unrecorded_attributes = frozenset({"statistics"})
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: HWGroupDataUpdateCoordinator,
         entry: ConfigEntry,
-        sensor_data: dict,
+        sensor_data: SensorReading,
         description: HWGroupSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=("sensors", sensor_data.id))
         self.entity_description = description
-        self._sensor_id = sensor_data["id"]
-        self._attr_name = sensor_data["name"]
-        self._attr_unique_id = f"{entry.entry_id}_{sensor_data['id']}"
+        self._sensor_id = sensor_data.id
+        self._attributes: dict[str, any] | None = None
+        self._attr_name = sensor_data.name
+        self._attr_unique_id = f"{entry.entry_id}_{sensor_data.id}"
         
         # Auto-detect icon from sensor name
-        sensor_name_lower = sensor_data["name"].lower()
-        sensor_type = sensor_data.get("type", "generic")
-        
-        if sensor_type == "temperature":
-            if any(keyword in sensor_name_lower for keyword in ["server", "cpu", "processor"]):
-                self._attr_icon = "mdi:cpu"
-            elif any(keyword in sensor_name_lower for keyword in ["rack", "cabinet", "schrank"]):
-                self._attr_icon = "mdi:server"
-            elif any(keyword in sensor_name_lower for keyword in ["storage", "disk", "hdd", "ssd"]):
-                self._attr_icon = "mdi:harddisk"
-            elif any(keyword in sensor_name_lower for keyword in ["room", "raum", "zimmer"]):
-                self._attr_icon = "mdi:home-thermometer"
-            elif any(keyword in sensor_name_lower for keyword in ["outside", "outdoor", "aussen", "außen"]):
-                self._attr_icon = "mdi:thermometer"
-            elif any(keyword in sensor_name_lower for keyword in ["water", "wasser"]):
-                self._attr_icon = "mdi:water-thermometer"
-            else:
-                self._attr_icon = "mdi:thermometer"
-        
-        elif sensor_type == "humidity":
-            if any(keyword in sensor_name_lower for keyword in ["front", "vorne"]):
-                self._attr_icon = "mdi:water-percent"
-            elif any(keyword in sensor_name_lower for keyword in ["back", "rear", "hinten"]):
-                self._attr_icon = "mdi:water-percent-alert"
-            else:
-                self._attr_icon = "mdi:water-percent"
-        
-        elif sensor_type == "voltage":
-            if any(keyword in sensor_name_lower for keyword in ["battery", "batterie", "akku"]):
-                self._attr_icon = "mdi:battery-charging"
-            else:
-                self._attr_icon = "mdi:lightning-bolt"
-        
-        elif sensor_type == "current":
-            self._attr_icon = "mdi:current-ac"
-        
-        # SMS Gateway specific icons
-        elif "signal" in sensor_name_lower:
-            if "strength" in sensor_name_lower:
-                self._attr_icon = "mdi:signal-cellular-3"
-            elif "quality" in sensor_name_lower:
-                self._attr_icon = "mdi:signal"
-            else:
-                self._attr_icon = "mdi:antenna"
-        
-        elif "network" in sensor_name_lower:
-            if "operator" in sensor_name_lower:
-                self._attr_icon = "mdi:cellphone"
-            elif "status" in sensor_name_lower:
-                self._attr_icon = "mdi:network"
-            else:
-                self._attr_icon = "mdi:network-outline"
-        
-        elif "sms" in sensor_name_lower:
-            if "sent" in sensor_name_lower or "gesendet" in sensor_name_lower:
-                self._attr_icon = "mdi:message-check"
-            elif "error" in sensor_name_lower or "fehler" in sensor_name_lower:
-                self._attr_icon = "mdi:message-alert"
-            else:
-                self._attr_icon = "mdi:message-text"
-        
-        else:
-            # Use default icon from entity description if no specific match
-            self._attr_icon = None
+        sensor_type = sensor_data.type
+        self._attr_icon = sensor_icon(sensor_data.name, sensor_type)
         
         if self._attr_icon:
             _LOGGER.debug(
                 "Sensor '%s' (type: %s) assigned icon: %s",
-                sensor_data["name"],
+                sensor_data.name,
                 sensor_type,
                 self._attr_icon
             )
@@ -207,32 +280,134 @@ class HWGroupSensor(CoordinatorEntity, SensorEntity):
             "sw_version": device_info.get("version", "Unknown"),
         }
 
+    @property
+    def _reading(self) -> SensorReading | None:
+        """Return this sensor's reading from the current snapshot."""
+        return self.coordinator.data.get("sensors", {}).get(self._sensor_id)
+
     @property
     def native_value(self) -> float | int | str | None:
         """Return the state of the sensor."""
-        for sensor in self.coordinator.data.get("sensors", []):
-            if sensor["id"] == self._sensor_id:
-                return sensor.get("value")
-        return None
+        reading = self._reading
+        if reading is None:
+            return None
+        return reading.value
 
     @property
     def native_unit_of_measurement(self) -> str | None:
         """Return the unit of measurement."""
         # First check if we have a custom unit from the device
-        for sensor in self.coordinator.data.get("sensors", []):
-            if sensor["id"] == self._sensor_id:
-                device_unit = sensor.get("unit")
-                if device_unit and self.entity_description.key == "generic":
-                    return device_unit
+        reading = self._reading
+        if reading is not None and self.entity_description.key == "generic":
+            device_unit = reading.unit
+            if device_unit:
+                return device_unit
         return self.entity_description.native_unit_of_measurement
 
     @property
     def extra_state_attributes(self) -> dict[str, any]:
         """Return the state attributes."""
-        for sensor in self.coordinator.data.get("sensors", []):
-            if sensor["id"] == self._sensor_id:
-                return {
-                    "state": sensor.get("state", "ok"),
-                    "sensor_id": self._sensor_id,
-                }
-        return {}
+        reading = self._reading
+        if reading is None:
+            return {}
+        # Only rebuild the attribute dict when the reading's state changed
+        state = reading.state
+        restored = self.coordinator.restored
+        history = self.coordinator.history.get(self._sensor_id)
+        statistics = history.statistics if history is not None else None
+        if (
+            self._attributes is None
+            or self._attributes["state"] != state
+            or self._attributes["restored"] != restored
+            or self._attributes.get("statistics") is not statistics
+        ):
+            self._attributes = {
+                "state": state,
+                "sensor_id": self._sensor_id,
+                "restored": restored,
+            }
+            if statistics is not None:
+                self._attributes["statistics"] = statistics
+        return self._attributes
+
+
+class HWGroupPollSensor(CoordinatorEntity, SensorEntity):
+    """Poll performance statistic of a HW Group device."""
+
+    entity_description: HWGroupSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: HWGroupDataUpdateCoordinator,
+        entry: ConfigEntry,
+        description: HWGroupSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        # Without a context the sensor is written after every poll
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+
+        device_info = coordinator.data.get("device_info", {})
+        device_name = entry.data.get(CONF_DEVICE_NAME) or device_info.get("name", "HW Group Device")
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": device_name,
+            "manufacturer": "HW Group",
+            "model": device_info.get("model", "Unknown"),
+            "sw_version": device_info.get("version", "Unknown"),
+        }
+
+    @property
+    def available(self) -> bool:
+        """Stay available while polls fail, that is what these sensors report."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the statistic."""
+        return self.entity_description.value_fn(self.coordinator)
+
+
+class HWGroupSmsQueueSensor(SensorEntity):
+    """Counter of an SMS Gateway's send queue."""
+
+    entity_description: HWGroupSensorEntityDescription
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: HWGroupDataUpdateCoordinator,
+        entry: ConfigEntry,
+        sms_queue: HWGroupSmsQueue,
+        description: HWGroupSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._sms_queue = sms_queue
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+
+        device_info = coordinator.data.get("device_info", {})
+        device_name = entry.data.get(CONF_DEVICE_NAME) or device_info.get("name", "HW Group Device")
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": device_name,
+            "manufacturer": "HW Group",
+            "model": device_info.get("model", "Unknown"),
+            "sw_version": device_info.get("version", "Unknown"),
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to queue updates."""
+        self.async_on_remove(
+            self._sms_queue.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self) -> int:
+        """Return the counter value."""
+        return self.entity_description.value_fn(self._sms_queue)
@@ -0,0 +1,346 @@
+"""SMS send queue for HW Group SMS gateways."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
+import logging
+from uuid import uuid4
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    DEFAULT_SMS_MAX_RETRIES,
+    DEFAULT_SMS_QUEUE_SIZE,
+    DEFAULT_SMS_RATE_LIMIT,
+    DEFAULT_SMS_RETRY_DELAY,
+    SMS_ERROR_PENALTY,
+    SMS_LOAD_PENALTY,
+)
+from .coordinator import HWGroupDataUpdateCoordinator
+from .hwgroup import HWGroupAPI, HWGroupError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SmsQueueFullError(HWGroupError):
+    """Exception raised when the SMS queue cannot take more messages."""
+
+
+@dataclass
+class SmsJob:
+    """A single message to a single recipient."""
+
+    ticket: str
+    phone_number: str
+    message: str
+    attempts: int = 0
+    # Pinned jobs never leave the gateway they were queued on
+    pinned: bool = True
+    # Gateways that already failed to send this job
+    tried: set[str] = field(default_factory=set)
+
+
+class HWGroupSmsQueue:
+    """Bounded send queue with a rate-limited background worker per gateway.
+
+    Service calls only enqueue messages and return a ticket. The worker sends
+    at most ``rate_limit`` messages per minute and retries failed messages
+    with exponential backoff before counting them as failed. If a gateway
+    pool set ``failover``, unpinned messages that failed are first handed to
+    another gateway.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: HWGroupAPI,
+        rate_limit: int = DEFAULT_SMS_RATE_LIMIT,
+        max_size: int = DEFAULT_SMS_QUEUE_SIZE,
+        max_retries: int = DEFAULT_SMS_MAX_RETRIES,
+    ) -> None:
+        """Initialize the queue."""
+        self.hass = hass
+        self.api = api
+        self.max_retries = max_retries
+        self._send_interval = 60 / rate_limit
+        self._queue: asyncio.Queue[SmsJob] = asyncio.Queue(max_size)
+        self._worker: asyncio.Task | None = None
+        self._retry_handles: set[asyncio.TimerHandle] = set()
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._sending = 0
+        # Returns True if another gateway took over a failed job
+        self.failover: Callable[[SmsJob], bool] | None = None
+        self.consecutive_failures = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    @property
+    def free_slots(self) -> int:
+        """Return the number of messages that can still be queued."""
+        return self._queue.maxsize - self._queue.qsize()
+
+    @property
+    def depth(self) -> int:
+        """Return the number of messages waiting or being sent."""
+        return self._queue.qsize() + self._sending + len(self._retry_handles)
+
+    @callback
+    def async_start(self) -> None:
+        """Start the background worker."""
+        self._worker = self.hass.async_create_background_task(
+            self._async_worker(), f"hwgroup sms queue {self.api.host}"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the worker and drop pending retries."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for changes of the queue counters."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def async_enqueue(self, recipients: list[str], message: str) -> str:
+        """Queue a message for one or more recipients and return its ticket."""
+        if self.free_slots < len(recipients):
+            raise SmsQueueFullError(
+                f"SMS queue full, cannot queue {len(recipients)} messages"
+            )
+        ticket = uuid4().hex
+        for phone_number in recipients:
+            self._queue.put_nowait(SmsJob(ticket, phone_number, message))
+        _LOGGER.debug("Queued SMS %s for %d recipients", ticket, len(recipients))
+        self._async_notify()
+        return ticket
+
+    @callback
+    def async_put(self, job: SmsJob) -> None:
+        """Queue a job handed over by the gateway pool."""
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull as err:
+            raise SmsQueueFullError("SMS queue full") from err
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify listeners about changed counters."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def _async_worker(self) -> None:
+        """Drain the queue at the configured rate."""
+        while True:
+            job = await self._queue.get()
+            self._sending += 1
+            try:
+                await self._async_send(job)
+            except Exception:  # pylint: disable=broad-except
+                # Any error ends only this job, not the worker
+                self.failed += 1
+                _LOGGER.exception("Dropping SMS %s to %s", job.ticket, job.phone_number)
+            finally:
+                self._sending -= 1
+                self._queue.task_done()
+                self._async_notify()
+            await asyncio.sleep(self._send_interval)
+
+    async def _async_send(self, job: SmsJob) -> None:
+        """Send one message and schedule a retry if it failed."""
+        job.attempts += 1
+        try:
+            sent = await self.api.async_send_sms(job.phone_number, job.message)
+        except Exception:  # pylint: disable=broad-except
+            # Count it as a failed attempt, so the worker keeps draining
+            _LOGGER.exception(
+                "Unexpected error sending SMS %s to %s", job.ticket, job.phone_number
+            )
+            sent = False
+        if sent:
+            self.sent += 1
+            self.consecutive_failures = 0
+            return
+
+        self.consecutive_failures += 1
+        if not job.pinned and self.failover is not None and self.failover(job):
+            return
+
+        if job.attempts > self.max_retries:
+            self.failed += 1
+            _LOGGER.error(
+                "Giving up on SMS %s to %s after %d attempts",
+                job.ticket,
+                job.phone_number,
+                job.attempts,
+            )
+            return
+
+        self.retried += 1
+        delay = DEFAULT_SMS_RETRY_DELAY * 2 ** (job.attempts - 1)
+        _LOGGER.warning(
+            "SMS %s to %s failed, retrying in %ss", job.ticket, job.phone_number, delay
+        )
+        handle: asyncio.TimerHandle | None = None
+
+        @callback
+        def _async_retry() -> None:
+            self._retry_handles.discard(handle)
+            try:
+                self._queue.put_nowait(job)
+            except asyncio.QueueFull:
+                self.failed += 1
+                _LOGGER.error("SMS queue full, dropping retry of %s", job.ticket)
+                self._async_notify()
+
+        handle = self.hass.loop.call_later(delay, _async_retry)
+        self._retry_handles.add(handle)
+
+
+class HWGroupSmsPool:
+    """Pick an SMS gateway per message across all configured gateways.
+
+    Gateways are scored by signal quality, minus a penalty per message
+    waiting in their queue and per error since their last successful send
+    (failed sends plus the ``sms_errors`` counter reported by the device).
+    Gateways that cannot be polled are only used if no other is left.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the pool."""
+        self.hass = hass
+        self._gateways: dict[
+            str, tuple[HWGroupDataUpdateCoordinator, HWGroupSmsQueue]
+        ] = {}
+        # (sent counter, sms_errors reading) at the last successful send
+        self._error_baselines: dict[str, tuple[int, int]] = {}
+        # Calls currently ringing through each gateway
+        self._calls: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Return the number of gateways in the pool."""
+        return len(self._gateways)
+
+    @callback
+    def async_register(
+        self,
+        key: str,
+        coordinator: HWGroupDataUpdateCoordinator,
+        sms_queue: HWGroupSmsQueue,
+    ) -> CALLBACK_TYPE:
+        """Add a gateway to the pool and return a callback to remove it."""
+        self._gateways[key] = (coordinator, sms_queue)
+        sms_queue.failover = partial(self._async_failover, key)
+        return partial(self._async_unregister, key)
+
+    @callback
+    def _async_unregister(self, key: str) -> None:
+        """Remove a gateway from the pool."""
+        if (gateway := self._gateways.pop(key, None)) is not None:
+            gateway[1].failover = None
+        self._error_baselines.pop(key, None)
+        self._calls.pop(key, None)
+
+    def score(self, key: str) -> float:
+        """Return how well a gateway is suited for the next message."""
+        coordinator, sms_queue = self._gateways[key]
+        sensors = (coordinator.data or {}).get("sensors", {})
+
+        if (reading := sensors.get("signal_quality")) is not None:
+            quality = reading.value
+        elif (reading := sensors.get("signal_strength")) is not None:
+            # Map -113..-51 dBm onto 0..100 %
+            quality = min(max((reading.value + 113) * 100 / 62, 0), 100)
+        else:
+            quality = 50
+
+        errors = sms_queue.consecutive_failures
+        if (reading := sensors.get("sms_errors")) is not None:
+            sent, baseline = self._error_baselines.get(key, (-1, 0))
+            if sent != sms_queue.sent:
+                baseline = reading.value
+                self._error_baselines[key] = (sms_queue.sent, baseline)
+            errors += max(reading.value - baseline, 0)
+
+        load = sms_queue.depth + self._calls.get(key, 0)
+        return quality - SMS_LOAD_PENALTY * load - SMS_ERROR_PENALTY * errors
+
+    def _ranked(self, exclude: set[str] = frozenset()) -> list[str]:
+        """Return the gateways from best to worst."""
+        keys = [key for key in self._gateways if key not in exclude]
+        return sorted(
+            keys,
+            key=lambda key: (
+                not self._gateways[key][0].last_update_success,
+                -self.score(key),
+            ),
+        )
+
+    @callback
+    def async_enqueue(self, recipients: list[str], message: str) -> str:
+        """Spread a message for one or more recipients across the gateways."""
+        free = sum(sms_queue.free_slots for _, sms_queue in self._gateways.values())
+        if not self._gateways or free < len(recipients):
+            raise SmsQueueFullError(
+                f"SMS queues full, cannot queue {len(recipients)} messages"
+            )
+        ticket = uuid4().hex
+        for phone_number in recipients:
+            job = SmsJob(ticket, phone_number, message, pinned=False)
+            # Every queued message lowers the gateway's score for the next one
+            for key in self._ranked():
+                sms_queue = self._gateways[key][1]
+                if sms_queue.free_slots:
+                    sms_queue.async_put(job)
+                    break
+        _LOGGER.debug("Spread SMS %s over %d gateways", ticket, len(self._gateways))
+        return ticket
+
+    @callback
+    def _async_failover(self, key: str, job: SmsJob) -> bool:
+        """Hand a failed job to the best gateway that has not tried it yet."""
+        job.tried.add(key)
+        for other in self._ranked(exclude=job.tried):
+            try:
+                self._gateways[other][1].async_put(job)
+            except SmsQueueFullError:
+                continue
+            _LOGGER.warning(
+                "SMS %s to %s failed on %s, failing over to %s",
+                job.ticket,
+                job.phone_number,
+                key,
+                other,
+            )
+            return True
+        return False
+
+    async def async_call_number(self, phone_number: str) -> bool:
+        """Ring a number through the best gateway, failing over on errors."""
+        for key in self._ranked():
+            # A gateway may have been unloaded while the previous one rang
+            if (gateway := self._gateways.get(key)) is None:
+                continue
+            sms_queue = gateway[1]
+            self._calls[key] = self._calls.get(key, 0) + 1
+            try:
+                success = await sms_queue.api.async_call_number(phone_number)
+            finally:
+                if key in self._calls:
+                    self._calls[key] -= 1
+            if success:
+                sms_queue.consecutive_failures = 0
+                return True
+            sms_queue.consecutive_failures += 1
+            _LOGGER.warning("Call to %s failed on %s", phone_number, key)
+        return False
@@ -0,0 +1,65 @@
+"""Diffing and inversion of HW Group snapshots.
+
+The coordinator compares every new snapshot with the previous one to wake
+only the entities whose reading changed, and inverts the configured binary
+sensors once per snapshot. This module does not import Home Assistant, so
+the benchmarks can load it on their own.
+"""
+from __future__ import annotations
+
+import dataclasses
+from typing import Any
+
+# Snapshot keys holding per-entity readings
+READING_KEYS = ("sensors", "binary_sensors", "switches")
+
+
+def snapshot_changes(
+    previous: dict[str, Any], data: dict[str, Any]
+) -> set[tuple[str, str]]:
+    """Return the ``(snapshot key, reading ID)`` pairs that differ."""
+    if data is previous:
+        return set()
+
+    changed: set[tuple[str, str]] = set()
+    for key in READING_KEYS:
+        old_readings = previous.get(key, {})
+        new_readings = data.get(key, {})
+        for reading_id, reading in new_readings.items():
+            old = old_readings.get(reading_id)
+            if old is not reading and old != reading:
+                changed.add((key, reading_id))
+        # Entities of removed readings must update to unknown
+        for reading_id in old_readings.keys() - new_readings.keys():
+            changed.add((key, reading_id))
+    return changed
+
+
+def apply_inversion(
+    raw: dict[str, Any],
+    inverted: frozenset[str],
+    previous_raw: dict[str, Any] | None = None,
+    previous: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Return the snapshot with the inverted binary sensor states.
+
+    ``previous_raw`` and ``previous`` are the last snapshot before and after
+    inversion with the same ``inverted`` set. Readings that are unchanged
+    since then keep their inverted copy.
+    """
+    if not inverted:
+        return raw
+    previous_raw_binaries = (previous_raw or {}).get("binary_sensors", {})
+    previous_binaries = (previous or {}).get("binary_sensors", {})
+    binary_sensors = {}
+    for binary_id, binary in raw.get("binary_sensors", {}).items():
+        if binary_id in inverted:
+            if (
+                previous_raw_binaries.get(binary_id) is binary
+                and (old := previous_binaries.get(binary_id)) is not None
+            ):
+                binary = old
+            else:
+                binary = dataclasses.replace(binary, state=not binary.state)
+        binary_sensors[binary_id] = binary
+    return {**raw, "binary_sensors": binary_sensors}
@@ -0,0 +1,366 @@
+"""SNMP transport for HW Group Poseidon devices.
+
+Polls only need GETBULK requests over SNMPv2c, so this module encodes and
+decodes those few BER messages itself and sends them over a datagram
+endpoint. Object identifiers of responses stay BER encoded: the encoding
+of a table column is a prefix of the encoding of all its cells, so rows
+can be matched to columns without decoding them.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any
+
+import aiohttp
+
+from .const import (
+    DEFAULT_SNMP_COMMUNITY,
+    DEFAULT_SNMP_MAX_REPETITIONS,
+    DEFAULT_SNMP_PORT,
+    DEFAULT_SNMP_RETRIES,
+    DEFAULT_SNMP_TIMEOUT,
+    DEVICE_TYPE_SMS_GATEWAY,
+)
+from .hwgroup import HWGroupAPI, HWGroupConnectionError, build_snapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Tables of the POSEIDON-MIB (enterprise 21796)
+POSEIDON_OID = "1.3.6.1.4.1.21796.3.3"
+INPUT_ENTRY = f"{POSEIDON_OID}.1.1"
+OUTPUT_ENTRY = f"{POSEIDON_OID}.2.1"
+SENSOR_ENTRY = f"{POSEIDON_OID}.3.1"
+
+# Columns fetched on every poll: snapshot key, field, column OID
+SNMP_COLUMNS: tuple[tuple[str, str, str], ...] = (
+    ("sensors", "state", f"{SENSOR_ENTRY}.3"),  # sensState
+    ("sensors", "value", f"{SENSOR_ENTRY}.5"),  # sensValue, tenths
+    ("sensors", "id", f"{SENSOR_ENTRY}.8"),  # sensID, the ID in values.xml
+    ("binary_sensors", "value", f"{INPUT_ENTRY}.2"),  # inpValue
+    ("binary_sensors", "alarm_state", f"{INPUT_ENTRY}.5"),  # inpAlarmState
+    ("switches", "value", f"{OUTPUT_ENTRY}.2"),  # outValue
+)
+
+SNMP_VERSION_2C = 1
+
+# BER tags of the types used in GETBULK requests and their responses
+_INTEGER = 0x02
+_OCTET_STRING = 0x04
+_OBJECT_IDENTIFIER = 0x06
+_SEQUENCE = 0x30
+_COUNTER32 = 0x41
+_GAUGE32 = 0x42
+_TIMETICKS = 0x43
+_GET_RESPONSE = 0xA2
+_GET_BULK_REQUEST = 0xA5
+_UNSIGNED_TAGS = frozenset({_COUNTER32, _GAUGE32, _TIMETICKS})
+_NULL_VALUE = b"\x05\x00"
+
+
+def _encode(tag: int, content: bytes) -> bytes:
+    """Return a BER encoded value."""
+    length = len(content)
+    if length < 0x80:
+        return bytes((tag, length)) + content
+    size = (length.bit_length() + 7) // 8
+    return bytes((tag, 0x80 | size)) + length.to_bytes(size, "big") + content
+
+
+def _encode_integer(value: int) -> bytes:
+    """Return a BER encoded non-negative integer."""
+    return _encode(_INTEGER, value.to_bytes(value.bit_length() // 8 + 1, "big"))
+
+
+def encode_oid(oid: str) -> bytes:
+    """Return the BER content of a dotted object identifier."""
+    arcs = [int(arc) for arc in oid.split(".")]
+    encoded = bytearray()
+    for arc in (arcs[0] * 40 + arcs[1], *arcs[2:]):
+        # Base 128, most significant group first, high bit set on all but the last
+        groups = [arc & 0x7F]
+        arc >>= 7
+        while arc:
+            groups.append(0x80 | (arc & 0x7F))
+            arc >>= 7
+        encoded.extend(reversed(groups))
+    return bytes(encoded)
+
+
+def encode_get_bulk(
+    community: str, request_id: int, max_repetitions: int, oids: list[bytes]
+) -> bytes:
+    """Return an SNMPv2c GetBulkRequest for BER encoded object identifiers."""
+    var_binds = b"".join(
+        _encode(_SEQUENCE, _encode(_OBJECT_IDENTIFIER, oid) + _NULL_VALUE)
+        for oid in oids
+    )
+    pdu = _encode(
+        _GET_BULK_REQUEST,
+        _encode_integer(request_id)
+        + _encode_integer(0)  # non-repeaters
+        + _encode_integer(max_repetitions)
+        + _encode(_SEQUENCE, var_binds),
+    )
+    return _encode(
+        _SEQUENCE,
+        _encode_integer(SNMP_VERSION_2C)
+        + _encode(_OCTET_STRING, community.encode())
+        + pdu,
+    )
+
+
+def _decode(data: bytes, offset: int) -> tuple[int, int, int]:
+    """Return the tag, start and end of the content of the value at offset."""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset : offset + size], "big")
+        offset += size
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Truncated BER value")
+    return tag, offset, end
+
+
+def _decode_integer(data: bytes, offset: int) -> tuple[int, int]:
+    """Return an INTEGER at offset and the offset after it."""
+    tag, start, end = _decode(data, offset)
+    if tag != _INTEGER:
+        raise ValueError(f"Expected an INTEGER, got tag {tag:#x}")
+    return int.from_bytes(data[start:end], "big", signed=True), end
+
+
+def decode_response(
+    data: bytes,
+) -> tuple[int, int, list[tuple[bytes, int | None]]]:
+    """Decode an SNMPv2c GetResponse.
+
+    Returns the request ID, the error status and the variables as pairs of
+    BER encoded object identifier and value. Values of other than integer
+    types, including endOfMibView, noSuchObject and noSuchInstance, are
+    None. Raises ValueError (or IndexError) for malformed messages.
+    """
+    tag, offset, _end = _decode(data, 0)
+    if tag != _SEQUENCE:
+        raise ValueError("Not an SNMP message")
+    version, offset = _decode_integer(data, offset)
+    if version != SNMP_VERSION_2C:
+        raise ValueError(f"Unexpected SNMP version {version}")
+    _tag, _start, offset = _decode(data, offset)  # community
+    tag, offset, _end = _decode(data, offset)
+    if tag != _GET_RESPONSE:
+        raise ValueError(f"Unexpected PDU type {tag:#x}")
+    request_id, offset = _decode_integer(data, offset)
+    error_status, offset = _decode_integer(data, offset)
+    _error_index, offset = _decode_integer(data, offset)
+
+    _tag, offset, end = _decode(data, offset)
+    var_binds: list[tuple[bytes, int | None]] = []
+    while offset < end:
+        _tag, offset, var_bind_end = _decode(data, offset)
+        tag, start, offset = _decode(data, offset)
+        if tag != _OBJECT_IDENTIFIER:
+            raise ValueError(f"Expected an OBJECT IDENTIFIER, got tag {tag:#x}")
+        oid = data[start:offset]
+        tag, start, offset = _decode(data, offset)
+        if tag == _INTEGER or tag in _UNSIGNED_TAGS:
+            value = int.from_bytes(data[start:offset], "big", signed=tag == _INTEGER)
+        else:
+            value = None
+        var_binds.append((oid, value))
+        offset = var_bind_end
+    return request_id, error_status, var_binds
+
+
+class _SnmpProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol that hands responses to the pending requests."""
+
+    def __init__(self) -> None:
+        """Initialize the protocol."""
+        self.transport: asyncio.DatagramTransport | None = None
+        # Request ID -> future of the error status and variables
+        self.pending: dict[int, asyncio.Future[tuple[int, list]]] = {}
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store the transport."""
+        self.transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Resolve the request a response belongs to."""
+        try:
+            request_id, error_status, var_binds = decode_response(data)
+        except (IndexError, ValueError) as err:
+            _LOGGER.debug("Ignoring malformed SNMP message from %s: %s", addr, err)
+            return
+        future = self.pending.get(request_id)
+        if future is not None and not future.done():
+            future.set_result((error_status, var_binds))
+
+    def error_received(self, exc: Exception) -> None:
+        """Fail the pending requests, e.g. if the port is unreachable."""
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Fail the pending requests when the transport closes."""
+        self.transport = None
+        self.error_received(exc or ConnectionError("SNMP transport closed"))
+
+
+_ENCODED_COLUMNS = tuple(
+    (key, field, encode_oid(oid)) for key, field, oid in SNMP_COLUMNS
+)
+
+
+def add_rows(
+    pending: list[tuple[list[int], bytes, bytes]],
+    var_binds: list[tuple[bytes, int | None]],
+) -> list[tuple[list[int], bytes, bytes]]:
+    """Add the rows of a GETBULK response to the walked columns.
+
+    ``pending`` holds the values, the OID and the last walked OID of each
+    unfinished column, in request order. Returns the columns that did not
+    end in this response.
+    """
+    # Responses are row-major, one variable per requested column, and
+    # agents may cut them short to fit their message size
+    still_pending = []
+    for index, (values, column, last) in enumerate(pending):
+        for oid, value in var_binds[index :: len(pending)]:
+            if value is None or not oid.startswith(column):
+                break
+            values.append(value)
+            last = oid
+        else:
+            still_pending.append((values, column, last))
+    return still_pending
+
+
+class HWGroupSnmpAPI(HWGroupAPI):
+    """API client that polls the readings of Poseidon devices over SNMP.
+
+    The first poll, and any poll after the SNMP tables stopped matching
+    the learned layout, reads values.xml over HTTP to learn the device
+    info and the metadata of every entry. Later polls only walk the state
+    and value columns of the sensor, input and output tables with GETBULK
+    requests. Commands (outputs, SMS) and SMS Gateways keep using HTTP.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession | None,
+        username: str | None = None,
+        password: str | None = None,
+        community: str = DEFAULT_SNMP_COMMUNITY,
+        snmp_port: int = DEFAULT_SNMP_PORT,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the API client."""
+        super().__init__(host, session, username, password, **kwargs)
+        self.community = community
+        self.snmp_port = snmp_port
+        self.snmp_requests = 0
+        self._protocol: _SnmpProtocol | None = None
+        self._request_id = random.randrange(1 << 30)
+
+    async def async_close(self) -> None:
+        """Close the SNMP endpoint and the dedicated session."""
+        if self._protocol is not None and self._protocol.transport is not None:
+            self._protocol.transport.close()
+        self._protocol = None
+        await super().async_close()
+
+    async def _async_get_values(self) -> dict[str, Any]:
+        """Walk the SNMP tables, or read values.xml to learn the layout."""
+        layout = self.layout
+        previous = self._snapshot
+        if (
+            layout is None
+            or previous is None
+            or self._device_type == DEVICE_TYPE_SMS_GATEWAY
+        ):
+            return await super()._async_get_values()
+
+        start = time.perf_counter()
+        rows = max((len(known) for known in layout.sets.values()), default=0)
+        columns = await self._async_walk(rows)
+        parse_start = time.perf_counter()
+        self.last_request_duration = parse_start - start
+        self._request_durations.append(self.last_request_duration)
+        self.last_payload_bytes = None
+
+        data = build_snapshot(columns, layout, previous)
+        self.last_parse_duration = time.perf_counter() - parse_start
+        if data is None:
+            _LOGGER.debug("SNMP tables of %s changed, relearning device layout", self.host)
+            return await super()._async_get_values()
+        self._snapshot = data
+        # A later values.xml must be parsed again, not taken from the cache
+        self._values_digest = None
+        return data
+
+    async def _async_request(
+        self, oids: list[bytes], repetitions: int
+    ) -> list[tuple[bytes, int | None]]:
+        """Send a GETBULK request and return the variables of the response."""
+        loop = asyncio.get_running_loop()
+        if self._protocol is None or self._protocol.transport is None:
+            try:
+                _transport, self._protocol = await loop.create_datagram_endpoint(
+                    _SnmpProtocol, remote_addr=(self.host, self.snmp_port)
+                )
+            except OSError as err:
+                raise HWGroupConnectionError(f"SNMP error: {err}") from err
+        protocol = self._protocol
+        self._request_id = request_id = (self._request_id + 1) & 0x7FFFFFFF
+        message = encode_get_bulk(self.community, request_id, repetitions, oids)
+        future: asyncio.Future[tuple[int, list]] = loop.create_future()
+        protocol.pending[request_id] = future
+        try:
+            # Retries resend the same message, so a late response still counts
+            for _attempt in range(DEFAULT_SNMP_RETRIES + 1):
+                self.snmp_requests += 1
+                protocol.transport.sendto(message)
+                try:
+                    error_status, var_binds = await asyncio.wait_for(
+                        asyncio.shield(future), DEFAULT_SNMP_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                break
+            else:
+                raise HWGroupConnectionError("SNMP request timed out")
+        except OSError as err:
+            raise HWGroupConnectionError(f"SNMP error: {err}") from err
+        finally:
+            del protocol.pending[request_id]
+        if error_status:
+            raise HWGroupConnectionError(f"SNMP error status {error_status}")
+        if not var_binds:
+            raise HWGroupConnectionError("Empty SNMP response")
+        return var_binds
+
+    async def _async_walk(self, rows: int) -> dict[str, dict[str, list[int]]]:
+        """Walk all columns together with as few GETBULK requests as possible."""
+        columns: dict[str, dict[str, list[int]]] = {}
+        # (values, column OID, last OID) per unfinished column
+        pending: list[tuple[list[int], bytes, bytes]] = []
+        for key, field, column in _ENCODED_COLUMNS:
+            values = columns.setdefault(key, {}).setdefault(field, [])
+            pending.append((values, column, column))
+        # One row more than expected shows that a column ended
+        repetitions = min(rows + 1, DEFAULT_SNMP_MAX_REPETITIONS)
+
+        while pending:
+            var_binds = await self._async_request(
+                [last for _values, _column, last in pending], repetitions
+            )
+            pending = add_rows(pending, var_binds)
+        return columns
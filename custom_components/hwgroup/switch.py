@@ -6,16 +6,15 @@ from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .hwgroup import HWGroupAPI
+from .coordinator import HWGroupDataUpdateCoordinator
+from .hwgroup import HWGroupAPI, OutputReading
 from .const import CONF_DEVICE_NAME
+from .const import CONF_OPTIMISTIC_SWITCHES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,11 +29,11 @@ async def async_setup_entry(
     api = hass.data[DOMAIN][entry.entry_id]["api"]
 
     switches = []
-    switch_list = coordinator.data.get("switches", [])
+    switch_list = coordinator.data.get("switches", {}).values()
     _LOGGER.info("Setting up %d switches for entry %s", len(switch_list), entry.entry_id)
     
     for switch_data in switch_list:
-        _LOGGER.debug("Creating switch: %s", switch_data.get("name"))
+        _LOGGER.debug("Creating switch: %s", switch_data.name)
         switches.append(
             HWGroupSwitch(
                 coordinator,
@@ -56,17 +55,20 @@ class HWGroupSwitch(CoordinatorEntity, SwitchEntity):
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: HWGroupDataUpdateCoordinator,
         api: HWGroupAPI,
         entry: ConfigEntry,
-        switch_data: dict,
+        switch_data: OutputReading,
     ) -> None:
         """Initialize the switch."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=("switches", switch_data.id))
         self._api = api
-        self._switch_id = switch_data["id"]
-        self._attr_name = switch_data["name"]
-        self._attr_unique_id = f"{entry.entry_id}_switch_{switch_data['id']}"
+        self._switch_id = switch_data.id
+        self._attr_name = switch_data.name
+        self._attr_unique_id = f"{entry.entry_id}_switch_{switch_data.id}"
+        self._optimistic = entry.data.get(CONF_OPTIMISTIC_SWITCHES, False)
+        # State shown until the next update for this output arrives
+        self._optimistic_state: bool | None = None
         
         # Set device info
         device_info = coordinator.data.get("device_info", {})
@@ -82,24 +84,63 @@ class HWGroupSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def is_on(self) -> bool | None:
         """Return true if the switch is on."""
-        for switch in self.coordinator.data.get("switches", []):
-            if switch["id"] == self._switch_id:
-                return switch.get("state", False)
-        return None
+        if self._optimistic_state is not None:
+            return self._optimistic_state
+        switch = self.coordinator.data.get("switches", {}).get(self._switch_id)
+        if switch is None:
+            return None
+        return switch.state
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        if await self._api.async_set_output(self._switch_id, True):
-            await self.coordinator.async_request_refresh()
+        await self._async_set_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        if await self._api.async_set_output(self._switch_id, False):
-            await self.coordinator.async_request_refresh()
+        await self._async_set_state(False)
+
+    async def _async_set_state(self, state: bool) -> None:
+        """Switch the output, optimistically if enabled."""
+        if not self._optimistic:
+            if await self._api.async_set_output(self._switch_id, state):
+                await self.coordinator.async_request_refresh()
+            return
+
+        # Show the new state right away
+        self._optimistic_state = state
+        self.async_write_ha_state()
+
+        success, confirmed = await self._api.async_set_output_state(
+            self._switch_id, state
+        )
+        if success and confirmed in (None, state):
+            # The next poll replaces the optimistic state even if the output
+            # reading equals the previous snapshot, e.g. because the output
+            # was switched back on the device in the meantime
+            self.coordinator.async_notify_on_next_update(self.coordinator_context)
+            return
+
+        # Command failed or the device reports a different state
+        _LOGGER.debug(
+            "Output %s did not confirm state %s (reported: %s), rolling back",
+            self._switch_id,
+            state,
+            confirmed,
+        )
+        self._optimistic_state = confirmed
+        self.async_write_ha_state()
+        await self.coordinator.async_request_confirmation(self.coordinator_context)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._optimistic_state = None
+        super()._handle_coordinator_update()
 
     @property
-    def extra_state_attributes(self) -> dict[str, any]:
+    def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
         return {
             "output_id": self._switch_id,
+            "restored": self.coordinator.restored,
         }
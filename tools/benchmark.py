@@ -0,0 +1,724 @@
+#!/usr/bin/env python3
+"""
+HW Group Parser Benchmarks
+Measures the parsing and entity update hot paths offline against the
+recorded device responses in tools/fixtures.
+
+Usage:
+1. Run the benchmarks: python tools/benchmark.py
+2. Store the results as the new baseline: python tools/benchmark.py --save
+3. Compare against the baseline: python tools/benchmark.py --check
+4. Check the fast paths against reference implementations:
+   python tools/benchmark.py --verify
+5. Compare the values.xml parser with the original ElementTree parse:
+   python tools/benchmark.py --compare-parsers
+
+Requirements:
+- aiohttp (imported by the API client); Home Assistant is not needed
+
+The --check run exits with status 1 if any benchmark got slower or
+allocates more than the baseline allows (see --tolerance). Baselines are
+machine specific, so only compare runs made on the same host. The
+--verify run exits with status 1 if any result differs from its reference.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import platform
+import random
+import re
+import statistics
+import struct
+import sys
+import time
+import tracemalloc
+import types
+from pathlib import Path
+from xml.etree import ElementTree
+
+TOOLS_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = TOOLS_DIR / "fixtures"
+BASELINE_FILE = TOOLS_DIR / "benchmark_baseline.json"
+COMPONENT_DIR = TOOLS_DIR.parent / "custom_components" / "hwgroup"
+
+# values.xml fixtures: name -> file
+VALUES_FIXTURES = {
+    "poseidon3268_1": "poseidon3268_1.xml",
+    "poseidon3268_16": "poseidon3268_16.xml",
+    "poseidon3268_16_plain": "poseidon3268_16_plain.xml",
+    "poseidon3268_64": "poseidon3268_64.xml",
+    "poseidon3266": "poseidon3266.xml",
+    "sms_gateway": "sms_gateway_values.xml",
+    "sms_gateway_ns": "sms_gateway_values_ns.xml",
+}
+
+STATUS_FIXTURES = {
+    "sms_gateway": "sms_gateway_status.xml",
+    "sms_gateway_ns": "sms_gateway_status_ns.xml",
+}
+
+UNITS = ["C", "°F", "%RH", "%", "V", "A", "mA", "ppm", "lux", ""]
+
+# Words entity names are built from for the classifier benchmarks
+NAME_WORDS = [
+    "Door", "Tür", "Window", "PIR", "Smoke", "Leak", "Humidity", "Temp",
+    "Server", "Rack", "Room", "Outdoor", "Battery", "Power", "Gas", "Light",
+    "Alarm", "Input", "Sensor", "Signal", "Strength", "SMS", "Sent", "Front",
+    "Serverraum", "Keller", "Halle", "A", "B", "1", "2", "3",
+]
+SENSOR_TYPES = ["temperature", "humidity", "voltage", "current", "generic"]
+CLASSIFY_NAMES = 5000
+FLEET_SIZE = 100
+# Rolling statistics: sensors per device, windows in minutes, poll interval
+HISTORY_SENSORS = 64
+HISTORY_WINDOWS = (5, 15, 60)
+HISTORY_INTERVAL = 30
+# Rolling statistics checks: (windows in minutes, buffer size, samples)
+HISTORY_CHECKS = [
+    ((15,), 31, 200),
+    ((1, 5), 5, 200),
+    ((5, 15, 60), 200, 1000),
+]
+# Recorded SNMP walk of the same device as poseidon3268_16.xml
+SNMP_FIXTURE = "snmp/poseidon3268_16.snmprec"
+
+VALUE_PATTERN = re.compile(rb"<Value>(-?\d+)\.(\d)</Value>")
+FIELD_PATTERN = re.compile(rb"<(Value|State)>[^<]*</\1>")
+
+
+def load_module(name):
+    """Import a module of the integration without importing Home Assistant."""
+    if "hwgroup_bench" not in sys.modules:
+        package = types.ModuleType("hwgroup_bench")
+        package.__path__ = [str(COMPONENT_DIR)]
+        sys.modules["hwgroup_bench"] = package
+    return importlib.import_module(f"hwgroup_bench.{name}")
+
+
+def load_hwgroup():
+    """Import the API module without importing Home Assistant."""
+    return load_module("hwgroup")
+
+
+def entity_names(count, seed=17):
+    """Return reproducible entity names with sensor types."""
+    rng = random.Random(seed)
+    return [
+        (
+            " ".join(rng.choice(NAME_WORDS) for _ in range(rng.randint(1, 4))),
+            rng.choice(SENSOR_TYPES),
+        )
+        for _ in range(count)
+    ]
+
+
+def create_api(hwgroup):
+    """Create an API client that never touches the network."""
+    # Any session object prevents the client from creating its own
+    return hwgroup.HWGroupAPI("bench.invalid", session=object())
+
+
+def changed_payload(payload, count=0):
+    """Return the payload with the first count (default all) sensor values changed."""
+    def bump(match):
+        return b"<Value>%s.%d</Value>" % (match.group(1), (int(match.group(2)) + 1) % 10)
+    return VALUE_PATTERN.sub(bump, payload, count)
+
+
+def snmp_response(snmp, records, bump=0):
+    """Return the GetResponse of an agent walking all polled columns at once.
+
+    records are the (OID, type, value) lines of a .snmprec file. Every
+    column gets one row past its end, like a GETBULK with one spare
+    repetition. Sensor values are changed by bump tenths.
+    """
+    columns = []
+    for key, field, column in snmp.SNMP_COLUMNS:
+        change = bump if (key, field) == ("sensors", "value") else 0
+        rows = [
+            (oid, int(value) + change)
+            for oid, _type, value in records
+            if oid.startswith(column + ".")
+        ]
+        # The next record of the walk ends the column, after the last
+        # record the agent answers endOfMibView
+        last = max(
+            index
+            for index, (oid, _type, _value) in enumerate(records)
+            if oid.startswith(column + ".")
+        )
+        if last + 1 < len(records):
+            oid, value_type, value = records[last + 1]
+            rows.append((oid, int(value) if value_type == "2" else None))
+        else:
+            rows.append((rows[-1][0], None))
+        columns.append(rows)
+
+    var_binds = []
+    for row in zip(*columns):
+        for oid, value in row:
+            encoded = snmp._encode(snmp._OBJECT_IDENTIFIER, snmp.encode_oid(oid))
+            if value is None:
+                encoded += b"\x82\x00"  # endOfMibView
+            else:
+                encoded += snmp._encode_integer(value)
+            var_binds.append(snmp._encode(snmp._SEQUENCE, encoded))
+    pdu = snmp._encode(
+        snmp._GET_RESPONSE,
+        snmp._encode_integer(1)
+        + snmp._encode_integer(0)
+        + snmp._encode_integer(0)
+        + snmp._encode(snmp._SEQUENCE, b"".join(var_binds)),
+    )
+    return snmp._encode(
+        snmp._SEQUENCE,
+        snmp._encode_integer(snmp.SNMP_VERSION_2C) + snmp._encode(snmp._OCTET_STRING, b"public") + pdu,
+    )
+
+
+def modbus_responses(snapshot):
+    """Return the read responses of a Poseidon2 unit holding a snapshot."""
+    def bits(function, readings):
+        packed = bytearray((len(readings) + 7) // 8)
+        for index, reading in enumerate(readings):
+            packed[index // 8] |= reading.state << (index % 8)
+        return bytes((function, len(packed))) + packed
+
+    sensors = list(snapshot["sensors"].values())
+    return [
+        bytes((0x04, 2 * len(sensors)))
+        + struct.pack(f">{len(sensors)}h", *(round(reading.value * 10) for reading in sensors)),
+        bits(0x02, list(snapshot["binary_sensors"].values())),
+        bits(0x01, list(snapshot["switches"].values())),
+    ]
+
+
+def baseline_parse(api, payload):
+    """Parse values.xml like the integration did before the incremental parser.
+
+    The document is decoded, built into a full tree and searched for each
+    set, and every entry becomes a new dict. Kept here as the reference
+    the parser is compared with.
+    """
+    root = ElementTree.fromstring(payload.decode())
+    namespace = {"val": "http://www.etech.cz/XMLSchema/poseidon/values.xsd"}
+    data = {"device_info": {}, "sensors": [], "binary_sensors": [], "switches": []}
+
+    def find(tag):
+        elem = root.find(f".//{tag}")
+        return elem if elem is not None else root.find(f".//val:{tag}", namespace)
+
+    if (agent := find("Agent")) is not None:
+        model = agent.findtext("Title") or agent.findtext("ProductName") or "Unknown"
+        data["device_info"] = {
+            "name": agent.findtext("DeviceName", model),
+            "version": agent.findtext("Version", "Unknown"),
+            "model": model,
+            "serial": agent.findtext("SerialNumber", "Unknown"),
+            "device_type": api._detect_device_type(model),
+        }
+    if (senset := find("SenSet")) is not None:
+        for entry in senset.findall("Entry"):
+            value = entry.findtext("Value")
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                pass
+            unit = entry.findtext("Units", "")
+            data["sensors"].append(
+                {
+                    "id": entry.findtext("ID"),
+                    "name": entry.findtext("Name"),
+                    "value": value,
+                    "unit": unit,
+                    "state": entry.findtext("State", "0"),
+                    "type": api._determine_sensor_type(unit),
+                }
+            )
+    if (binaryset := find("BinaryInSet")) is not None:
+        for entry in binaryset.findall("Entry"):
+            data["binary_sensors"].append(
+                {
+                    "id": entry.findtext("ID"),
+                    "name": entry.findtext("Name"),
+                    "state": entry.findtext("Value") == "1",
+                    "alarm_state": entry.findtext("State", "0"),
+                    "type": "contact",
+                }
+            )
+    if (outputset := find("OutputSet")) is not None:
+        for entry in outputset.findall("Entry"):
+            data["switches"].append(
+                {
+                    "id": entry.findtext("ID"),
+                    "name": entry.findtext("Name"),
+                    "state": entry.findtext("Value") == "1",
+                }
+            )
+    return data
+
+
+def compare_parsers():
+    """Print the parse times of the original and the current parser."""
+    hwgroup = load_hwgroup()
+    print(
+        f"{'fixture':24} {'original':>12} {'cold':>12} {'warm':>12} "
+        f"{'cold x':>8} {'warm x':>8}"
+    )
+    mismatches = []
+    for name, filename in VALUES_FIXTURES.items():
+        payload = (FIXTURES_DIR / filename).read_bytes()
+        payloads = [payload, changed_payload(payload)]
+        api = create_api(hwgroup)
+        api._parse_xml_data(payload)
+
+        def parse_warm(api=api, payloads=payloads):
+            payloads.reverse()
+            return api._parse_xml_data(payloads[0])
+
+        original = measure(lambda: baseline_parse(api, payload))
+        cold = measure(lambda: create_api(hwgroup)._parse_xml_data(payload))
+        warm = measure(parse_warm)
+        print(
+            f"{name:24} {original * 1e6:>9.1f} us {cold * 1e6:>9.1f} us "
+            f"{warm * 1e6:>9.1f} us {original / cold:>7.1f}x {original / warm:>7.1f}x"
+        )
+
+        # Both parsers must read the same readings
+        expected = baseline_parse(api, payload)
+        actual = create_api(hwgroup)._parse_xml_data(payload)
+        for key in ("sensors", "binary_sensors", "switches"):
+            for reading in expected[key]:
+                parsed = actual[key].get(reading["id"])
+                fields = {
+                    field: getattr(parsed, field, None) for field in reading
+                }
+                if fields != reading:
+                    mismatches.append(f"{name} {key} {reading['id']}: {fields} != {reading}")
+    return mismatches
+
+
+def read_entity_state(data, key, reading_id):
+    """Read the properties Home Assistant reads when an entity is written."""
+    reading = data.get(key, {}).get(reading_id)
+    if reading is None:
+        return None
+    if key == "sensors":
+        return (reading.value, reading.unit, reading.state)
+    return reading.state
+
+
+def measure(func, min_time=0.2, repeat=5):
+    """Return the best time per call in seconds."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def measure_allocations(func):
+    """Return the peak and retained memory of one call in KiB."""
+    func()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return (peak - before) / 1024, (current - before) / 1024
+
+
+def record(results, name, func, payload_bytes=0):
+    """Run one benchmark and store its result."""
+    seconds = measure(func)
+    peak, retained = measure_allocations(func)
+    result = {
+        "us_per_op": round(seconds * 1e6, 2),
+        "ops_per_s": round(1 / seconds),
+        "alloc_peak_kib": round(peak, 1),
+        "alloc_retained_kib": round(retained, 1),
+    }
+    if payload_bytes:
+        result["mb_per_s"] = round(payload_bytes / seconds / 1e6, 1)
+    results[name] = result
+    print(
+        f"{name:40} {result['us_per_op']:>10.2f} us/op "
+        f"{result['alloc_peak_kib']:>8.1f} KiB peak "
+        f"{result['alloc_retained_kib']:>8.1f} KiB kept"
+    )
+
+
+def run_benchmarks():
+    """Run all benchmarks and return the results."""
+    hwgroup = load_hwgroup()
+    snapshot = load_module("snapshot")
+    results = {}
+
+    for name, filename in VALUES_FIXTURES.items():
+        payload = (FIXTURES_DIR / filename).read_bytes()
+        changed = changed_payload(payload)
+
+        # Full parse of an unknown device, including learning its layout
+        def parse_cold(payload=payload):
+            return create_api(hwgroup)._parse_xml_data(payload)
+
+        record(results, f"parse_cold/{name}", parse_cold, len(payload))
+
+        # Fast path of a device with a learned layout and changing values
+        api = create_api(hwgroup)
+        api._parse_xml_data(payload)
+        payloads = [payload, changed]
+
+        def parse_warm(api=api, payloads=payloads):
+            payloads.reverse()
+            return api._parse_xml_data(payloads[0])
+
+        record(results, f"parse_warm/{name}", parse_warm, len(payload))
+
+        # Poll, inversion, diff and entity writes of every changed reading
+        raw = api._parse_xml_data(payload)
+        inverted = frozenset(list(raw["binary_sensors"])[::2])
+        state = {"raw": raw, "data": snapshot.apply_inversion(raw, inverted)}
+
+        def refresh(api=api, payloads=payloads, state=state, inverted=inverted):
+            payloads.reverse()
+            raw = api._parse_xml_data(payloads[0])
+            data = snapshot.apply_inversion(raw, inverted, state["raw"], state["data"])
+            for key, reading_id in snapshot.snapshot_changes(state["data"], data):
+                read_entity_state(data, key, reading_id)
+            state["raw"] = raw
+            state["data"] = data
+            return data
+
+        record(results, f"refresh/{name}", refresh, len(payload))
+
+    api = create_api(hwgroup)
+    for name, filename in STATUS_FIXTURES.items():
+        status = (FIXTURES_DIR / filename).read_text(encoding="utf-8")
+
+        def parse_status(api=api, status=status):
+            data = {"sensors": {}}
+            api._parse_sms_gateway_status(status, data)
+            return data
+
+        record(results, f"sms_status/{name}", parse_status, len(status))
+
+    def determine_sensor_types(api=api):
+        return [api._determine_sensor_type(unit) for unit in UNITS]
+
+    record(results, "determine_sensor_type", determine_sensor_types)
+
+    # Memory a fleet keeps for its latest snapshots, after a second poll in
+    # which only two readings changed
+    fleet_payload = (FIXTURES_DIR / "poseidon3268_16.xml").read_bytes()
+    fleet_polls = [fleet_payload, changed_payload(fleet_payload, 2)]
+
+    def poll_fleet():
+        fleet = []
+        for _ in range(FLEET_SIZE):
+            api = create_api(hwgroup)
+            for fleet_poll in fleet_polls:
+                data = api._parse_xml_data(fleet_poll)
+            fleet.append((api, data))
+        return fleet
+
+    record(results, f"fleet/{FLEET_SIZE}x_poseidon3268_16", poll_fleet)
+
+    # SNMP poll of a device with a learned layout: decode the response,
+    # split it into columns and build the snapshot
+    snmp = load_module("snmp")
+    records = [
+        tuple(line.split("|", 2))
+        for line in (FIXTURES_DIR / SNMP_FIXTURE).read_text(encoding="utf-8").splitlines()
+    ]
+    snmp_api = create_api(hwgroup)
+    snmp_api._parse_xml_data(fleet_payload)
+    layout = snmp_api.layout
+    snmp_state = {"data": snmp_api._snapshot}
+    responses = [snmp_response(snmp, records), snmp_response(snmp, records, bump=1)]
+
+    def snmp_poll(responses=responses, snmp_state=snmp_state):
+        responses.reverse()
+        columns = {}
+        pending = []
+        for key, field, column in snmp._ENCODED_COLUMNS:
+            values = columns.setdefault(key, {}).setdefault(field, [])
+            pending.append((values, column, column))
+        _request_id, _error_status, var_binds = snmp.decode_response(responses[0])
+        if snmp.add_rows(pending, var_binds):
+            raise RuntimeError("SNMP walk did not end")
+        data = snmp.build_snapshot(columns, layout, snmp_state["data"])
+        snmp_state["data"] = data
+        return data
+
+    record(results, "snmp_poll/poseidon3268_16", snmp_poll, len(responses[0]))
+
+    # Modbus poll of a device with a learned layout, with the exchange
+    # answered from memory: decode the reads and build the snapshot
+    modbus = load_module("modbus")
+    modbus_api = modbus.HWGroupModbusAPI("bench.invalid", session=object())
+    modbus_api._parse_xml_data(fleet_payload)
+    modbus_api._learned_at = time.monotonic()
+    modbus_reads = [
+        modbus_responses(modbus_api._parse_xml_data(fleet_payload)),
+        modbus_responses(modbus_api._parse_xml_data(changed_payload(fleet_payload))),
+    ]
+
+    async def exchange(requests, reads=modbus_reads):
+        reads.reverse()
+        return reads[0]
+
+    modbus_api._async_exchange = exchange
+    loop = asyncio.new_event_loop()
+
+    def modbus_poll(api=modbus_api):
+        return loop.run_until_complete(api._async_get_values())
+
+    record(results, "modbus_poll/poseidon3268_16", modbus_poll)
+    loop.close()
+
+    # One MQTT message of a device with a learned layout, alternating
+    # between two values so every message changes the snapshot
+    mqtt = load_module("mqtt")
+    mqtt_api = mqtt.HWGroupMqttAPI("bench.invalid", session=object(), topic="hwg/bench")
+    mqtt_api._parse_xml_data(fleet_payload)
+    sensor_id = next(iter(mqtt_api.layout.sets["sensors"]))
+    mqtt_messages = [(f"hwg/bench/sensors/{sensor_id}", value) for value in (b"21.5", b"21.6")]
+
+    def mqtt_message(api=mqtt_api, messages=mqtt_messages):
+        messages.reverse()
+        return api.apply_message(*messages[0])
+
+    record(results, "mqtt_message/poseidon3268_16", mqtt_message)
+
+    # One poll of a device with full sensor histories
+    history = load_module("history")
+    rng = random.Random(3)
+    histories = [
+        history.SensorHistory(HISTORY_WINDOWS, 200) for _ in range(HISTORY_SENSORS)
+    ]
+    clock = {"now": 0.0}
+
+    def record_history(histories=histories, clock=clock):
+        clock["now"] += HISTORY_INTERVAL
+        return [
+            sensor_history.add(clock["now"], 20 + rng.random())
+            for sensor_history in histories
+        ]
+
+    for _ in range(200):
+        record_history()
+    record(results, f"history/{HISTORY_SENSORS}_sensors", record_history)
+
+    # Setup of thousands of entities: first run and with memoized names
+    classifier = load_module("classifier")
+    names = entity_names(CLASSIFY_NAMES)
+    classifiers = [
+        classifier.BINARY_SENSOR_CLASSIFIER,
+        classifier.SENSOR_NAME_CLASSIFIER,
+        *classifier.SENSOR_ICON_CLASSIFIERS.values(),
+    ]
+
+    def classify(names=names):
+        return [
+            (
+                classifier.classify_binary_sensor(name),
+                classifier.sensor_icon(name, sensor_type),
+            )
+            for name, sensor_type in names
+        ]
+
+    def classify_cold(classifiers=classifiers):
+        for keyword_classifier in classifiers:
+            keyword_classifier.clear_cache()
+        return classify()
+
+    record(results, f"classify_names/{CLASSIFY_NAMES}_cold", classify_cold)
+    record(results, f"classify_names/{CLASSIFY_NAMES}_memoized", classify)
+    return results
+
+
+def reference_statistics(samples, minutes, capacity):
+    """Compute the statistics of a window from scratch, like the history should."""
+    now = samples[-1][0]
+    window = [
+        (sample_time, value)
+        for sample_time, value in samples[-capacity:]
+        if sample_time >= now - minutes * 60
+    ]
+    values = [value for _time, value in window]
+    mean = statistics.fmean(values)
+    elapsed = window[-1][0] - window[0][0]
+    return {
+        "min": min(values),
+        "max": max(values),
+        "mean": mean,
+        "stddev": statistics.pstdev(values, mean),
+        "rate": (values[-1] - values[0]) / elapsed * 60 if elapsed > 0 else 0.0,
+    }
+
+
+def verify_history():
+    """Return the rolling statistics that differ from a brute-force computation."""
+    history = load_module("history")
+    tolerance = 2 * 10 ** -history.PRECISION
+    rng = random.Random(5)
+    mismatches = []
+    for windows, capacity, count in HISTORY_CHECKS:
+        sensor_history = history.SensorHistory(windows, capacity)
+        samples = []
+        now = 0.0
+        for _ in range(count):
+            # Irregular intervals and jumps, like adaptive polls of a busy sensor
+            now += rng.choice((5, 10, HISTORY_INTERVAL, 60, 90))
+            samples.append((now, rng.uniform(-20, 40)))
+            sensor_history.add(*samples[-1])
+            for minutes in windows:
+                expected = reference_statistics(samples, minutes, capacity)
+                actual = sensor_history.statistics[f"{minutes}min"]
+                for name, value in expected.items():
+                    if abs(actual[name] - value) > tolerance:
+                        mismatches.append(
+                            f"history {windows}/{capacity} sample {len(samples)} "
+                            f"{minutes}min {name}: {actual[name]} != {value:.3f}"
+                        )
+    return mismatches
+
+
+def emptied_payload(payload):
+    """Return the payload with the first and every second Value and State empty.
+
+    Devices send empty elements for disconnected probes.
+    """
+    seen = {b"Value": 0, b"State": 0}
+
+    def empty(match):
+        tag = match.group(1)
+        seen[tag] += 1
+        return b"<%s></%s>" % (tag, tag) if seen[tag] % 2 else match.group(0)
+    return FIELD_PATTERN.sub(empty, payload)
+
+
+def verify_fast_path():
+    """Return the readings of the fast path that differ from a full parse."""
+    hwgroup = load_hwgroup()
+    mismatches = []
+    for name, filename in VALUES_FIXTURES.items():
+        payload = (FIXTURES_DIR / filename).read_bytes()
+        for variant, document in (("changed", changed_payload(payload)), ("empty", emptied_payload(payload))):
+            expected = create_api(hwgroup)._parse_xml_data(document)
+            # Learn the layout first, so the document takes the fast path
+            api = create_api(hwgroup)
+            api._parse_xml_data(payload)
+            actual = api._parse_xml_data(document)
+            for key in hwgroup.READING_TYPES:
+                for reading_id in expected[key].keys() | actual[key].keys():
+                    cold = expected[key].get(reading_id)
+                    warm = actual[key].get(reading_id)
+                    if cold != warm:
+                        mismatches.append(f"fast path {name}/{variant} {key} {reading_id}: {warm} != {cold}")
+    return mismatches
+
+
+def check_regressions(results, baseline, tolerance):
+    """Return the benchmarks that are worse than the baseline."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for metric in ("us_per_op", "alloc_peak_kib"):
+            # Ignore noise on tiny values
+            limit = max(base[metric] * (1 + tolerance), base[metric] + 1)
+            if current[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {current[metric]} > {base[metric]} "
+                    f"(+{tolerance:.0%})"
+                )
+    return regressions
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="HW Group parser benchmarks")
+    parser.add_argument("--save", action="store_true", help="store results as baseline")
+    parser.add_argument("--check", action="store_true", help="compare with baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown before --check fails (default: 0.25)",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument(
+        "--verify", action="store_true", help="check results against reference implementations"
+    )
+    parser.add_argument(
+        "--compare-parsers",
+        action="store_true",
+        help="compare the values.xml parser with the original ElementTree parse",
+    )
+    args = parser.parse_args()
+
+    if args.compare_parsers:
+        mismatches = compare_parsers()
+        if mismatches:
+            print("\nReadings that differ from the original parser:")
+            for mismatch in mismatches:
+                print(f"  {mismatch}")
+            sys.exit(1)
+        return
+
+    if args.verify:
+        mismatches = verify_history() + verify_fast_path()
+        if mismatches:
+            print("Results that differ from their reference:")
+            for mismatch in mismatches[:20]:
+                print(f"  {mismatch}")
+            print(f"  ({len(mismatches)} in total)")
+            sys.exit(1)
+        print("All results match their reference implementations")
+        return
+
+    results = run_benchmarks()
+
+    if args.save:
+        baseline = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.check:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = check_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
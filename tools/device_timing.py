@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+HW Group Device Timing
+Times the API client of the integration against devices served by
+tools/simulator.py, to check latency work end to end.
+
+Usage:
+1. Start a simulated SMS gateway with 200 ms per document:
+   python tools/simulator.py --personality sms --latency 200
+2. Compare the first poll, which fetches status.xml after values.xml,
+   with later polls, which fetch both at once:
+   python tools/device_timing.py sms-poll http://127.0.0.1:8080
+3. Compare a new connection per poll with the dedicated keep-alive pool:
+   python tools/simulator.py
+   python tools/device_timing.py keep-alive http://127.0.0.1:8080
+4. Compare the toggle-to-UI latency of a relay with and without
+   optimistic switching:
+   python tools/simulator.py --latency 50
+   python tools/device_timing.py toggle http://127.0.0.1:8080
+5. Compare the setup of 100 entries with a blocking first refresh and
+   from their stored snapshots, here with 5 % hung requests:
+   python tools/simulator.py --devices 100 --entries 16 --latency 20 \\
+   --jitter 10 --timeout-rate 0.05
+   python tools/device_timing.py setup http://127.0.0.1:8080 --devices 100
+6. Compare the polling throughput of values.xml and Modbus/TCP, here
+   with 50 devices:
+   python tools/modbus_server.py --devices 50 --walk
+   python tools/device_timing.py modbus http://127.0.0.1:8080 --devices 50
+7. Compare the poll latency of values.xml and SNMP against snmpsim, with
+   the matching values.xml served by the Modbus server:
+   snmpsim-command-responder --data-dir=tools/fixtures/snmp \\
+   --agent-udpv4-endpoint=127.0.0.1:1161
+   (as root add --process-user and --process-group of an unprivileged user)
+   python tools/modbus_server.py
+   python tools/device_timing.py snmp http://127.0.0.1:8080
+8. Compare how long a changed reading takes to arrive when streamed over
+   MQTT and when polled every 10 seconds, through an embedded broker:
+   python tools/mqtt_publisher.py --broker
+   python tools/device_timing.py mqtt mqtt://127.0.0.1:1883 --interval 10
+
+Requirements:
+- aiohttp (imported by the API client); Home Assistant is not needed
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from benchmark import FIXTURES_DIR, load_hwgroup, load_module
+
+
+def create_api(hwgroup, url, session):
+    """Create an API client for the device at a URL.
+
+    Without a session the client owns a dedicated keep-alive pool.
+    """
+    parts = urlsplit(url)
+    return hwgroup.HWGroupAPI(parts.hostname, session, port=parts.port or 80)
+
+
+def device_urls(url, count):
+    """Return the URLs of count devices on consecutive ports from url."""
+    parts = urlsplit(url)
+    port = parts.port or 80
+    return [f"{parts.scheme}://{parts.hostname}:{port + index}" for index in range(count)]
+
+
+def print_timings(label, timings):
+    """Print the median and spread of some timings in milliseconds."""
+    timings = sorted(timings)
+    print(
+        f"{label:32} median {statistics.median(timings) * 1000:8.1f} ms, "
+        f"min {timings[0] * 1000:8.1f} ms, max {timings[-1] * 1000:8.1f} ms "
+        f"({len(timings)} runs)"
+    )
+
+
+async def poll_throughput(apis, duration, prepare=None):
+    """Poll every client back to back for a while.
+
+    Returns the polls per second and the client CPU time per poll. prepare
+    is called with a client before each of its polls.
+    """
+    polls = 0
+    deadline = time.monotonic() + duration
+
+    async def poll_until_deadline(api):
+        nonlocal polls
+        while time.monotonic() < deadline:
+            if prepare is not None:
+                prepare(api)
+            await api.async_get_data()
+            polls += 1
+
+    cpu = time.process_time()
+    start = time.perf_counter()
+    await asyncio.gather(*(poll_until_deadline(api) for api in apis))
+    elapsed = time.perf_counter() - start
+    return polls / elapsed, (time.process_time() - cpu) / polls
+
+
+def print_throughput(label, throughput):
+    """Print polls per second and the client CPU time per poll."""
+    rate, cpu = throughput
+    print(f"{label:32} {rate:8.0f} polls/s, client CPU {cpu * 1000:6.2f} ms/poll")
+
+
+def reparse(api):
+    """Drop the payload cache, so the next values.xml is parsed as if changed."""
+    api._values_digest = None
+
+
+async def timed(func):
+    """Return the result of a coroutine function and its duration."""
+    start = time.perf_counter()
+    result = await func()
+    return result, time.perf_counter() - start
+
+
+async def sms_poll(args):
+    """Time the first and the later polls of an SMS gateway.
+
+    The first poll does not know the device type yet and fetches
+    status.xml after values.xml; later polls fetch both concurrently.
+    """
+    hwgroup = load_hwgroup()
+    first = []
+    later = []
+    async with aiohttp.ClientSession() as session:
+        for _ in range(args.runs):
+            api = create_api(hwgroup, args.url, session)
+            data, duration = await timed(api.async_get_data)
+            if data["device_info"].get("device_type") != "sms_gateway":
+                sys.exit("The device is not an SMS gateway, start the simulator with --personality sms")
+            first.append(duration)
+            for _ in range(args.polls):
+                later.append((await timed(api.async_get_data))[1])
+    print_timings("first poll (sequential)", first)
+    print_timings("later polls (concurrent)", later)
+    print(f"Later polls take {statistics.median(later) / statistics.median(first):.0%} of the first")
+
+
+async def keep_alive(args):
+    """Time polls over a new connection each and over the dedicated pool."""
+    hwgroup = load_hwgroup()
+
+    async def poll_all(api):
+        await api.async_get_data()
+        timings = []
+        for _ in range(args.polls):
+            timings.append((await timed(api.async_get_data))[1])
+        return timings
+
+    connector = aiohttp.TCPConnector(force_close=True)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        closing = await poll_all(create_api(hwgroup, args.url, session))
+
+    api = create_api(hwgroup, args.url, None)
+    try:
+        pooled = await poll_all(api)
+    finally:
+        await api.async_close()
+
+    print_timings("new connection per poll", closing)
+    print_timings("dedicated keep-alive pool", pooled)
+    print(
+        f"Pool connections: {api.connections_created} created, "
+        f"{api.connections_reused} reused"
+    )
+
+
+async def toggle(args):
+    """Time how long a relay toggle takes to show its confirmed state.
+
+    Without optimistic switching the state is shown after the command and
+    the refresh that follows it. With it the target state is shown before
+    the command is sent and confirmed by the output state in the command
+    response, without a refresh.
+    """
+    hwgroup = load_hwgroup()
+    refreshed = []
+    confirmed = []
+    async with aiohttp.ClientSession() as session:
+        api = create_api(hwgroup, args.url, session)
+        data = await api.async_get_data()
+        if not data["switches"]:
+            sys.exit("The device has no outputs, start the simulator as a Poseidon")
+        output_id = next(iter(data["switches"]))
+        state = data["switches"][output_id].state
+
+        async def command_and_refresh():
+            await api.async_set_output(output_id, state)
+            return (await api.async_get_data())["switches"][output_id].state
+
+        for _ in range(args.toggles):
+            state = not state
+            shown, duration = await timed(command_and_refresh)
+            if shown != state:
+                sys.exit(f"Refresh showed {shown} instead of {state}")
+            refreshed.append(duration)
+
+            state = not state
+            (success, reported), duration = await timed(
+                lambda: api.async_set_output_state(output_id, state)
+            )
+            if not success or reported != state:
+                sys.exit(f"Command response reported {reported} instead of {state}")
+            confirmed.append(duration)
+
+    print_timings("command and refresh", refreshed)
+    print_timings("optimistic, confirmed", confirmed)
+    print("Optimistic switches show the target state before the command is sent")
+
+
+async def setup(args):
+    """Time the setup of many entries with and without stored snapshots.
+
+    Entries are set up concurrently, like Home Assistant sets up config
+    entries. Without a stored snapshot every entry waits for its first
+    refresh, so setup takes as long as the slowest device. With one, the
+    entities are created from the decoded snapshot and the first refresh
+    runs in the background; this times loading the Store files.
+    """
+    hwgroup = load_hwgroup()
+    urls = device_urls(args.url, args.devices)
+
+    async def first_refresh(api):
+        try:
+            return await api.async_get_data()
+        except hwgroup.HWGroupError:
+            return None
+
+    async with aiohttp.ClientSession() as session:
+        apis = [create_api(hwgroup, url, session) for url in urls]
+        start = time.perf_counter()
+        snapshots = await asyncio.gather(*(first_refresh(api) for api in apis))
+        blocking = time.perf_counter() - start
+        failed = snapshots.count(None)
+        # Every entry has a snapshot from an earlier run to restore from
+        for _ in range(5):
+            missing = [index for index, data in enumerate(snapshots) if data is None]
+            for index, data in zip(
+                missing, await asyncio.gather(*(first_refresh(apis[index]) for index in missing))
+            ):
+                snapshots[index] = data
+        if None in snapshots:
+            sys.exit("Some devices never answered, is the simulator running?")
+
+    # Store files as Home Assistant writes them, one per entry
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index, (api, data) in enumerate(zip(apis, snapshots)):
+            path = Path(directory) / f"hwgroup.entry{index}"
+            stored = {"host": api.host, "snapshot": hwgroup.snapshot_as_dict(data)}
+            path.write_text(json.dumps({"version": 1, "key": path.name, "data": stored}))
+            paths.append(path)
+
+        def load(path):
+            stored = json.loads(path.read_text())["data"]
+            return hwgroup.snapshot_from_dict(stored["snapshot"])
+
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.to_thread(load, path) for path in paths))
+        restored = time.perf_counter() - start
+
+    print(f"{'blocking first refresh':32} {blocking * 1000:8.1f} ms ({failed} of {len(urls)} failed)")
+    print(f"{'restored from the Store':32} {restored * 1000:8.1f} ms ({len(paths)} snapshots)")
+
+
+async def modbus(args):
+    """Compare the polling throughput of values.xml and Modbus/TCP.
+
+    Every values.xml poll is parsed, as if its values changed; the Modbus
+    server changes its sensor registers with --walk.
+    """
+    hwgroup = load_hwgroup()
+    modbus_module = load_module("modbus")
+    urls = device_urls(args.url, args.devices)
+    async with aiohttp.ClientSession() as session:
+        values_apis = [create_api(hwgroup, url, session) for url in urls]
+        await asyncio.gather(*(api.async_get_data() for api in values_apis))
+        values = await poll_throughput(values_apis, args.duration, reparse)
+
+        modbus_apis = []
+        for index, url in enumerate(urls):
+            parts = urlsplit(url)
+            modbus_apis.append(
+                modbus_module.HWGroupModbusAPI(
+                    parts.hostname,
+                    session,
+                    port=parts.port,
+                    modbus_port=args.modbus_port + index,
+                )
+            )
+        try:
+            # The first poll learns the layout from values.xml
+            await asyncio.gather(*(api.async_get_data() for api in modbus_apis))
+            registers = await poll_throughput(modbus_apis, args.duration)
+        finally:
+            await asyncio.gather(*(api.async_close() for api in modbus_apis))
+
+    print(f"{len(urls)} devices, {args.duration:.0f} s per transport")
+    print_throughput("values.xml", values)
+    print_throughput("Modbus/TCP", registers)
+    print(f"Modbus connections: {sum(api.modbus_connections for api in modbus_apis)}")
+
+
+async def snmp(args):
+    """Compare the poll latency of values.xml and SNMP GETBULK walks.
+
+    Both clients read the same device: values.xml from URL, which must
+    match the SNMP walk, and the tables from the SNMP agent. Every
+    values.xml poll is parsed, as if its values changed.
+    """
+    hwgroup = load_hwgroup()
+    snmp_module = load_module("snmp")
+    parts = urlsplit(args.url)
+
+    async def poll_timings(api, prepare=None):
+        data = await api.async_get_data()
+        timings = []
+        cpu = time.process_time()
+        for _ in range(args.polls):
+            if prepare is not None:
+                prepare(api)
+            data, duration = await timed(api.async_get_data)
+            timings.append(duration)
+        return data, timings, (time.process_time() - cpu) / args.polls
+
+    async with aiohttp.ClientSession() as session:
+        values_data, values, values_cpu = await poll_timings(
+            create_api(hwgroup, args.url, session), reparse
+        )
+        api = snmp_module.HWGroupSnmpAPI(
+            parts.hostname,
+            session,
+            port=parts.port or 80,
+            community=args.community,
+            snmp_port=args.snmp_port,
+        )
+        try:
+            snmp_data, walks, snmp_cpu = await poll_timings(api)
+        except hwgroup.HWGroupError as err:
+            sys.exit(f"SNMP poll failed, is the agent running? {err}")
+        finally:
+            await api.async_close()
+
+    print_timings("values.xml", values)
+    print_timings("SNMP", walks)
+    print(
+        f"Client CPU per poll: values.xml {values_cpu * 1000:.2f} ms, "
+        f"SNMP {snmp_cpu * 1000:.2f} ms "
+        f"({api.snmp_requests / (args.polls + 1):.1f} requests per SNMP poll)"
+    )
+    same = all(
+        snmp_data[key] == values_data[key] for key in hwgroup.READING_TYPES
+    )
+    print(f"SNMP snapshot equals the values.xml snapshot: {'yes' if same else 'no'}")
+
+
+def with_sensor_value(payload, sensor_id, value):
+    """Return a values.xml document with another value for one sensor."""
+    pattern = re.compile(rb"(<ID>%s</ID>.*?<Value>)[^<]*(</Value>)" % sensor_id.encode(), re.S)
+    return pattern.sub(rb"\g<1>%s\g<2>" % value.encode(), payload, 1)
+
+
+async def mqtt(args):
+    """Compare the update latency of streamed and polled readings.
+
+    One sensor of a values.xml fixture changes at random times. Polled, a
+    change shows up with the next poll; streamed, the message is applied
+    as soon as the broker delivers it. The coordinator hands streamed
+    snapshots to the entities MQTT_BATCH_DELAY after the first message of
+    a burst, which is added for the entity latency. The fixture is served
+    from here, so no device needs to run besides the broker.
+    """
+    # Needed only for this check
+    from amqtt.client import MQTTClient
+
+    hwgroup = load_hwgroup()
+    mqtt_module = load_module("mqtt")
+    batch_delay = load_module("const").MQTT_BATCH_DELAY
+    document = {"payload": (FIXTURES_DIR / args.fixture).read_bytes()}
+
+    async def values(request):
+        return web.Response(body=document["payload"], content_type="text/xml")
+
+    app = web.Application()
+    app.router.add_get("/values.xml", values)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.http_port).start()
+    port = args.http_port
+
+    topic = "hwg/timing"
+    subscriber = MQTTClient()
+    publisher = MQTTClient()
+    await subscriber.connect(args.broker)
+    await publisher.connect(args.broker)
+    try:
+        async with aiohttp.ClientSession() as session:
+            polled = create_api(hwgroup, f"http://127.0.0.1:{port}", session)
+            streamed = mqtt_module.HWGroupMqttAPI(
+                "127.0.0.1", session, port=port, topic=topic
+            )
+            data = await polled.async_get_data()
+            await streamed.async_get_data()
+            sensor_id, sensor = next(iter(data["sensors"].items()))
+
+            def change(index):
+                return f"{sensor.value + index + 1:.1f}"
+
+            # Streamed: publish a change and wait until it is applied
+            await subscriber.subscribe([(streamed.subscription, 0)])
+            arrivals = {}
+
+            async def deliver():
+                while True:
+                    message = await subscriber.deliver_message()
+                    snapshot = streamed.apply_message(message.topic, bytes(message.data))
+                    if snapshot is not None:
+                        value = snapshot["sensors"][sensor_id].value
+                        if value in arrivals and not arrivals[value].done():
+                            arrivals[value].set_result(time.perf_counter())
+
+            delivery = asyncio.create_task(deliver())
+            messages = []
+            try:
+                for index in range(args.changes):
+                    value = change(index)
+                    arrival = arrivals[float(value)] = asyncio.get_running_loop().create_future()
+                    start = time.perf_counter()
+                    await publisher.publish(f"{topic}/sensors/{sensor_id}", value.encode())
+                    messages.append(await asyncio.wait_for(arrival, 10) - start)
+                    await asyncio.sleep(random.uniform(0.05, 0.2))
+            finally:
+                delivery.cancel()
+
+            # Polled: change the document at a random point of the interval
+            pending = {}
+
+            async def poll():
+                while True:
+                    await asyncio.sleep(args.interval)
+                    snapshot = await polled.async_get_data()
+                    value = snapshot["sensors"][sensor_id].value
+                    if pending.get("value") == value and not pending["seen"].done():
+                        pending["seen"].set_result(time.perf_counter())
+
+            poller = asyncio.create_task(poll())
+            polls = []
+            try:
+                for index in range(args.changes):
+                    await asyncio.sleep(random.uniform(0, args.interval))
+                    value = change(args.changes + index)
+                    pending["value"] = float(value)
+                    pending["seen"] = seen = asyncio.get_running_loop().create_future()
+                    document["payload"] = with_sensor_value(document["payload"], sensor_id, value)
+                    start = time.perf_counter()
+                    polls.append(await asyncio.wait_for(seen, args.interval + 10) - start)
+            finally:
+                poller.cancel()
+    finally:
+        await subscriber.disconnect()
+        await publisher.disconnect()
+        await runner.cleanup()
+
+    print_timings("MQTT message applied", messages)
+    print_timings("MQTT entities notified", [value + batch_delay for value in messages])
+    print_timings(f"polled every {args.interval:g} s", polls)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="HW Group device timing")
+    subparsers = parser.add_subparsers(dest="check", required=True)
+
+    sms = subparsers.add_parser("sms-poll", help="concurrent values.xml and status.xml")
+    sms.add_argument("url", help="URL of a simulated SMS gateway")
+    sms.add_argument("--runs", type=int, default=5, help="fresh clients to time")
+    sms.add_argument("--polls", type=int, default=5, help="later polls per client")
+    sms.set_defaults(func=sms_poll)
+
+    pool = subparsers.add_parser("keep-alive", help="dedicated keep-alive connection pool")
+    pool.add_argument("url", help="URL of a simulated device")
+    pool.add_argument("--polls", type=int, default=300, help="polls per client")
+    pool.set_defaults(func=keep_alive)
+
+    relay = subparsers.add_parser("toggle", help="toggle-to-UI latency of a relay")
+    relay.add_argument("url", help="URL of a simulated Poseidon")
+    relay.add_argument("--toggles", type=int, default=20, help="toggles per mode")
+    relay.set_defaults(func=toggle)
+
+    entries = subparsers.add_parser("setup", help="setup time of many entries")
+    entries.add_argument("url", help="URL of the first simulated device")
+    entries.add_argument("--devices", type=int, default=100, help="number of entries")
+    entries.set_defaults(func=setup)
+
+    registers = subparsers.add_parser("modbus", help="values.xml against Modbus/TCP throughput")
+    registers.add_argument("url", help="HTTP URL of the first device of tools/modbus_server.py")
+    registers.add_argument("--modbus-port", type=int, default=5020, help="Modbus port of the first device")
+    registers.add_argument("--devices", type=int, default=1, help="number of devices")
+    registers.add_argument("--duration", type=float, default=5.0, help="seconds per transport")
+    registers.set_defaults(func=modbus)
+
+    walk = subparsers.add_parser("snmp", help="values.xml against SNMP latency")
+    walk.add_argument("url", help="URL serving the values.xml matching the SNMP walk")
+    walk.add_argument("--snmp-port", type=int, default=1161, help="port of the SNMP agent")
+    walk.add_argument("--community", default="poseidon3268_16", help="community, the walk for snmpsim")
+    walk.add_argument("--polls", type=int, default=300, help="polls per transport")
+    walk.set_defaults(func=snmp)
+
+    stream = subparsers.add_parser("mqtt", help="streamed against polled update latency")
+    stream.add_argument("broker", help="broker URL, e.g. mqtt://127.0.0.1:1883")
+    stream.add_argument("--interval", type=float, default=10.0, help="poll interval in seconds")
+    stream.add_argument("--changes", type=int, default=20, help="changes per transport")
+    stream.add_argument("--fixture", default="poseidon3268_16.xml", help="file in tools/fixtures")
+    stream.add_argument("--http-port", type=int, default=8090, help="port the fixture is served on")
+    stream.set_defaults(func=mqtt)
+
+    args = parser.parse_args()
+    asyncio.run(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+HW Group Modbus/TCP Server
+Serves a recorded values.xml fixture as Poseidon2 devices over Modbus/TCP
+and, for learning the names and units, over HTTP.
+
+Usage:
+1. Start one device: python tools/modbus_server.py
+   (Modbus on port 5020, values.xml on http://127.0.0.1:8080)
+2. Start 50 devices on Modbus ports 5020-5069 and HTTP ports 8080-8129:
+   python tools/modbus_server.py --devices 50
+3. Change the sensor values every second: python tools/modbus_server.py --walk
+
+Register map (per set, in the order of values.xml):
+- discrete inputs from 100  binary inputs
+- coils from 200            outputs (writable)
+- input registers from 300  sensor values in tenths, signed
+
+Requirements:
+- aiohttp
+- pymodbus 3.16 or later
+
+values.xml is served as recorded; values written or changed over Modbus
+do not show up in it.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import re
+
+from aiohttp import web
+from pymodbus.server import ModbusTcpServer
+from pymodbus.simulator import DataType, SimData, SimDevice
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+INPUT_ADDRESS = 100
+OUTPUT_ADDRESS = 200
+SENSOR_ADDRESS = 300
+
+SET_PATTERN = re.compile(rb"<(SenSet|BinaryInSet|OutputSet)>(.*?)</\1>", re.S)
+VALUE_PATTERN = re.compile(rb"<Value>(-?[\d.]+)</Value>")
+
+
+def read_sets(payload):
+    """Return the values of every set of a values.xml document."""
+    sets = {"SenSet": [], "BinaryInSet": [], "OutputSet": []}
+    for match in SET_PATTERN.finditer(payload):
+        sets[match.group(1).decode()] = [
+            float(value) for value in VALUE_PATTERN.findall(match.group(2))
+        ]
+    return sets
+
+
+def create_device(sets, unit_id):
+    """Return a Modbus device with the registers of the sets."""
+    sensors = [round(value * 10) & 0xFFFF for value in sets["SenSet"]]
+    inputs = [value == 1 for value in sets["BinaryInSet"]]
+    outputs = [value == 1 for value in sets["OutputSet"]]
+    return SimDevice(
+        unit_id,
+        simdata=(
+            [SimData(OUTPUT_ADDRESS, values=outputs or [False], datatype=DataType.BITS)],
+            [SimData(INPUT_ADDRESS, values=inputs or [False], datatype=DataType.BITS)],
+            [SimData(0, values=[0], datatype=DataType.REGISTERS)],
+            [SimData(SENSOR_ADDRESS, values=sensors or [0], datatype=DataType.REGISTERS)],
+        ),
+    )
+
+
+async def walk_sensors(server, unit_id, count):
+    """Change every sensor value by one tenth up or down each second."""
+    while True:
+        await asyncio.sleep(1)
+        registers = await server.async_getValues(unit_id, 4, SENSOR_ADDRESS, count)
+        await server.async_setValues(
+            unit_id,
+            4,
+            SENSOR_ADDRESS,
+            [(value + random.choice((-1, 1))) & 0xFFFF for value in registers],
+        )
+
+
+async def run(args):
+    """Start all devices and serve until interrupted."""
+    payload = (FIXTURES_DIR / args.fixture).read_bytes()
+    sets = read_sets(payload)
+
+    async def values(request):
+        """Serve the recorded values.xml."""
+        return web.Response(body=payload, content_type="text/xml")
+
+    app = web.Application()
+    app.router.add_get("/values.xml", values)
+
+    runners = []
+    tasks = []
+    for index in range(args.devices):
+        server = ModbusTcpServer(
+            create_device(sets, args.unit),
+            address=(args.host, args.port + index),
+        )
+        tasks.append(asyncio.create_task(server.serve_forever()))
+        if args.walk and sets["SenSet"]:
+            tasks.append(
+                asyncio.create_task(walk_sensors(server, args.unit, len(sets["SenSet"])))
+            )
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, args.host, args.http_port + index).start()
+        runners.append(runner)
+        print(
+            f"Device #{index + 1}: modbus://{args.host}:{args.port + index} "
+            f"(unit {args.unit}), http://{args.host}:{args.http_port + index}"
+        )
+
+    print(f"Serving {len(runners)} devices, press Ctrl+C to stop")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="HW Group Modbus/TCP server")
+    parser.add_argument("--devices", type=int, default=1, help="number of devices")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020, help="Modbus port of the first device")
+    parser.add_argument("--http-port", type=int, default=8080, help="HTTP port of the first device")
+    parser.add_argument("--unit", type=int, default=1, help="Modbus unit ID")
+    parser.add_argument("--fixture", default="poseidon3268_16.xml", help="file in tools/fixtures")
+    parser.add_argument("--walk", action="store_true", help="change sensor values every second")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
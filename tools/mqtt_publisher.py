@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+HW Group MQTT Publisher
+Publishes the readings of a recorded values.xml fixture like Poseidon
+devices with MQTT publishing do and serves values.xml over HTTP, which the
+integration reads to learn the names and units.
+
+Usage:
+1. Start an embedded broker and one device: python tools/mqtt_publisher.py --broker
+   (broker on port 1883, base topic hwg/device1, values.xml on http://127.0.0.1:8080)
+2. Publish to an existing broker:
+   python tools/mqtt_publisher.py --url mqtt://homeassistant.local:1883
+3. 50 devices with changing values every second:
+   python tools/mqtt_publisher.py --broker --devices 50 --interval 1 --walk
+
+Topics (per device, below the base topic):
+- sensors/<ID>, inputs/<ID>, outputs/<ID>  value, published every interval
+- outputs/<ID>/set                         1 or 0, switches the output
+
+Requirements:
+- aiohttp
+- amqtt 0.12 or later
+
+values.xml is served as recorded; values changed by --walk or by commands
+do not show up in it.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import re
+
+from aiohttp import web
+from amqtt.broker import Broker
+from amqtt.client import MQTTClient
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+SET_PATTERN = re.compile(rb"<(SenSet|BinaryInSet|OutputSet)>(.*?)</\1>", re.S)
+ENTRY_PATTERN = re.compile(rb"<ID>(\d+)</ID>.*?<Value>(-?[\d.]+)</Value>", re.S)
+
+# Set element -> topic level
+TOPIC_LEVELS = {"SenSet": "sensors", "BinaryInSet": "inputs", "OutputSet": "outputs"}
+
+
+def read_sets(payload):
+    """Return the entry IDs and values of every set of a values.xml document."""
+    sets = {level: {} for level in TOPIC_LEVELS.values()}
+    for match in SET_PATTERN.finditer(payload):
+        sets[TOPIC_LEVELS[match.group(1).decode()]] = {
+            entry_id.decode(): value.decode()
+            for entry_id, value in ENTRY_PATTERN.findall(match.group(2))
+        }
+    return sets
+
+
+async def run_device(args, topic, sets):
+    """Publish the readings of one device and follow its output commands."""
+    client = MQTTClient(config={"auto_reconnect": True})
+    await client.connect(args.url)
+    await client.subscribe([(f"{topic}/outputs/+/set", 0)])
+    readings = {level: dict(values) for level, values in sets.items()}
+
+    async def publish(level, reading_id):
+        await client.publish(
+            f"{topic}/{level}/{reading_id}", readings[level][reading_id].encode()
+        )
+
+    async def follow_commands():
+        while True:
+            message = await client.deliver_message()
+            output_id = message.topic.split("/")[-2]
+            if output_id in readings["outputs"]:
+                readings["outputs"][output_id] = "1" if message.data == b"1" else "0"
+                await publish("outputs", output_id)
+
+    commands = asyncio.create_task(follow_commands())
+    try:
+        while True:
+            if args.walk:
+                for sensor_id, value in readings["sensors"].items():
+                    readings["sensors"][sensor_id] = (
+                        f"{float(value) + random.choice((-0.1, 0.1)):.1f}"
+                    )
+            for level, values in readings.items():
+                for reading_id in values:
+                    await publish(level, reading_id)
+            await asyncio.sleep(args.interval)
+    finally:
+        commands.cancel()
+        await client.disconnect()
+
+
+async def run(args):
+    """Start the broker and all devices and publish until interrupted."""
+    payload = (FIXTURES_DIR / args.fixture).read_bytes()
+    sets = read_sets(payload)
+
+    broker = None
+    if args.broker:
+        broker = Broker(
+            {
+                "listeners": {"default": {"type": "tcp", "bind": f"{args.host}:{args.port}"}},
+                "plugins": {"amqtt.plugins.authentication.AnonymousAuthPlugin": {}},
+            }
+        )
+        await broker.start()
+        print(f"Broker: mqtt://{args.host}:{args.port}")
+    if args.url is None:
+        args.url = f"mqtt://{args.host}:{args.port}"
+
+    async def values(request):
+        """Serve the recorded values.xml."""
+        return web.Response(body=payload, content_type="text/xml")
+
+    app = web.Application()
+    app.router.add_get("/values.xml", values)
+
+    runners = []
+    tasks = []
+    for index in range(args.devices):
+        topic = f"{args.topic}{index + 1}"
+        tasks.append(asyncio.create_task(run_device(args, topic, sets)))
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, args.host, args.http_port + index).start()
+        runners.append(runner)
+        print(f"Device #{index + 1}: {topic}, http://{args.host}:{args.http_port + index}")
+
+    print(f"Publishing {len(runners)} devices, press Ctrl+C to stop")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+        if broker is not None:
+            await broker.shutdown()
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="HW Group MQTT publisher")
+    parser.add_argument("--broker", action="store_true", help="start an embedded broker")
+    parser.add_argument("--url", help="broker URL (default: the embedded broker)")
+    parser.add_argument("--devices", type=int, default=1, help="number of devices")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883, help="port of the embedded broker")
+    parser.add_argument("--http-port", type=int, default=8080, help="HTTP port of the first device")
+    parser.add_argument("--topic", default="hwg/device", help="base topic, numbered per device")
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between publishes")
+    parser.add_argument("--fixture", default="poseidon3268_16.xml", help="file in tools/fixtures")
+    parser.add_argument("--walk", action="store_true", help="change sensor values every interval")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+HW Group Push Client
+Posts recorded values.xml documents to the push receiver of the
+integration at a high rate, like a fleet of devices in push mode would.
+
+Usage:
+1. Enable push in the device options and copy the push URL
+2. Push 1000 documents: python tools/push_client.py \\
+   "http://homeassistant.local:8123/api/hwgroup/push/<entry_id>?token=<token>"
+3. Push at a fixed rate with changing values:
+   python tools/push_client.py URL --count 5000 --rate 200 --vary
+
+Requirements:
+- aiohttp
+
+Prints the throughput, the latency percentiles and the HTTP status of the
+responses. Without --vary every document is identical, so the receiver
+answers from its payload cache.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from pathlib import Path
+import re
+import statistics
+import time
+
+import aiohttp
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+VALUE_PATTERN = re.compile(rb"<Value>(-?\d+)\.(\d)</Value>")
+
+
+def vary(payload, step):
+    """Return the payload with every sensor value changed by step tenths."""
+    def bump(match):
+        return b"<Value>%s.%d</Value>" % (match.group(1), (int(match.group(2)) + step) % 10)
+    return VALUE_PATTERN.sub(bump, payload)
+
+
+async def push(session, url, payloads, args):
+    """Post the documents and return the latencies and statuses."""
+    latencies = []
+    statuses = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    interval = 1 / args.rate if args.rate else 0
+    start = time.perf_counter()
+
+    async def post(index):
+        payload = payloads[index % len(payloads)]
+        sent = time.perf_counter()
+        try:
+            async with session.post(
+                url, data=payload, headers={"Content-Type": "text/xml"}
+            ) as response:
+                await response.read()
+                statuses[response.status] += 1
+        except aiohttp.ClientError as err:
+            statuses[type(err).__name__] += 1
+        finally:
+            latencies.append(time.perf_counter() - sent)
+            semaphore.release()
+
+    tasks = []
+    for index in range(args.count):
+        if interval:
+            delay = start + index * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(post(index)))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start, latencies, statuses
+
+
+async def run(args):
+    """Push the documents and print the results."""
+    payload = (FIXTURES_DIR / args.fixture).read_bytes()
+    payloads = [vary(payload, step) for step in range(10)] if args.vary else [payload]
+
+    async with aiohttp.ClientSession() as session:
+        elapsed, latencies, statuses = await push(session, args.url, payloads, args)
+
+    latencies.sort()
+    print(f"Pushed {args.count} documents in {elapsed:.2f}s ({args.count / elapsed:.0f}/s)")
+    print(
+        f"Latency: median {statistics.median(latencies) * 1000:.2f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms, "
+        f"max {latencies[-1] * 1000:.2f} ms"
+    )
+    print("Responses: " + ", ".join(f"{status}: {count}" for status, count in statuses.items()))
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="HW Group push client")
+    parser.add_argument("url", help="push URL including the token")
+    parser.add_argument("--fixture", default="poseidon3268_16.xml", help="file in tools/fixtures")
+    parser.add_argument("--count", type=int, default=1000, help="documents to push")
+    parser.add_argument("--rate", type=float, default=0.0, help="documents per second (0: no limit)")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight")
+    parser.add_argument("--vary", action="store_true", help="change the values of every document")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+HW Group Device Simulator
+Serves virtual Poseidon 3268, Poseidon 3266 and HWg-SMS-GW3 devices over
+HTTP for load and latency testing of the integration.
+
+Usage:
+1. Start one device: python tools/simulator.py
+2. Start 300 Poseidons on ports 8001-8300:
+   python tools/simulator.py --devices 300 --port 8001 --personality 3268
+3. Add faults: python tools/simulator.py --latency 50 --jitter 20 \\
+   --unauthorized-rate 0.01 --timeout-rate 0.01 --reset-rate 0.01
+
+Endpoints (per device):
+- /values.xml                      current readings
+- /values.xml?Cmd=SMS&Nmr=..&Text= send an SMS (SMS-GW3)
+- /values.xml?Cmd=Call&Nmr=..      ring a number (SMS-GW3)
+- /status.xml                      modem status (SMS-GW3)
+- /output.xml?id=..&state=0|1      switch an output (Poseidon)
+
+Requirements:
+- aiohttp
+"""
+
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass, field
+
+from aiohttp import BasicAuth, web
+
+NAMESPACE = "http://www.hw-group.com/XMLSchema/ist/Poseidon"
+
+# Personality -> (title, firmware, default entry count, has outputs)
+PERSONALITIES = {
+    "3268": ("Poseidon2 3268", "3.3.2", 8, True),
+    "3266": ("Poseidon2 model 3266", "1.9.7", 2, True),
+    "sms": ("HWg-SMS-GW3", "1.7.4", 0, False),
+}
+
+SERIAL_PREFIXES = {"3268": "0A5903", "3266": "0A5932", "sms": "0A5905"}
+
+# Sensor name, unit, lower and upper bound of the random walk
+SENSOR_KINDS = [
+    ("Temperature", "C", 15.0, 35.0),
+    ("Humidity", "%RH", 20.0, 70.0),
+    ("Voltage", "V", 215.0, 245.0),
+    ("Current", "A", 0.0, 16.0),
+]
+
+
+@dataclass
+class FaultConfig:
+    """Latency and fault injection settings shared by all devices."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    unauthorized_rate: float = 0.0
+    timeout_rate: float = 0.0
+    reset_rate: float = 0.0
+    sms_failure_rate: float = 0.0
+    # Seconds a request hangs before the connection is dropped
+    timeout: float = 60.0
+
+
+@dataclass
+class VirtualDevice:
+    """State of one simulated device."""
+
+    personality: str
+    index: int
+    entries: int
+    namespaced: bool = True
+    walk_step: float = 0.2
+    credentials: tuple[str, str] | None = None
+    sensors: list[dict] = field(default_factory=list)
+    inputs: list[dict] = field(default_factory=list)
+    outputs: list[dict] = field(default_factory=list)
+    sms_sent: int = 0
+    sms_errors: int = 0
+    calls: int = 0
+    signal_dbm: float = -75.0
+
+    def __post_init__(self):
+        """Create the entries of the device."""
+        has_outputs = PERSONALITIES[self.personality][3]
+        for i in range(self.entries):
+            name, unit, lower, upper = SENSOR_KINDS[i % len(SENSOR_KINDS)]
+            self.sensors.append({
+                "id": str(215 + i),
+                "name": f"{name} {i + 1}",
+                "unit": unit,
+                "value": random.uniform(lower, upper),
+                "lower": lower,
+                "upper": upper,
+            })
+            self.inputs.append({"id": str(1 + i), "name": f"Input {i + 1}", "value": 0})
+            if has_outputs:
+                self.outputs.append({"id": str(151 + i), "name": f"Output {i + 1}", "value": 0})
+
+    @property
+    def serial(self):
+        """Return a serial number unique per personality and index."""
+        return f"{SERIAL_PREFIXES[self.personality]}{self.index:04X}"
+
+    def step(self):
+        """Advance the random walk of all readings."""
+        for sensor in self.sensors:
+            span = sensor["upper"] - sensor["lower"]
+            value = sensor["value"] + random.uniform(-1, 1) * self.walk_step * span / 20
+            sensor["value"] = min(max(value, sensor["lower"]), sensor["upper"])
+        for binary in self.inputs:
+            if random.random() < self.walk_step / 20:
+                binary["value"] ^= 1
+        self.signal_dbm = min(max(self.signal_dbm + random.uniform(-2, 2), -113), -51)
+
+    def _document(self, body):
+        """Wrap the body in the root element of the device."""
+        head = '<?xml version="1.0" encoding="UTF-8"?>\n'
+        if self.namespaced:
+            return f'{head}<val:Root xmlns:val="{NAMESPACE}">\n{body}</val:Root>\n'
+        return f"{head}<Root>\n{body}</Root>\n"
+
+    def _agent(self):
+        """Return the Agent element."""
+        title, version, _entries, _has_outputs = PERSONALITIES[self.personality]
+        name_tag = "ProductName" if self.personality == "sms" else "Title"
+        return (
+            "<Agent>\n"
+            f"<Version>{version}</Version>\n<XmlVer>1.01</XmlVer>\n"
+            f"<DeviceName>{title} {self.index + 1}</DeviceName>\n"
+            f"<{name_tag}>{title}</{name_tag}>\n"
+            f"<SerialNumber>{self.serial}</SerialNumber>\n"
+            "</Agent>\n"
+        )
+
+    def values_xml(self):
+        """Return the current values.xml document."""
+        parts = [self._agent()]
+        if self.sensors:
+            parts.append("<SenSet>\n")
+            for sensor in self.sensors:
+                parts.append(
+                    f"<Entry>\n<ID>{sensor['id']}</ID>\n<Name>{sensor['name']}</Name>\n"
+                    f"<Units>{sensor['unit']}</Units>\n<Value>{sensor['value']:.1f}</Value>\n"
+                    f"<Min>{sensor['lower']:.1f}</Min>\n<Max>{sensor['upper']:.1f}</Max>\n"
+                    "<State>1</State>\n</Entry>\n"
+                )
+            parts.append("</SenSet>\n")
+        if self.inputs:
+            parts.append("<BinaryInSet>\n")
+            for binary in self.inputs:
+                parts.append(
+                    f"<Entry>\n<ID>{binary['id']}</ID>\n<Name>{binary['name']}</Name>\n"
+                    f"<Value>{binary['value']}</Value>\n<State>0</State>\n</Entry>\n"
+                )
+            parts.append("</BinaryInSet>\n")
+        if self.outputs:
+            parts.append(self._output_set())
+        return self._document("".join(parts))
+
+    def _output_set(self):
+        """Return the OutputSet element."""
+        parts = ["<OutputSet>\n"]
+        for output in self.outputs:
+            parts.append(
+                f"<Entry>\n<ID>{output['id']}</ID>\n<Name>{output['name']}</Name>\n"
+                f"<Value>{output['value']}</Value>\n<Type>0</Type>\n</Entry>\n"
+            )
+        parts.append("</OutputSet>\n")
+        return "".join(parts)
+
+    def status_xml(self):
+        """Return the modem status document of an SMS gateway."""
+        quality = round((self.signal_dbm + 113) * 100 / 62)
+        return self._document(
+            f"<ModemSigQ>{self.signal_dbm:.0f} dBm ({quality} %)</ModemSigQ>\n"
+            "<ModemNetOp>Simulated Mobile</ModemNetOp>\n"
+            "<ModemNetReg>Registered (home network)</ModemNetReg>\n"
+            f"<CntSmsOK>{self.sms_sent}</CntSmsOK>\n"
+            f"<CntSmsError>{self.sms_errors}</CntSmsError>\n"
+            f"<CntCall>{self.calls}</CntCall>\n"
+        )
+
+    def set_output(self, output_id, state):
+        """Switch an output and return the response document."""
+        for output in self.outputs:
+            if output["id"] == output_id:
+                output["value"] = 1 if state == "1" else 0
+                return self._document(self._output_set())
+        return None
+
+    def command(self, cmd, failure_rate):
+        """Run an SMS or call command and return the result document."""
+        success = random.random() >= failure_rate
+        if cmd == "SMS":
+            if success:
+                self.sms_sent += 1
+            else:
+                self.sms_errors += 1
+        elif success:
+            self.calls += 1
+        return self._document(f"<Rslt>{1 if success else 0}</Rslt>\n")
+
+
+def create_app(device, faults):
+    """Create the web application of one device."""
+
+    @web.middleware
+    async def inject_faults(request, handler):
+        """Delay, reject, hang or drop requests."""
+        delay = faults.latency + random.uniform(-faults.jitter, faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if random.random() < faults.reset_rate:
+            request.transport.abort()
+            raise web.HTTPInternalServerError()
+        if random.random() < faults.timeout_rate:
+            await asyncio.sleep(faults.timeout)
+            request.transport.abort()
+            raise web.HTTPRequestTimeout()
+        if random.random() < faults.unauthorized_rate or not authorized(request):
+            raise web.HTTPUnauthorized(headers={"WWW-Authenticate": 'Basic realm="HWg"'})
+        return await handler(request)
+
+    def authorized(request):
+        """Check the basic auth credentials, if the device requires them."""
+        if device.credentials is None:
+            return True
+        auth = request.headers.get("Authorization", "")
+        try:
+            credentials = BasicAuth.decode(auth)
+        except ValueError:
+            return False
+        return (credentials.login, credentials.password) == device.credentials
+
+    def xml_response(text):
+        """Return an XML document."""
+        return web.Response(text=text, content_type="text/xml")
+
+    async def values(request):
+        """Serve values.xml and run SMS/call commands."""
+        cmd = request.query.get("Cmd")
+        if cmd in ("SMS", "Call"):
+            if device.personality != "sms":
+                raise web.HTTPNotFound()
+            return xml_response(device.command(cmd, faults.sms_failure_rate))
+        device.step()
+        return xml_response(device.values_xml())
+
+    async def status(request):
+        """Serve status.xml of an SMS gateway."""
+        if device.personality != "sms":
+            raise web.HTTPNotFound()
+        return xml_response(device.status_xml())
+
+    async def output(request):
+        """Switch an output."""
+        body = device.set_output(request.query.get("id"), request.query.get("state"))
+        if body is None:
+            raise web.HTTPNotFound()
+        return xml_response(body)
+
+    app = web.Application(middlewares=[inject_faults])
+    app.router.add_get("/values.xml", values)
+    app.router.add_get("/status.xml", status)
+    app.router.add_get("/output.xml", output)
+    return app
+
+
+async def run(args):
+    """Start all devices and serve until interrupted."""
+    faults = FaultConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        unauthorized_rate=args.unauthorized_rate,
+        timeout_rate=args.timeout_rate,
+        reset_rate=args.reset_rate,
+        sms_failure_rate=args.sms_failure_rate,
+    )
+    credentials = tuple(args.auth.split(":", 1)) if args.auth else None
+    personalities = args.personality.split(",")
+
+    runners = []
+    for index in range(args.devices):
+        personality = personalities[index % len(personalities)]
+        entries = args.entries if args.entries is not None else PERSONALITIES[personality][2]
+        device = VirtualDevice(
+            personality,
+            index,
+            entries,
+            namespaced=not args.plain,
+            walk_step=args.walk_step,
+            credentials=credentials,
+        )
+        runner = web.AppRunner(create_app(device, faults), access_log=None)
+        await runner.setup()
+        port = args.port + index
+        await web.TCPSite(runner, args.host, port).start()
+        runners.append(runner)
+        print(f"{PERSONALITIES[personality][0]} #{index + 1} on http://{args.host}:{port}")
+
+    print(f"Serving {len(runners)} devices, press Ctrl+C to stop")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="HW Group device simulator")
+    parser.add_argument("--devices", type=int, default=1, help="number of devices")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="port of the first device")
+    parser.add_argument(
+        "--personality",
+        default="3268",
+        help="3268, 3266 or sms; a comma separated list is assigned round robin",
+    )
+    parser.add_argument("--entries", type=int, help="entries per set (default per model)")
+    parser.add_argument("--plain", action="store_true", help="serve without XML namespace")
+    parser.add_argument("--walk-step", type=float, default=0.2, help="random walk speed")
+    parser.add_argument("--auth", help="require basic auth as user:password")
+    parser.add_argument("--latency", type=float, default=0.0, help="response delay in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- delay in ms")
+    parser.add_argument("--unauthorized-rate", type=float, default=0.0, help="share of 401s")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of hung requests")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="share of dropped connections")
+    parser.add_argument("--sms-failure-rate", type=float, default=0.0, help="share of failed SMS/calls")
+    args = parser.parse_args()
+
+    for personality in args.personality.split(","):
+        if personality not in PERSONALITIES:
+            parser.error(f"unknown personality: {personality}")
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()